@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# answer_cache.py
+# ---------------------------------------------------------
+# On-disk LRU cache for LLM answers (smart_search results).
+# - Keyed by the normalized query (case, stopwords, stemming,
+#   word order) + index fingerprint + model, so "How to vibrate?"
+#   and "vibrating" share an answer and a refreshed index
+#   never serves stale ones
+# - Evicts least-recently-used answers past MAX_ENTRIES or
+#   MAX_BYTES, and anything older than TTL
+# - Hit/miss counters, kept across restarts
+#
+# Usage:
+#   python answer_cache.py stats
+#   python answer_cache.py clear
+# ---------------------------------------------------------
+
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+
+import retrieval
+
+CACHE_FILE = "senseglove_answer_cache.sqlite"
+MAX_ENTRIES = 500
+MAX_BYTES = 2 * 1024 * 1024
+TTL = 7 * 24 * 3600      # seconds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_last_used ON answers(last_used);
+CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def normalize_query(query):
+    """'How do I make it VIBRATE?' → 'vibr'. Empty when only stopwords are left."""
+    return " ".join(sorted(set(retrieval.tokenize(query))))
+
+
+class AnswerCache:
+    """SQLite-backed LRU + TTL cache; safe to share between GUI worker threads."""
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, ttl=TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0        # this session
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def key(self, query, fingerprint, model=""):
+        """Cache key, or None when the query has nothing worth caching on."""
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        return hashlib.sha1(f"{fingerprint}\0{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def _count(self, name):
+        self.conn.execute(
+            "INSERT INTO stats(key, value) VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key):
+        """Cached answer for `key`, or None. Counts a hit or a miss."""
+        if key is None:
+            return None
+        now = time.time()
+        with self._lock, self.conn:
+            row = self.conn.execute("SELECT answer, created FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self.conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                self._count("misses")
+                return None
+            self.conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self._count("hits")
+            return row[0]
+
+    def put(self, key, query, answer):
+        if key is None:
+            return
+        now = time.time()
+        size = len(answer.encode("utf-8"))
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO answers(key, query, answer, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, query, answer, size, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self.conn.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl,))
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from most to least recently used and drop everything past the limits.
+        kept, kept_bytes, drop = 0, 0, []
+        for key, size in self.conn.execute("SELECT key, size FROM answers ORDER BY last_used DESC"):
+            if kept < self.max_entries and kept_bytes + size <= self.max_bytes:
+                kept += 1
+                kept_bytes += size
+            else:
+                drop.append((key,))
+        self.conn.executemany("DELETE FROM answers WHERE key = ?", drop)
+
+    def stats(self):
+        """Session and lifetime hit/miss counts plus current size."""
+        with self._lock:
+            totals = dict(self.conn.execute("SELECT key, value FROM stats"))
+            count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+        lookups = totals.get("hits", 0) + totals.get("misses", 0)
+        return {
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+            "hits": totals.get("hits", 0),
+            "misses": totals.get("misses", 0),
+            "hit_rate": totals.get("hits", 0) / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total,
+        }
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM answers")
+            self.conn.execute("DELETE FROM stats")
+        self.hits = self.misses = 0
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Inspect or clear the answer cache.")
+    ap.add_argument("command", choices=["stats", "clear"])
+    ap.add_argument("--path", default=CACHE_FILE)
+    args = ap.parse_args()
+    cache = AnswerCache(args.path)
+    if args.command == "clear":
+        cache.clear()
+        print("🧹 Answer cache cleared.")
+    else:
+        s = cache.stats()
+        print(f"💾 {s['entries']} answers ({s['bytes'] / 1024:.1f} KB) — "
+              f"{s['hits']} hits / {s['misses']} misses ({s['hit_rate']:.0%} hit rate)")
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# benchmark.py
+# ---------------------------------------------------------
+# Reproducible benchmarks for the indexing and query pipeline.
+# - Corpora: the vendored C# sources (x1) and synthetic copies
+#   scaled x10 / x100 (SG_* identifiers renamed per copy)
+# - Stages: extract_functions, generate_index (local and via a
+#   fake GitHub server), update_index, load_index,
+#   smart_search and end-to-end answer_query
+# - LLM: in-process stub by default, or fake_ollama.py over HTTP;
+#   no network, no real model
+# - Reports files/s or queries/s, p50/p95/p99 latency and peak
+#   Python heap (tracemalloc, measured in a separate pass)
+# - Writes machine-readable JSON; --compare diffs two runs
+#
+# Usage:
+#   python benchmark.py                       # x1, x10, x100
+#   python benchmark.py --scales 1 10 --out bench_results.json
+#   python benchmark.py --scales 1 --compare old_results.json
+# ---------------------------------------------------------
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import fake_github
+import fake_ollama
+import generate_full_index
+import github_updater
+import llm_backend
+import sengeglove_cli as cli
+from generate_full_index import walk_sources
+from github_fetch import GitHubFetcher
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_ROOTS = [
+    os.path.join(REPO_DIR, "SenseGlove-Unity-master", "SenseGlove-Unity-master"),
+    os.path.join(REPO_DIR, "Assets", "SenseGlove"),
+]
+SCALES = [1, 10, 100]
+REPEAT = 3               # runs of each whole-corpus stage
+QUERIES = 200
+JOBS = 4                 # answer_query workers, as in --batch
+TOUCH = 0.01             # share of files modified before each update_index run
+SEED = 1234
+OUT_FILE = "bench_results.json"
+BENCH_INDEX = "senseglove_index_with_functions.json"   # relative: lives in the workdir
+REGRESSION = 0.10        # --compare flags changes worse than this
+
+_SG_NAME = re.compile(r"\b(SG(?:Ex)?_\w+)")
+
+PHRASES = [
+    "make the glove vibrate", "detect when an object is grabbed", "start calibration",
+    "track finger positions", "read the hand pose", "send a haptic command", "stop vibration",
+    "connect to the glove", "check the battery level", "get the wrist rotation",
+    "apply force feedback when grabbing", "snap an object to the hand", "release a held object",
+    "calibrate the thumb", "play haptics based on material", "add colliders to the fingers",
+    "keep the hand from clipping through objects", "offset the XR rig tracking",
+    "detect objects in a drop zone", "grab with two hands", "reset the hand pose",
+    "show the glove connection status", "play a custom waveform", "send an impact vibration",
+]
+TEMPLATES = ["How do I {}?", "{}", "Which script can {}?", "{} in SenseGlove"]
+
+
+# ---------- Corpora ----------
+
+def materialize_corpus(dest, scale):
+    """Copy the vendored sources into `dest` `scale` times; copy k renames SG_* names to SG_*_k<k>."""
+    files = 0
+    for root in CORPUS_ROOTS:
+        base = os.path.basename(root.rstrip(os.sep))
+        for local, rel in walk_sources([root]):
+            with open(local, "r", encoding="utf-8-sig", errors="ignore") as f:
+                code = f.read()
+            for k in range(scale):
+                rename = (lambda m: m.group(1)) if k == 0 else (lambda m, k=k: f"{m.group(1)}_k{k}")
+                out = os.path.join(dest, f"copy{k:03d}", base, *_SG_NAME.sub(rename, rel).split("/"))
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                with open(out, "w", encoding="utf-8") as f:
+                    f.write(_SG_NAME.sub(rename, code))
+                files += 1
+    return files
+
+
+def touch_files(root, count, rng, generation):
+    """Append a new method to `count` random files, as a commit would. Returns their paths."""
+    paths = sorted(local for local, _ in walk_sources([root]))
+    chosen = rng.sample(paths, min(count, len(paths)))
+    for path in chosen:
+        with open(path, "r", encoding="utf-8") as f:
+            code = f.read()
+        cut = code.rfind("}")
+        method = f"\n    public void BenchTouch{generation}() {{ }}\n"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(code[:cut] + method + code[cut:] if cut >= 0 else code + method)
+    return chosen
+
+
+def build_queries(data, count, rng):
+    """Unique natural-language and identifier questions over the loaded index."""
+    queries = [t.format(p) for p in PHRASES for t in TEMPLATES]
+    funcs = sorted({f["name"] for d in data for f in d.get("functions", [])
+                    if f.get("name") and f["name"] != "UnknownFunction"})
+    scripts = sorted({d["name"] for d in data})
+    for name in rng.sample(funcs, min(len(funcs), count)):
+        queries.append(f"Where is {name} defined?")
+    for name in rng.sample(scripts, min(len(scripts), count // 4)):
+        queries.append(name)
+    rng.shuffle(queries)
+    return queries[:count]
+
+
+# ---------- LLM stub ----------
+
+class StubLLM:
+    """Drop-in for llm_backend.LLMClient: a canned reply after an optional fixed delay."""
+
+    last_backend = "stub"
+    last_ttft = None
+    last_error = None
+
+    def __init__(self, reply=fake_ollama.DEFAULT_REPLY, delay=0.0):
+        self.reply = reply
+        self.delay = delay
+        self.prompt_chars = []
+
+    def generate(self, prompt, on_token=None, cancel=None):
+        self.prompt_chars.append(len(prompt))
+        if self.delay:
+            time.sleep(self.delay)
+        if on_token:
+            on_token(self.reply)
+        return self.reply
+
+
+# ---------- Measurement ----------
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the pipeline's status prints; a "❌" line means the stage failed."""
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        yield sink
+    failed = [line for line in sink.getvalue().splitlines() if line.startswith(("❌", "⚠️ Unexpected"))]
+    if failed:
+        raise RuntimeError(failed[0])
+
+
+def peak_memory_mb(fn, setup=None):
+    """Peak Python heap while running `fn` once (tracemalloc slows code down, so it is not timed)."""
+    if setup:
+        with quiet():
+            setup()
+    tracemalloc.start()
+    try:
+        with quiet():
+            fn()
+        return round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def run_stage(stage, items, unit, fn, setup=None, repeat=REPEAT, per_item=False, memory=True):
+    """Time `fn`. Whole-corpus stages run `repeat` times (latency = per run);
+    per-item stages run once and return one latency per item (ms)."""
+    if per_item:
+        start = time.perf_counter()
+        with quiet():
+            latencies = fn()
+        walls = [time.perf_counter() - start]
+    else:
+        latencies, walls = [], []
+        for _ in range(repeat):
+            if setup:
+                with quiet():
+                    setup()
+            start = time.perf_counter()
+            with quiet():
+                fn()
+            walls.append(time.perf_counter() - start)
+            latencies.append(walls[-1] * 1000)
+    wall = statistics.median(walls)
+    return {
+        "stage": stage,
+        "items": items,
+        "unit": unit,
+        "runs": len(walls),
+        "wall_s": round(wall, 4),
+        "throughput": round(items / wall, 2) if wall else 0.0,
+        "p50_ms": round(cli.percentile(latencies, 50), 3),
+        "p95_ms": round(cli.percentile(latencies, 95), 3),
+        "p99_ms": round(cli.percentile(latencies, 99), 3),
+        "peak_mem_mb": peak_memory_mb(fn, setup) if memory else None,
+    }
+
+
+def report(scale, result):
+    mem = f" · peak {result['peak_mem_mb']} MB" if result["peak_mem_mb"] is not None else ""
+    print(f"⏱️  x{scale:<3} {result['stage']:<28} {result['items']:>6} {result['unit'][:-2]} in "
+          f"{result['wall_s']:.3f} s — {result['throughput']} {result['unit']} · p50 {result['p50_ms']} ms "
+          f"· p95 {result['p95_ms']} ms · p99 {result['p99_ms']} ms{mem}")
+
+
+# ---------- Suite ----------
+
+def reset_index():
+    """Delete the index, its side files and the repo meta so the next build is cold."""
+    base, _ = os.path.splitext(BENCH_INDEX)
+    for name in os.listdir("."):
+        if name.startswith(base + ".") or name == github_updater.META_FILE:
+            os.remove(name)
+
+
+def warm_fake_repo(server):
+    """Snapshot and tarball the fake repo now, so fixture cost stays out of the timed run."""
+    commit = server.repo.snapshot()[0]
+    server.repo.tarball(f"{generate_full_index.REPO.replace('/', '-')}-{commit[:7]}")
+
+
+def bench_scale(scale, args, rng):
+    """Run every stage on one corpus scale; returns result dicts tagged with the scale."""
+    corpus = os.path.abspath(f"corpus_x{scale}")
+    shutil.rmtree(corpus, ignore_errors=True)
+    t0 = time.perf_counter()
+    n_files = materialize_corpus(corpus, scale)
+    print(f"📦 x{scale}: {n_files} files materialized in {time.perf_counter() - t0:.1f} s")
+    roots = [os.path.join(corpus, d) for d in sorted(os.listdir(corpus))]
+    results = []
+
+    def record(result, **extra):
+        result.update(extra)
+        result["scale"] = scale
+        results.append(result)
+        report(scale, result)
+
+    # extract_functions: parse + describe one file at a time, in process.
+    sources = []
+    for local, _ in walk_sources(roots):
+        with open(local, "r", encoding="utf-8") as f:
+            sources.append(f.read())
+
+    def extract_all():
+        latencies = []
+        for code in sources:
+            t = time.perf_counter()
+            generate_full_index.extract_functions(code)
+            latencies.append((time.perf_counter() - t) * 1000)
+        return latencies
+
+    record(run_stage("extract_functions", n_files, "files/s", extract_all, per_item=True, memory=args.memory))
+
+    # generate_index from local checkouts: cold, then with nothing changed.
+    record(run_stage("generate_index (local)", n_files, "files/s",
+                     lambda: generate_full_index.generate_local_index(roots, jobs=args.index_jobs),
+                     setup=reset_index, repeat=args.repeat, memory=args.memory))
+    record(run_stage("generate_index (unchanged)", n_files, "files/s",
+                     lambda: generate_full_index.generate_local_index(roots, jobs=args.index_jobs),
+                     repeat=args.repeat, memory=args.memory))
+
+    # generate_index / update_index against a fake GitHub serving the corpus.
+    server, url = fake_github.start_server(corpus, latency=args.github_latency)
+    try:
+        fetcher = GitHubFetcher(generate_full_index.REPO, token="", api_base=url)
+        generate_full_index.fetcher = fetcher
+        github_updater._fetcher = fetcher
+
+        def cold_github():
+            reset_index()
+            warm_fake_repo(server)
+            fetcher.requests_made = 0
+
+        record(run_stage("generate_index (github)", n_files, "files/s", generate_full_index.generate_index,
+                         setup=cold_github, repeat=args.repeat, memory=args.memory),
+               github_requests=fetcher.requests_made)
+
+        touched = max(1, int(n_files * args.touch))
+        generation = iter(range(1, 1_000_000))
+
+        def modify_repo():
+            touch_files(corpus, touched, rng, next(generation))
+            warm_fake_repo(server)
+            fetcher.requests_made = 0
+
+        record(run_stage("update_index", touched, "files/s", github_updater.update_index,
+                         setup=modify_repo, repeat=args.repeat, memory=args.memory),
+               github_requests=fetcher.requests_made, corpus_files=n_files)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # load_index: the first load warms the OS file cache, so it is not timed.
+    with quiet():
+        cli.load_index()
+    record(run_stage("load_index", n_files, "files/s", cli.load_index, repeat=args.repeat, memory=args.memory))
+
+    with quiet():
+        data = cli.load_index()
+        cli.build_context("warm up", data)   # lexical + vector side indexes
+    queries = build_queries(data, args.queries, rng)
+    llm = cli.llm
+
+    tokens_saved = []
+
+    def search_all():
+        latencies = []
+        for q in queries:
+            t = time.perf_counter()
+            cli.smart_search(q, data)
+            latencies.append((time.perf_counter() - t) * 1000)
+            tokens_saved.append(cli.prompts.last_stats.get("tokens_saved", 0))
+        return latencies
+
+    prompt_from = len(getattr(llm, "prompt_chars", []))
+    record(run_stage("smart_search", len(queries), "queries/s", search_all, per_item=True, memory=args.memory),
+           prompt_tokens_saved_p50=cli.percentile(tokens_saved, 50),
+           **({"prompt_chars_p50": cli.percentile(llm.prompt_chars[prompt_from:], 50)}
+              if isinstance(llm, StubLLM) else {}))
+
+    sources_seen = {}
+
+    def batch_all():
+        cli.cache.clear()
+        out = io.StringIO()
+        sources_seen.update(cli.run_batch(iter(enumerate(queries)), data, out, jobs=args.jobs)["sources"])
+        return [json.loads(line)["latency_ms"] for line in out.getvalue().splitlines()]
+
+    record(run_stage("answer_query", len(queries), "queries/s", batch_all, per_item=True, memory=args.memory),
+           jobs=args.jobs, sources=sources_seen)
+
+    shutil.rmtree(corpus, ignore_errors=True)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(old_file, results, threshold=REGRESSION):
+    """Print throughput / p50 changes against an earlier results file."""
+    with open(old_file, "r", encoding="utf-8") as f:
+        old = {(r["scale"], r["stage"]): r for r in json.load(f)["results"]}
+    print(f"\n📈 Compared with {old_file}:")
+    for r in results:
+        before = old.get((r["scale"], r["stage"]))
+        if not before or not before["throughput"] or not before["p50_ms"]:
+            continue
+        d_tp = r["throughput"] / before["throughput"] - 1
+        d_p50 = r["p50_ms"] / before["p50_ms"] - 1
+        flag = "⚠️ " if d_tp < -threshold or d_p50 > threshold else "   "
+        print(f"{flag} x{r['scale']:<3} {r['stage']:<28} throughput {d_tp:+.1%} · p50 {d_p50:+.1%}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark indexing, loading, retrieval and query latency.")
+    ap.add_argument("--scales", type=int, nargs="+", default=SCALES, help="corpus multiples (default: 1 10 100)")
+    ap.add_argument("--repeat", type=int, default=REPEAT, help="runs of each whole-corpus stage")
+    ap.add_argument("--queries", type=int, default=QUERIES)
+    ap.add_argument("--jobs", type=int, default=JOBS, help="answer_query workers")
+    ap.add_argument("--index-jobs", type=int, default=None, help="parser processes (default: CPU count)")
+    ap.add_argument("--touch", type=float, default=TOUCH, help="share of files changed per update_index run")
+    ap.add_argument("--llm", choices=["stub", "fake-ollama"], default="stub",
+                    help="in-process stub, or llm_backend over HTTP to fake_ollama.py")
+    ap.add_argument("--llm-delay", type=float, default=0.0, help="seconds per stub answer / per streamed token")
+    ap.add_argument("--github-latency", type=float, default=0.0, help="seconds added to each fake GitHub response")
+    ap.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc passes")
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--out", default=OUT_FILE)
+    ap.add_argument("--compare", metavar="OLD_JSON", help="print changes against an earlier --out file")
+    ap.add_argument("--workdir", help="keep corpora and indexes here instead of a temp dir")
+    args = ap.parse_args(argv)
+
+    out_file = os.path.abspath(args.out)
+    old_file = os.path.abspath(args.compare) if args.compare else None
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="sg_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    cwd = os.getcwd()
+    # Index, cache, meta and history files are relative paths: run everything inside the workdir.
+    os.chdir(workdir)
+    # Never touch a real index, even when SENSEGLOVE_INDEX points at one.
+    cli.INDEX_FILE = generate_full_index.OUT_FILE = github_updater.INDEX_FILE = BENCH_INDEX
+    fake_llm = None
+    if args.llm == "stub":
+        cli.llm = StubLLM(delay=args.llm_delay)
+    else:
+        fake_llm, llm_url = fake_ollama.start_server(token_delay=args.llm_delay)
+        cli.llm = llm_backend.LLMClient(cli.OLLAMA_MODEL, None, host=llm_url)
+    try:
+        print(f"🏁 Benchmarking scales {args.scales} in {workdir}")
+        results = []
+        for scale in args.scales:
+            results += bench_scale(scale, args, random.Random(args.seed + scale))
+    finally:
+        if fake_llm is not None:
+            fake_llm.shutdown()
+            fake_llm.server_close()
+        cli.cache.close()
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    run = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(out_file, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"💾 Results written to {out_file}")
+    if old_file:
+        compare(old_file, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# cpp_parser.py
+# ---------------------------------------------------------
+# Single-pass C++ header declaration scanner, the native-API
+# counterpart of csharp_parser.py (same declaration dicts).
+# - Classes, structs, unions and enums, including out-of-line
+#   definitions (class SGCORE_API SGCore::HapticGlove : ...);
+#   forward declarations are ignored
+# - Methods, constructors, destructors and operators with
+#   access (public:/private:), virtual/static/const/override,
+#   pure virtual (= 0); free functions at namespace level
+# - Export/attribute macros (SGCORE_API, SG_NODISCARD) and
+#   template<...> prefixes are dropped from signatures
+# - /// <summary> and /** ... */ doc comments; the file's
+#   @section DESCRIPTION becomes the entry summary
+# - Inline bodies are skipped without tokenizing them
+# - scan_references() lists calls, `new T` and type names for
+#   xref.py, like the C# scanner but with C++ literals (raw
+#   strings, digit separators), casts and macros left out
+#
+#   python cpp_parser.py --bench [PATH ...]
+# ---------------------------------------------------------
+
+import os
+import re
+import sys
+import time
+
+from source_lexer import clean_doc, join_tokens, line_index, scan_identifiers, skip_block
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<doc>///[^\n]*|//![^\n]*|/\*\*(?!/).*?\*/)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<pre>\#(?:\\\n|[^\n])*)
+    | (?P<str>[uUL8]*R"([^(\s]*)\(.*?\)\2"|[uUL8]*"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    | (?P<word>[A-Za-z_]\w*)
+    | (?P<num>\d[\w.']*)
+    | (?P<op>::|->|[^\s\w])
+    )""", re.S | re.X)
+
+_BODY = re.compile(r"""
+      [{}]
+    | //[^\n]*
+    | /\*.*?\*/
+    | \#(?:\\\n|[^\n])*
+    | [uUL8]*R"([^(\s]*)\(.*?\)\1"
+    | "(?:[^"\\\n]|\\.)*"
+    | '(?:[^'\\\n]|\\.)*'
+    """, re.S | re.X)
+
+# Identifiers outside comments / strings / preprocessor lines; `call` is set when "(" (or "<...>(") follows.
+_REF = re.compile(r"""
+      //[^\n]*
+    | /\*.*?\*/
+    | \#(?:\\\n|[^\n])*
+    | [uUL8]*R"([^(\s]*)\(.*?\)\1"
+    | [uUL8]*"(?:[^"\\\n]|\\.)*"
+    | '(?:[^'\\\n]|\\.)*'
+    | \d[\w.']*
+    | (?P<word>[A-Za-z_]\w*)(?P<call>(?=\s*(?:<[\w\s,:<>*&]*>)?\s*\())?
+    """, re.S | re.X)
+
+_DESCRIPTION = re.compile(r"@section\s+DESCRIPTION\s*(.*?)(?:@section|\*/)", re.S)
+
+PARSER_VERSION = 2  # bump when entry fields change so cached entries are re-parsed
+
+TYPE_KEYWORDS = {"class", "struct", "union", "enum"}
+ACCESS = {"public", "private", "protected"}
+MODIFIERS = {
+    "static", "virtual", "inline", "explicit", "constexpr", "consteval", "friend",
+    "extern", "mutable", "volatile",
+}
+TRAILING = {"const", "override", "final", "noexcept"}
+NOT_A_NAME = {
+    "if", "for", "while", "switch", "return", "sizeof", "alignof", "decltype",
+    "static_assert", "typedef", "using", "catch", "throw", "new", "delete",
+}
+
+
+# ---------- Helpers ----------
+
+def _is_macro(word):
+    """SGCORE_API, SG_NODISCARD, ...: all-caps with an underscore."""
+    return "_" in word and word.isupper()
+
+
+def _doc_text(comment):
+    """Text of one doc comment with markers, leading '*' and @tags removed."""
+    if comment.startswith("/**"):
+        lines = [re.sub(r"^\s*\*+\s?", "", l) for l in comment[3:-2].splitlines()]
+    else:
+        lines = [comment[3:]]
+    return " ".join(l for l in lines if not l.lstrip().startswith(("@", "\\")))
+
+
+def _strip_prefix(tokens):
+    """Drop template<...> and [[attribute]] prefixes from a header."""
+    while tokens:
+        if tokens[0][1] == "template" and len(tokens) > 1 and tokens[1][1] == "<":
+            depth, i = 0, 1
+            while i < len(tokens):
+                depth += (tokens[i][1] == "<") - (tokens[i][1] == ">")
+                i += 1
+                if depth == 0:
+                    break
+            tokens = tokens[i:]
+        elif tokens[0][1] == "[" and len(tokens) > 1 and tokens[1][1] == "[":
+            end = next((i for i in range(2, len(tokens) - 1)
+                        if tokens[i][1] == "]" and tokens[i + 1][1] == "]"), len(tokens) - 2)
+            tokens = tokens[end + 2:]
+        else:
+            return tokens
+    return tokens
+
+
+def _parse_type(tokens):
+    """(keyword, name, qualifier, bases) if the header declares a class/struct/union/enum."""
+    for i, (kind, text, _, _) in enumerate(tokens):
+        if text in ("(", "=", ";"):
+            return None
+        if kind != "word" or text not in TYPE_KEYWORDS:
+            continue
+        j = i + 1
+        if text == "enum" and j < len(tokens) and tokens[j][1] in ("class", "struct"):
+            j += 1
+        while j < len(tokens) and tokens[j][0] == "word" and _is_macro(tokens[j][1]):
+            j += 1
+        parts = []
+        while j < len(tokens) and tokens[j][0] == "word":
+            parts.append(tokens[j][1])
+            if j + 1 < len(tokens) and tokens[j + 1][1] == "::":
+                j += 2
+            else:
+                j += 1
+                break
+        if not parts:
+            return None   # anonymous struct / enum
+        bases, depth, current = [], 0, []
+        colon = next((k for k in range(j, len(tokens)) if tokens[k][1] == ":"), None)
+        for t in (tokens[colon + 1:] if colon is not None and text != "enum" else []):
+            depth += (t[1] == "<") - (t[1] == ">")
+            if t[1] == "," and depth == 0:
+                bases.append(join_tokens(current))
+                current = []
+            elif not (t[1] in ACCESS or t[1] == "virtual"):
+                current.append(t)
+        if current:
+            bases.append(join_tokens(current))
+        return text, parts[-1], "::".join(parts[:-1]), bases
+    return None
+
+
+def _parse_method(tokens, owner):
+    """(kind, name, modifiers, return_type, close) if the header is a function, else None."""
+    words = [t[1] for t in tokens]
+    paren = next((i for i, w in enumerate(words) if w == "("), None)
+    if paren is None or paren == 0:
+        return None
+    if "operator" in words[:paren]:
+        name_at = words.index("operator")
+        if words[paren:paren + 2] == ["(", ")"] and paren == name_at + 1:
+            paren += 2           # operator()(...)
+        name = "operator" + ("" if tokens[name_at + 1][0] != "word" else " ") + "".join(words[name_at + 1:paren])
+    else:
+        if "=" in words[:paren]:
+            return None          # member initializer
+        name_at = paren - 1
+        if tokens[name_at][0] != "word" or tokens[name_at][1] in NOT_A_NAME or _is_macro(tokens[name_at][1]):
+            return None
+        name = tokens[name_at][1]
+        if name_at > 0 and words[name_at - 1] == "~":
+            name_at -= 1
+            name = "~" + name
+    head = tokens[:name_at]
+    while len(head) >= 2 and head[-1][1] == "::":   # out-of-line Owner::Method
+        head = head[:-2]
+
+    modifiers, rest = [], []
+    for t in head:
+        if t[1] in MODIFIERS:
+            modifiers.append(t[1])
+        elif not (t[0] == "word" and _is_macro(t[1])):
+            rest.append(t)
+
+    depth, close = 0, len(tokens) - 1
+    for j in range(paren, len(tokens)):
+        depth += (tokens[j][1] == "(") - (tokens[j][1] == ")")
+        if depth == 0:
+            close = j
+            break
+    tail = words[close + 1:]
+    modifiers += [w for w in tail if w in TRAILING]
+    if "=" in tail and tail[tail.index("=") + 1:tail.index("=") + 2] == ["0"]:
+        modifiers.append("pure")
+
+    short_owner = owner.rsplit(".", 1)[-1] if owner else None
+    if name.startswith("~"):
+        kind, return_type = "destructor", ""
+    elif not rest:
+        if name != short_owner:
+            return None          # macro invocation, not a declaration
+        kind, return_type = "constructor", ""
+    else:
+        kind, return_type = "method", join_tokens(rest)
+    return kind, name, modifiers, return_type, close
+
+
+# ---------- Public API ----------
+
+def scan_declarations(code):
+    """Scan a C++ header; same dict shape as csharp_parser.scan_declarations()."""
+    line_of = line_index(code)
+    decls = []
+    scopes = []          # (kind, name, decl, access) for namespace/type/extern scopes
+    header, doc = [], []
+    match = _TOKEN.match
+    pos, n = 0, len(code)
+
+    def owner_name():
+        return ".".join(s[1] for s in scopes if s[0] == "type")
+
+    def namespace_name(extra=""):
+        parts = [s[1] for s in scopes if s[0] == "namespace" and s[1]]
+        return "::".join(parts + ([extra] if extra else []))
+
+    def emit_function(tokens, end, access):
+        in_type = bool(scopes) and scopes[-1][0] == "type"
+        info = _parse_method(tokens, owner_name() if in_type else "")
+        if info is None:
+            return None
+        kind, name, modifiers, return_type, close = info
+        start = tokens[0][2]
+        decl = {
+            "kind": kind,
+            "name": name,
+            "owner": owner_name() if in_type else "",
+            "namespace": namespace_name(),
+            "modifiers": ([access] if access else []) + modifiers,
+            "return_type": return_type,
+            "signature": " ".join(code[start:tokens[close][3]].split()),
+            "start_line": line_of(start),
+            "end_line": line_of(end),
+            "doc": clean_doc(doc),
+        }
+        decls.append(decl)
+        return decl
+
+    def emit_type(tokens, type_info, brace):
+        keyword, name, qualifier, bases = type_info
+        decl = {
+            "kind": keyword,
+            "name": name,
+            "owner": owner_name(),
+            "namespace": namespace_name(qualifier),
+            "modifiers": [],
+            "return_type": "",
+            "bases": bases,
+            "signature": " ".join(code[tokens[0][2]:brace].split()),
+            "start_line": line_of(tokens[0][2]),
+            "end_line": None,
+            "doc": clean_doc(doc),
+        }
+        decls.append(decl)
+        return decl
+
+    while pos < n:
+        m = match(code, pos)
+        if m is None:
+            break
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "doc":
+            doc.append(_doc_text(m.group(kind)))
+            continue
+        if kind in ("comment", "pre") or kind is None:
+            continue
+        text = m.group(kind)
+        scope = scopes[-1] if scopes else None
+        in_type = scope is not None and scope[0] == "type"
+        access = scope[3] if in_type else None
+
+        if text == ":" and in_type and len(header) == 1 and header[0][1] in ACCESS:
+            scopes[-1] = scope[:3] + (header[0][1],)
+            header, doc = [], []
+        elif text == "{":
+            tokens = _strip_prefix(header)
+            type_info = _parse_type(tokens) if tokens else None
+            if tokens and tokens[0][1] == "namespace":
+                scopes.append(("namespace", "::".join(t[1] for t in tokens[1:] if t[0] == "word"), None, None))
+            elif tokens and tokens[0][1] == "extern" and len(tokens) == 2:
+                scopes.append(("extern", "", None, None))      # extern "C" { ... }
+            elif type_info and type_info[0] != "enum":
+                decl = emit_type(tokens, type_info, m.start(kind))
+                default = "private" if type_info[0] == "class" else "public"
+                scopes.append(("type", type_info[1], decl, default))
+            else:
+                # Function body, enum, or brace initializer: skip it whole.
+                decl = None
+                if type_info:
+                    decl = emit_type(tokens, type_info, m.start(kind))
+                elif tokens:
+                    decl = emit_function(tokens, pos, access)
+                pos = skip_block(code, pos, _BODY)
+                if decl is not None:
+                    decl["end_line"] = line_of(pos - 1)
+            header, doc = [], []
+        elif text == "}":
+            if scopes:
+                decl = scopes.pop()[2]
+                if decl is not None:
+                    decl["end_line"] = line_of(pos - 1)
+            header, doc = [], []
+        elif text == ";":
+            tokens = _strip_prefix(header)
+            if tokens:
+                emit_function(tokens, pos - 1, access)   # declaration without body
+            header, doc = [], []
+        else:
+            header.append((kind, text, m.start(kind), pos))
+
+    return decls
+
+
+def split_declarations(decls):
+    """(type declarations, function/constructor declarations) out of scan_declarations()."""
+    types = [d for d in decls if d["kind"] in TYPE_KEYWORDS]
+    methods = [d for d in decls if d["kind"] in ("method", "constructor", "destructor")]
+    return types, methods
+
+
+_NOT_CALLED = NOT_A_NAME | MODIFIERS | TRAILING | {
+    "static_cast", "dynamic_cast", "const_cast", "reinterpret_cast", "alignas", "operator", "defined",
+}
+
+
+def scan_references(code):
+    """[(name, kind, line)] for identifiers `code` uses, as csharp_parser.scan_references();
+    export / attribute macros (SGCORE_API, ...) are dropped."""
+    return [r for r in scan_identifiers(code, _REF, _NOT_CALLED) if not _is_macro(r[0])]
+
+
+def file_summary(code):
+    """The header's `@section DESCRIPTION` text, or ""."""
+    m = _DESCRIPTION.search(code[:4000])
+    if not m:
+        return ""
+    return " ".join(re.sub(r"^\s*\*+\s?", "", l) for l in m.group(1).splitlines()).strip()
+
+
+# ---------- Benchmark ----------
+
+DEFAULT_CORPUS = [os.path.join("SenseGlove-API-master", "SenseGlove-API-master", "include")]
+
+
+def _bench(paths, repeat=5):
+    files = []
+    for root in paths:
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                if name.endswith((".hpp", ".h")):
+                    with open(os.path.join(dirpath, name), encoding="utf-8-sig", errors="ignore") as f:
+                        files.append(f.read())
+    lines = sum(c.count("\n") for c in files)
+    print(f"📚 Corpus: {len(files)} headers, {lines} lines")
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        decls = [split_declarations(scan_declarations(c)) for c in files]
+        best = min(best, time.perf_counter() - t0)
+    print(f"⏱️  scanner : {best * 1000:8.1f} ms  {sum(len(t) for t, _ in decls):5d} types, "
+          f"{sum(len(m) for _, m in decls):5d} functions")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        _bench(sys.argv[2:] or [p for p in DEFAULT_CORPUS if os.path.isdir(p)])
+    else:
+        for path in sys.argv[1:]:
+            with open(path, encoding="utf-8-sig", errors="ignore") as f:
+                for d in scan_declarations(f.read()):
+                    print(f"{d['start_line']:5d}-{d['end_line']:<5d} {d['kind']:<11} "
+                          f"{(d['owner'] + '.') if d['owner'] else ''}{d['name']}  |  "
+                          f"{' '.join(d['modifiers'])}  |  {d['signature']}")
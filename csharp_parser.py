@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# csharp_parser.py
+# ---------------------------------------------------------
+# Single-pass C# declaration scanner shared by
+# generate_full_index.py and github_updater.py.
+# - Tokenizes declaration headers; skips comments, strings,
+#   chars and preprocessor lines
+# - Tracks brace depth so methods are attached to their
+#   class / namespace, and jumps over method bodies without
+#   tokenizing them (linear in file size)
+# - Emits signature, return type, modifiers, line span and
+#   XML doc summary for every type, method and constructor
+# - scan_references() lists the identifiers a file uses (calls,
+#   `new T`, type names) with their lines, for xref.py
+#
+# Benchmark against the old regex:
+#   python csharp_parser.py --bench [PATH ...]
+# ---------------------------------------------------------
+
+import os
+import re
+import sys
+import time
+
+from source_lexer import clean_doc, join_tokens, line_index, scan_identifiers, skip_block
+
+# Full tokenizer, used only at namespace / type level.
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<doc>///[^\n]*)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<pre>\#[^\n]*)
+    | (?P<str>(?:\$@|@\$|@)"(?:[^"]|"")*"|\$?"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    | (?P<word>@?[A-Za-z_]\w*)
+    | (?P<num>\d[\w.]*)
+    | (?P<op>=>|[^\s\w])
+    )""", re.S | re.X)
+
+# Inside bodies only braces matter; everything that could hide a brace is skipped whole.
+_BODY = re.compile(r"""
+      [{}]
+    | //[^\n]*
+    | /\*.*?\*/
+    | (?:\$@|@\$|@)"(?:[^"]|"")*"
+    | \$?"(?:[^"\\\n]|\\.)*"
+    | '(?:[^'\\\n]|\\.)*'
+    """, re.S | re.X)
+
+# Identifiers outside comments / strings; `call` is set when "(" (or "<...>(") follows.
+_REF = re.compile(r"""
+      //[^\n]*
+    | /\*.*?\*/
+    | \#[^\n]*
+    | (?:\$@|@\$|@)"(?:[^"]|"")*"
+    | \$?"(?:[^"\\\n]|\\.)*"
+    | '(?:[^'\\\n]|\\.)*'
+    | \d[\w.]*
+    | (?P<word>@?[A-Za-z_]\w*)(?P<call>(?=\s*(?:<[\w\s,.<>\[\]?]*>)?\s*\())?
+    """, re.S | re.X)
+
+PARSER_VERSION = 3  # bump when entry fields change so cached entries are re-parsed
+
+TYPE_KEYWORDS = {"class", "struct", "interface", "enum", "record"}
+MODIFIERS = {
+    "public", "private", "protected", "internal", "static", "virtual", "override",
+    "abstract", "sealed", "extern", "unsafe", "async", "partial", "readonly", "new",
+    "volatile", "const", "ref",
+}
+NOT_A_NAME = {
+    "if", "for", "foreach", "while", "switch", "using", "lock", "return", "new",
+    "typeof", "nameof", "sizeof", "default", "base", "this", "catch", "fixed",
+}
+
+
+# ---------- Helpers ----------
+
+def _strip_attributes(tokens):
+    """Drop leading [Attribute(...)] groups from a header."""
+    i = 0
+    while i < len(tokens) and tokens[i][1] == "[":
+        depth = 0
+        while i < len(tokens):
+            t = tokens[i][1]
+            depth += (t == "[") - (t == "]")
+            i += 1
+            if depth == 0:
+                break
+    return tokens[i:]
+
+
+def _parse_type(tokens):
+    """(keyword, name, modifiers, bases) if the header declares a type."""
+    for i, (kind, text, _, _) in enumerate(tokens):
+        if text in ("(", "=", "=>"):
+            return None
+        if kind == "word" and text in TYPE_KEYWORDS and i + 1 < len(tokens):
+            name = tokens[i + 1][1]
+            modifiers = [t[1] for t in tokens[:i] if t[1] in MODIFIERS]
+            bases, depth, current = [], 0, []
+            rest = tokens[i + 2:]
+            colon = next((j for j, t in enumerate(rest) if t[1] == ":"), None)
+            for t in (rest[colon + 1:] if colon is not None else []):
+                if t[1] == "where" and depth == 0:
+                    break
+                depth += (t[1] == "<") - (t[1] == ">")
+                if t[1] == "," and depth == 0:
+                    bases.append(join_tokens(current))
+                    current = []
+                else:
+                    current.append(t)
+            if current:
+                bases.append(join_tokens(current))
+            return text, name, modifiers, bases
+    return None
+
+
+def _parse_method(tokens, owner):
+    """Return method info if the header is a method/constructor, else None."""
+    paren = next((i for i, t in enumerate(tokens) if t[1] == "("), None)
+    if paren is None or paren == 0:
+        return None
+    before = tokens[:paren]
+    words = {t[1] for t in before if t[0] == "word"}
+    if "delegate" in words or "event" in words:
+        return None
+
+    if "operator" in words:
+        op_at = max(i for i, t in enumerate(before) if t[1] == "operator")
+        name = "operator " + "".join(t[1] for t in before[op_at + 1:])
+        name_at = op_at
+    else:
+        if any(t[1] in ("=", "=>") for t in before):
+            return None  # field / property initializer
+        name_at = paren - 1
+        if tokens[name_at][1] == ">":  # generic method: Foo<T>(...)
+            depth = 0
+            while name_at >= 0:
+                depth += (tokens[name_at][1] == ">") - (tokens[name_at][1] == "<")
+                name_at -= 1
+                if depth == 0:
+                    break
+        if name_at < 0 or tokens[name_at][0] != "word" or tokens[name_at][1] in NOT_A_NAME:
+            return None
+        name = tokens[name_at][1].lstrip("@")
+
+    head = before[:name_at]
+    modifiers, i = [], 0
+    while i < len(head) and head[i][1] in MODIFIERS:
+        modifiers.append(head[i][1])
+        i += 1
+    rest = head[i:]
+
+    kind = "method"
+    if not rest or [t[1] for t in rest] == ["~"]:
+        short_owner = owner.rsplit(".", 1)[-1] if owner else None
+        if name != short_owner:
+            return None
+        kind = "constructor" if not rest else "destructor"
+        if rest:
+            name = "~" + name
+        return_type = ""
+    else:
+        return_type = join_tokens(rest)
+        if "operator" in words and rest[-1][1] in ("implicit", "explicit"):
+            modifiers.append(rest[-1][1])
+            return_type = name.split(" ", 1)[1]
+
+    depth, close = 0, len(tokens) - 1
+    for j in range(paren, len(tokens)):
+        depth += (tokens[j][1] == "(") - (tokens[j][1] == ")")
+        if depth == 0:
+            close = j
+            break
+    return kind, name, modifiers, return_type, close
+
+
+# ---------- Public API ----------
+
+def scan_declarations(code):
+    """Scan C# source and return a list of declaration dicts, in source order.
+
+    Each dict has: kind, name, owner, namespace, modifiers, return_type,
+    signature, start_line, end_line, doc (and bases for types).
+    """
+    line_of = line_index(code)
+    decls = []
+    scopes = []          # (kind, name, decl) for namespace/type scopes
+    header, doc = [], []
+    match = _TOKEN.match
+    pos, n = 0, len(code)
+
+    def owner_name():
+        return ".".join(s[1] for s in scopes if s[0] == "type")
+
+    def namespace_name():
+        return ".".join(s[1] for s in scopes if s[0] == "namespace")
+
+    def emit_method(tokens, end):
+        info = _parse_method(tokens, owner_name())
+        if info is None:
+            return None
+        kind, name, modifiers, return_type, close = info
+        start = tokens[0][2]
+        decl = {
+            "kind": kind,
+            "name": name,
+            "owner": owner_name(),
+            "namespace": namespace_name(),
+            "modifiers": modifiers,
+            "return_type": return_type,
+            "signature": " ".join(code[start:tokens[close][3]].split()),
+            "start_line": line_of(start),
+            "end_line": line_of(end),
+            "doc": clean_doc(doc),
+        }
+        decls.append(decl)
+        return decl
+
+    def emit_type(tokens, type_info, brace):
+        keyword, name, modifiers, bases = type_info
+        decl = {
+            "kind": keyword,
+            "name": name,
+            "owner": owner_name(),
+            "namespace": namespace_name(),
+            "modifiers": modifiers,
+            "return_type": "",
+            "bases": bases,
+            "signature": " ".join(code[tokens[0][2]:brace].split()),
+            "start_line": line_of(tokens[0][2]),
+            "end_line": None,
+            "doc": clean_doc(doc),
+        }
+        decls.append(decl)
+        return decl
+
+    while pos < n:
+        m = match(code, pos)
+        if m is None:
+            break
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "doc":
+            doc.append(m.group(kind)[3:])
+            continue
+        if kind in ("comment", "pre") or kind is None:
+            continue
+        text = m.group(kind)
+
+        if text == "{":
+            tokens = _strip_attributes(header)
+            in_type = bool(scopes) and scopes[-1][0] == "type"
+            type_info = _parse_type(tokens) if tokens else None
+            if tokens and tokens[0][1] == "namespace":
+                scopes.append(("namespace", "".join(t[1] for t in tokens[1:]), None))
+            elif type_info and type_info[0] != "enum":
+                decl = emit_type(tokens, type_info, m.start(kind))
+                scopes.append(("type", type_info[1], decl))
+            else:
+                # Member body, enum, property accessors or initializer: skip it whole.
+                decl = None
+                if type_info:
+                    decl = emit_type(tokens, type_info, m.start(kind))
+                elif tokens and in_type:
+                    decl = emit_method(tokens, pos)
+                pos = skip_block(code, pos, _BODY)
+                if decl is not None:
+                    decl["end_line"] = line_of(pos - 1)
+            header, doc = [], []
+        elif text == "}":
+            if scopes:
+                _, _, decl = scopes.pop()
+                if decl is not None:
+                    decl["end_line"] = line_of(pos - 1)
+            header, doc = [], []
+        elif text == ";":
+            tokens = _strip_attributes(header)
+            if tokens and tokens[0][1] == "namespace":
+                # file-scoped namespace: applies to the rest of the file
+                scopes.append(("namespace", "".join(t[1] for t in tokens[1:]), None))
+            elif tokens and scopes and scopes[-1][0] == "type":
+                emit_method(tokens, pos - 1)  # abstract / interface / expression-bodied
+            header, doc = [], []
+        else:
+            header.append((kind, text, m.start(kind), pos))
+
+    return decls
+
+
+def parse_csharp(code):
+    """Return (type names, method/constructor declarations) for one file."""
+    types, methods = split_declarations(scan_declarations(code))
+    return [t["name"] for t in types], methods
+
+
+def split_declarations(decls):
+    """(type declarations, method/constructor declarations) out of scan_declarations()."""
+    types = [d for d in decls if d["kind"] in TYPE_KEYWORDS]
+    methods = [d for d in decls if d["kind"] in ("method", "constructor", "destructor")]
+    return types, methods
+
+
+def to_type_entry(decl):
+    """Index entry for one class/struct/interface/enum: where it is declared."""
+    return {
+        "name": decl["name"],
+        "kind": decl["kind"],
+        "namespace": decl["namespace"],
+        "start_line": decl["start_line"],
+        "end_line": decl["end_line"],
+    }
+
+
+def to_function_entry(decl, fallback_description):
+    """Index entry for one method; prefers the XML doc summary as description."""
+    doc = decl["doc"]
+    description = (doc[:200] + "…" if len(doc) > 200 else doc) or fallback_description
+    return {
+        "name": decl["name"],
+        "description": description,
+        "signature": decl["signature"],
+        "return_type": decl["return_type"],
+        "modifiers": decl["modifiers"],
+        "class": decl["owner"],
+        "kind": decl["kind"],
+        "start_line": decl["start_line"],
+        "end_line": decl["end_line"],
+    }
+
+
+_NOT_CALLED = NOT_A_NAME | MODIFIERS
+
+
+def scan_references(code):
+    """[(name, kind, line)] for identifiers `code` uses: kind "call" for Name(...),
+    "new" for `new Name`, "name" for other capitalized names (types, static members)."""
+    return scan_identifiers(code, _REF, _NOT_CALLED)
+
+
+# ---------- Benchmark ----------
+
+LEGACY_FUNC = re.compile(
+    r"(?:public|private|protected|internal)?\s*(?:static\s+)?"
+    r"(?:void|int|float|bool|string|\w+)\s+([A-Za-z0-9_]+)\s*\("
+)
+LEGACY_CLASS = re.compile(r"class\s+([A-Za-z0-9_]+)")
+
+DEFAULT_CORPUS = ["SenseGlove-Unity-master", os.path.join("Assets", "SenseGlove", "Scripts")]
+
+
+def _bench(paths, repeat=5):
+    files = []
+    for root in paths:
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                if name.endswith(".cs"):
+                    with open(os.path.join(dirpath, name), encoding="utf-8-sig", errors="ignore") as f:
+                        files.append(f.read())
+    lines = sum(c.count("\n") for c in files)
+    print(f"📚 Corpus: {len(files)} files, {lines} lines")
+
+    def timed(fn):
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = [fn(c) for c in files]
+            best = min(best, time.perf_counter() - t0)
+        return best, out
+
+    t_regex, legacy = timed(lambda c: (LEGACY_CLASS.findall(c), LEGACY_FUNC.findall(c)))
+    t_scan, scanned = timed(parse_csharp)
+
+    legacy_funcs = sum(len(f) for _, f in legacy)
+    scan_funcs = sum(len(f) for _, f in scanned)
+    false_pos = sum(
+        len([name for name in lf if name not in {d["name"] for d in sm}])
+        for (_, lf), (_, sm) in zip(legacy, scanned)
+    )
+    print(f"⏱️  regex   : {t_regex * 1000:8.1f} ms  {legacy_funcs:5d} functions "
+          f"({false_pos} are calls/fields/keywords, not declarations)")
+    print(f"⏱️  scanner : {t_scan * 1000:8.1f} ms  {scan_funcs:5d} declarations "
+          f"with signature, owner, lines and doc")
+    print(f"🚀 Speed-up: {t_regex / t_scan:.1f}×")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        _bench(sys.argv[2:] or [p for p in DEFAULT_CORPUS if os.path.isdir(p)])
+    else:
+        for path in sys.argv[1:]:
+            with open(path, encoding="utf-8-sig", errors="ignore") as f:
+                for d in scan_declarations(f.read()):
+                    print(f"{d['start_line']:5d}-{d['end_line']:<5d} {d['kind']:<11} "
+                          f"{(d['owner'] + '.') if d['owner'] else ''}{d['name']}  |  {d['signature']}")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# fake_github.py
+# ---------------------------------------------------------
+# Local stand-in for the parts of the GitHub REST API the
+# indexers use, serving a directory on disk as a repository:
+#   /repos/<owner>/<repo>/commits/<ref>
+#   /repos/<owner>/<repo>/git/trees/<ref>?recursive=1
+#   /repos/<owner>/<repo>/git/blobs/<sha>
+#   /repos/<owner>/<repo>/contents/<path>
+#   /repos/<owner>/<repo>/tarball/<ref>
+# Sends X-RateLimit-* headers and can add artificial latency.
+# Answers carry an ETag; a matching If-None-Match gets 304 and,
+# as on GitHub, costs no rate limit. Connections are kept alive
+# and counted, and `fail_next` answers that many requests 502.
+# Tarballs are built once per commit and reused.
+# Extra branches/tags can be served from other directories
+# (--ref v2.4.0=old/checkout); any other ref is the main root.
+#
+# Usage:
+#   python fake_github.py SenseGlove-Unity-master/SenseGlove-Unity-master --port 8765
+#   python fake_github.py new/ --ref v2.4.0=old/ --ref v2.5.0=new/
+#   GITHUB_API_BASE=http://127.0.0.1:8765 python generate_full_index.py
+# ---------------------------------------------------------
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+def git_blob_sha(data):
+    """Same SHA-1 git assigns to a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeRepo:
+    """Snapshot of a directory, addressed the way GitHub addresses a repo."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._stamp = None
+        self._snapshot = None
+        self._tarball = None    # ((commit, prefix), bytes)
+        self._lock = threading.Lock()
+
+    def _paths(self):
+        for dirpath, _, names in os.walk(self.root):
+            for n in names:
+                full = os.path.join(dirpath, n)
+                yield os.path.relpath(full, self.root).replace(os.sep, "/"), full
+
+    def snapshot(self):
+        """(commit, tree, blobs, files), rebuilt only when the directory changed."""
+        stamp = tuple(
+            (rel, st.st_mtime_ns, st.st_size)
+            for rel, full in self._paths()
+            for st in [os.stat(full)]
+        )
+        with self._lock:
+            if stamp != self._stamp:
+                self._snapshot = self._build()
+                self._stamp = stamp
+            return self._snapshot
+
+    def _build(self):
+        files = {}
+        for rel, full in self._paths():
+            with open(full, "rb") as f:
+                files[rel] = f.read()
+        blobs = {git_blob_sha(data): data for data in files.values()}
+        tree = [
+            {"path": p, "mode": "100644", "type": "blob", "sha": git_blob_sha(d), "size": len(d)}
+            for p, d in sorted(files.items())
+        ]
+        commit = hashlib.sha1(json.dumps([(t["path"], t["sha"]) for t in tree]).encode()).hexdigest()
+        return commit, tree, blobs, files
+
+    def tarball(self, prefix):
+        """gzip'd tar of the current snapshot, built once per commit (large corpora take seconds)."""
+        commit, _, _, files = self.snapshot()
+        with self._lock:
+            if self._tarball is None or self._tarball[0] != (commit, prefix):
+                buf = io.BytesIO()
+                with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+                    for path, data in files.items():
+                        info = tarfile.TarInfo(f"{prefix}/{path}")
+                        info.size = len(data)
+                        tar.addfile(info, io.BytesIO(data))
+                self._tarball = ((commit, prefix), buf.getvalue())
+            return self._tarball[1]
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    server_version = "FakeGitHub/1.0"
+    protocol_version = "HTTP/1.1"   # keep-alive, like api.github.com
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _send(self, status, body, content_type="application/json"):
+        srv = self.server
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        elif isinstance(body, str):
+            body = body.encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"' if status == 200 else None
+        not_modified = etag is not None and self.headers.get("If-None-Match") == etag
+        with srv.lock:
+            srv.request_count += 1
+            if not_modified:
+                srv.not_modified += 1
+            else:
+                srv.remaining = max(srv.remaining - 1, 0)
+            remaining = srv.remaining
+        if srv.latency:
+            time.sleep(srv.latency)
+        if not_modified:
+            status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("X-RateLimit-Limit", str(srv.rate_limit))
+        self.send_header("X-RateLimit-Remaining", str(remaining))
+        self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _repo(self, ref):
+        """Repo for a ref name or a commit SHA; the main root for anything else."""
+        srv = self.server
+        if ref in srv.refs:
+            return srv.refs[ref]
+        return next((r for r in srv.refs.values() if r.snapshot()[0] == ref), srv.repo)
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            failing = srv.fail_next > 0
+            srv.fail_next -= failing
+        if failing:
+            return self._send(502, {"message": "Server Error"})
+        if srv.remaining <= 0:
+            return self._send(403, {"message": "API rate limit exceeded"})
+
+        parts = urlparse(self.path).path.strip("/").split("/")
+        if len(parts) < 4 or parts[0] != "repos":
+            return self._send(404, {"message": "Not Found"})
+        endpoint, rest = parts[3], parts[4:]
+        if endpoint in ("commits", "tarball"):
+            repo = self._repo("/".join(rest))
+        elif endpoint == "git" and rest[:1] == ["trees"] and len(rest) == 2:
+            repo = self._repo(rest[1])
+        else:
+            repo = srv.repo
+        commit, tree, blobs, files = repo.snapshot()
+        accept = self.headers.get("Accept", "")
+
+        if endpoint == "commits":
+            if "vnd.github.sha" in accept:
+                return self._send(200, commit, "text/plain")
+            return self._send(200, {"sha": commit})
+        if endpoint == "git" and rest[:1] == ["trees"]:
+            return self._send(200, {"sha": commit, "tree": tree, "truncated": False})
+        if endpoint == "git" and rest[:1] == ["blobs"] and len(rest) == 2:
+            data = blobs.get(rest[1])
+            for other in srv.refs.values():
+                if data is None:
+                    data = other.snapshot()[2].get(rest[1])
+            if data is None:
+                return self._send(404, {"message": "Not Found"})
+            if "raw" in accept:
+                return self._send(200, data, "application/octet-stream")
+            return self._send(200, {"sha": rest[1], "encoding": "base64",
+                                    "content": base64.b64encode(data).decode()})
+        if endpoint == "contents":
+            data = files.get("/".join(rest))
+            if data is None:
+                return self._send(404, {"message": "Not Found"})
+            return self._send(200, {"encoding": "base64", "content": base64.b64encode(data).decode()})
+        if endpoint == "tarball":
+            return self._send(200, repo.tarball(f"{parts[1]}-{parts[2]}-{commit[:7]}"), "application/x-gzip")
+        return self._send(404, {"message": "Not Found"})
+
+
+def start_server(root, port=0, latency=0.0, rate_limit=5000, refs=None):
+    """Start a fake GitHub in a daemon thread; `refs` maps branch/tag names to directories. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeGitHubHandler)
+    server.daemon_threads = True
+    server.repo = FakeRepo(root)
+    server.refs = {name: FakeRepo(path) for name, path in (refs or {}).items()}
+    server.latency = latency
+    server.rate_limit = rate_limit
+    server.remaining = rate_limit
+    server.request_count = 0
+    server.not_modified = 0
+    server.connections = 0
+    server.fail_next = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Serve a local directory as a fake GitHub repo.")
+    ap.add_argument("root")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    ap.add_argument("--rate-limit", type=int, default=5000)
+    ap.add_argument("--ref", action="append", default=[], metavar="NAME=DIR",
+                    help="serve branch/tag NAME from DIR (repeatable)")
+    args = ap.parse_args()
+    srv, url = start_server(args.root, args.port, args.latency, args.rate_limit,
+                            dict(r.split("=", 1) for r in args.ref))
+    print(f"🧪 Fake GitHub serving {args.root} at {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# fake_ollama.py
+# ---------------------------------------------------------
+# Local stand-in for the Ollama HTTP API used by llm_backend.py:
+#   GET  /api/version
+#   GET  /api/tags
+#   POST /api/generate   (stream=true → NDJSON chunks)
+#   POST /api/embed      (deterministic bag-of-words vectors)
+# Simulates a one-off model load and a per-token delay, so
+# time-to-first-token and keep_alive can be measured; the final
+# chunk carries Ollama's timing and token-count fields.
+# Like Ollama's prompt cache, only the tokens after the prefix
+# shared with the previous prompt are evaluated (and counted in
+# prompt_eval_count), at --prompt-delay seconds per token.
+# --error-after N ends each reply with an error chunk after N
+# pieces, like a model crashing mid-answer.
+#
+# Usage:
+#   python fake_ollama.py --port 11435 --load-delay 3 --token-delay 0.02 --prompt-delay 0.001
+#   OLLAMA_HOST=http://127.0.0.1:11435 python sengeglove_cli.py
+# ---------------------------------------------------------
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBED_DIM = 64
+DEFAULT_REPLY = ("SG_Haptics.cs → SendImpactVibration() — sends an impact vibration to the glove.\n"
+                 "SG_ObjectVibration.cs → StopHaptics() — stops vibration on the grabbed object.")
+
+
+def fake_embedding(text):
+    vec = [0.0] * EMBED_DIM
+    for word in re.findall(r"[a-z]+", text.lower()):
+        vec[zlib.crc32(word.encode()) % EMBED_DIM] += 1.0
+    return vec
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOllama/1.0"
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real server
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, obj):
+        data = json.dumps(obj).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.request_count += 1
+        if self.path == "/api/version":
+            return self._send_json(200, {"version": "0.0.0-fake"})
+        if self.path == "/api/tags":
+            return self._send_json(200, {"models": [{"name": f"{self.server.model}:latest"}]})
+        return self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        srv = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with srv.lock:
+            srv.request_count += 1
+            srv.prompts.append(body.get("prompt", ""))
+        if self.path == "/api/embed":
+            inputs = body.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            return self._send_json(200, {"model": body.get("model"), "embeddings": [fake_embedding(t) for t in inputs]})
+        if self.path != "/api/generate":
+            return self._send_json(404, {"error": "not found"})
+
+        started = time.perf_counter_ns()
+        with srv.lock:
+            expired = srv.loaded_until is not None and time.monotonic() > srv.loaded_until
+            needs_load = srv.loaded_until is None or expired
+            srv.loaded_until = time.monotonic() + (3600 if body.get("keep_alive") else 0)
+        if needs_load:
+            srv.loads += 1
+            time.sleep(srv.load_delay)
+        loaded = time.perf_counter_ns()
+
+        if not body.get("prompt"):
+            return self._send_json(200, {"model": body.get("model"), "response": "", "done": True})
+        tokens = re.findall(r"\w+|[^\w\s]", body["prompt"])
+        with srv.lock:
+            evaluated = len(tokens) - len(os.path.commonprefix([tokens, srv.cached_tokens]))
+            srv.cached_tokens = tokens
+        if srv.prompt_delay:
+            time.sleep(evaluated * srv.prompt_delay)
+        evaluated_at = time.perf_counter_ns()
+        pieces = re.findall(r"\S+\s*|\s+", srv.reply)
+        if not body.get("stream", True):
+            return self._send_json(200, {"model": body.get("model"), "response": srv.reply, "done": True})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for n, piece in enumerate(pieces):
+                if srv.error_after is not None and n == srv.error_after:
+                    self._chunk({"error": "model runner has unexpectedly stopped"})
+                    self.wfile.write(b"0\r\n\r\n")
+                    return
+                time.sleep(srv.token_delay)
+                self._chunk({"model": body.get("model"), "response": piece, "done": False})
+            done = time.perf_counter_ns()
+            self._chunk({"model": body.get("model"), "response": "", "done": True,
+                         "total_duration": done - started, "load_duration": loaded - started,
+                         "prompt_eval_count": evaluated, "prompt_eval_duration": evaluated_at - loaded,
+                         "eval_count": len(pieces), "eval_duration": done - evaluated_at})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            srv.cancelled += 1   # client hung up mid-answer
+
+
+def start_server(port=0, reply=DEFAULT_REPLY, load_delay=0.0, token_delay=0.0, model="llama3.2", prompt_delay=0.0,
+                 error_after=None):
+    """Start a fake Ollama in a daemon thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOllamaHandler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None   # clients drop idle keep-alive sockets
+    server.reply = reply
+    server.model = model
+    server.load_delay = load_delay
+    server.token_delay = token_delay
+    server.prompt_delay = prompt_delay
+    server.error_after = error_after
+    server.cached_tokens = []
+    server.loaded_until = None
+    server.loads = 0
+    server.cancelled = 0
+    server.request_count = 0
+    server.prompts = []
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Serve a fake Ollama HTTP API.")
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--load-delay", type=float, default=3.0, help="seconds to 'load' the model")
+    ap.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed pieces")
+    ap.add_argument("--prompt-delay", type=float, default=0.0, help="seconds per evaluated (uncached) prompt token")
+    ap.add_argument("--error-after", type=int, default=None, help="fail every reply after this many pieces")
+    args = ap.parse_args()
+    srv, url = start_server(args.port, load_delay=args.load_delay, token_delay=args.token_delay,
+                            prompt_delay=args.prompt_delay, error_after=args.error_after)
+    print(f"🧪 Fake Ollama at {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
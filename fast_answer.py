@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# fast_answer.py
+# ---------------------------------------------------------
+# Instant answers straight from the local index, no LLM:
+# - exact symbol match   ("SG_Haptics", "SendImpactVibration",
+#   "Start()"; a plain word only if it names one symbol)
+# - fuzzy symbol match   ("SendImpactVibraton")
+# - keyword → tag match  ("vibrate" → haptic / vibration scripts)
+# - usage questions      ("what calls SendImpactVibration"), from
+#   the cross-reference graph (xref.py) when one is passed in
+# - version diffs        ("what changed between v2.4 and v2.5"),
+#   from the version manifests (versions.py) when passed in
+# Each answer carries a confidence in [0, 1]; the GUI only
+# falls back to the LLM when it is too low.
+# ---------------------------------------------------------
+
+import difflib
+import re
+import threading
+
+import frontends
+import retrieval
+
+FUZZY_CUTOFF = 0.85
+MAX_LOOKUP_TERMS = 3   # longer questions need the LLM to reason about them
+
+# Everyday words → terms that actually appear in SenseGlove script/function names
+SYNONYMS = {
+    "vibrate": ["haptic", "vibration", "buzz", "waveform"],
+    "buzz": ["vibration", "haptic"],
+    "haptic": ["vibration", "waveform"],
+    "grab": ["grabable", "grabscript", "interactable"],
+    "pick": ["grab"],
+    "hold": ["grab"],
+    "release": ["grab"],
+    "calibrate": ["calibration"],
+    "collide": ["collision", "impact", "collider"],
+    "touch": ["collision", "impact", "collider"],
+    "force": ["feedback", "ffb"],
+    "resist": ["force", "feedback"],
+    "track": ["tracking", "tracked"],
+    "hand": ["hand", "trackedhand"],
+    "pose": ["handpose", "poser"],
+    "gesture": ["gesture"],
+    "break": ["breakable"],
+    "drop": ["dropzone", "snap"],
+    "connect": ["connection", "connected", "glove"],
+}
+_SYN = {retrieval.stem(k): [t for v in vs for t in retrieval.tokenize(v)] for k, vs in SYNONYMS.items()}
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_IDENT = re.compile(r"[a-z][A-Z]|_")  # CamelCase or snake_case: looks like a code name
+_CALLED = re.compile(r"\b([A-Za-z_]\w*)\(")                   # Start(), Start(int)
+_DOTTED = re.compile(r"[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+")      # SG_Haptics.Start, Grab.cs
+
+
+def code_words(query):
+    """Words of `query` written the way code is: CamelCase, snake_case, name(...) or part of a dotted name."""
+    marked = {m.group(1) for m in _CALLED.finditer(query)}
+    marked.update(w for m in _DOTTED.finditer(query) for w in m.group().split("."))
+    return {w for w in _WORD.findall(query) if _IDENT.search(w) or w in marked}
+
+
+# ---------- Symbol table ----------
+
+class SymbolTable:
+    """Lower-cased script and function names → [(script index, function index or None)]."""
+
+    def __init__(self, data):
+        self.symbols = {}
+        self.display = {}
+        for i, d in enumerate(data):
+            script = frontends.stem(d["name"])
+            self._add(script, (i, None))
+            for j, f in enumerate(d.get("functions", [])):
+                if f.get("name") and f["name"] != "UnknownFunction":
+                    self._add(f["name"], (i, j))
+        self.names = list(self.symbols)
+
+    def _add(self, name, ref):
+        key = name.lower()
+        self.symbols.setdefault(key, []).append(ref)
+        self.display.setdefault(key, name)
+
+    def lookup(self, word):
+        return self.symbols.get(word.lower(), [])
+
+    def fuzzy(self, word):
+        match = difflib.get_close_matches(word.lower(), self.names, n=1, cutoff=FUZZY_CUTOFF)
+        if not match:
+            return None, 0.0
+        return match[0], difflib.SequenceMatcher(None, word.lower(), match[0]).ratio()
+
+
+_tables = None  # (data object, SymbolTable)
+_lock = threading.Lock()
+
+
+def symbol_table(data):
+    global _tables
+    with _lock:
+        if _tables is None or _tables[0] is not data:
+            _tables = (data, SymbolTable(data))
+        return _tables[1]
+
+
+# ---------- Formatting ----------
+
+def format_ref(data, ref):
+    i, j = ref
+    d = data[i]
+    if j is None:
+        funcs = [f for f in d.get("functions", []) if f.get("name") != "UnknownFunction"]
+        names = ", ".join(f["name"] + "()" for f in funcs[:4])
+        return f"{d['name']} — {d.get('description', '')}" + (f"\n   Key functions: {names}" if names else "")
+    f = d["functions"][j]
+    return f"{d['name']} → {f['name']}() — {f.get('description', '')}"
+
+
+# ---------- Answer engine ----------
+
+def answer(query, data, retriever, limit=4, graph=None, versions=None):
+    """Return (text, confidence, how). `text` is "" when nothing usable was found."""
+    words = [w for w in _WORD.findall(query) if len(w) > 2]
+    if not words or not len(data):
+        return "", 0.0, "none"
+    table = symbol_table(data)
+
+    # 0) Version diffs and who calls / uses / depends on a symbol: not answered by a definition
+    for source in (versions, graph):
+        if source is not None:
+            text, confidence, how = source.answer(query)
+            if text:
+                return text, confidence, how
+
+    # 1) Exact symbol names. A plain word ("start", "grab") only counts in a short lookup, and
+    #    only if it names one symbol; otherwise it is ranked as a keyword below.
+    code = code_words(query)
+    short = len(words) <= MAX_LOOKUP_TERMS
+    refs = []
+    for w in words:
+        if w in code or short:
+            found = table.lookup(w)
+            if w in code or len(found) == 1:
+                refs += found
+    if refs:
+        return "\n".join(format_ref(data, r) for r in refs[:limit]), 1.0, "exact symbol"
+
+    # 2) Words written as code that are near-misses of a symbol
+    for w in words:
+        if w in code:
+            name, ratio = table.fuzzy(w)
+            if name:
+                refs = table.lookup(name)
+                return "\n".join(format_ref(data, r) for r in refs[:limit]), ratio, f"fuzzy symbol ~{table.display[name]}"
+
+    # 3) Short keyword lookups, expanded through SYNONYMS and ranked with BM25
+    terms = retrieval.tokenize(query)
+    if not terms or len(terms) > MAX_LOOKUP_TERMS:
+        return "", 0.0, "none"
+    expanded = terms + [s for t in terms for s in _SYN.get(t, [])]
+    hits = retriever.search(" ".join(expanded), k=limit, funcs_per_script=1)
+    if not hits:
+        return "", 0.0, "none"
+    # A SYNONYMS tag is a known topic; a word that merely occurs in the index ("start") half of one.
+    covered = sum(1.0 if t in _SYN else 0.5 if t in retriever.postings else 0.0 for t in terms) / len(terms)
+    top, second = hits[0][0], hits[1][0] if len(hits) > 1 else 0.0
+    margin = top / (top + second) if top else 0.0
+    confidence = covered * min(1.0, 0.5 + margin)
+    lines = [format_ref(data, (doc, funcs[0] if funcs else None)) for _, doc, funcs in hits]
+    return "\n".join(lines), confidence, "keyword → tag"
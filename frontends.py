@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# frontends.py
+# ---------------------------------------------------------
+# Language frontends for the index builders. A frontend says
+# which files it reads and how to turn one into declarations:
+# - csharp: the Unity scripts (*.cs, csharp_parser.py)
+# - cpp:    the native SenseGlove-API headers (*.hpp / *.h,
+#           cpp_parser.py)
+# Each frontend names the GitHub repository its sources come
+# from; fetching a repository's tree only asks for the
+# extensions of its own languages, so a stray *.h in the Unity
+# repository is not indexed as API. Local checkouts follow the
+# same rule, by folder name (repo_for_local).
+# Both indexers walk, cache and parse every language through
+# the same pipeline; each entry gets a "language" tag and a
+# parser version of "<language>/<version>", so bumping one
+# frontend re-parses only its own files.
+# Add a language with register(Frontend(...)).
+# ---------------------------------------------------------
+
+import os
+
+import cpp_parser
+import csharp_parser
+
+DEFAULT_LANGUAGE = "csharp"   # entries indexed before language tags existed
+
+
+class Frontend:
+    """One source language: file extensions, parser and a display label."""
+
+    def __init__(self, language, label, extensions, version, scan_declarations,
+                 split_declarations, scan_references, summarize=None, repo=None):
+        self.language = language
+        self.label = label
+        self.repo = repo         # GitHub repository of these sources (None: any)
+        self.extensions = tuple(extensions)
+        self.version = f"{language}/{version}"
+        self.scan_declarations = scan_declarations
+        self.split_declarations = split_declarations
+        self.scan_references = scan_references
+        self.summarize = summarize or (lambda code: "")
+
+    def handles(self, path):
+        return path.lower().endswith(self.extensions)
+
+    def parse(self, code):
+        """(all declarations, types, functions) of one file."""
+        decls = self.scan_declarations(code)
+        types, functions = self.split_declarations(decls)
+        return decls, types, functions
+
+
+CSHARP = Frontend("csharp", "C#", [".cs"], csharp_parser.PARSER_VERSION,
+                  csharp_parser.scan_declarations, csharp_parser.split_declarations,
+                  csharp_parser.scan_references, repo="Adjuvo/SenseGlove-Unity")
+CPP = Frontend("cpp", "C++", [".hpp", ".h"], cpp_parser.PARSER_VERSION,
+               cpp_parser.scan_declarations, cpp_parser.split_declarations,
+               cpp_parser.scan_references, cpp_parser.file_summary, repo="Adjuvo/SenseGlove-API")
+
+FRONTENDS = [CSHARP, CPP]
+
+
+def register(frontend):
+    FRONTENDS.append(frontend)
+
+
+def extensions(repo=None):
+    """Source extensions of every frontend, or only of those whose sources live in `repo`."""
+    return tuple(ext for f in FRONTENDS if repo is None or f.repo in (None, repo) for ext in f.extensions)
+
+
+def for_path(path):
+    """Frontend for a file name/path, or None if no language handles it."""
+    return next((f for f in FRONTENDS if f.handles(path)), None)
+
+
+def repo_for_local(path):
+    """GitHub repository a local file or folder was checked out from, going by the nearest folder
+    named after one ("SenseGlove-API-master" → Adjuvo/SenseGlove-API); the Unity repository otherwise."""
+    repos = [f.repo for f in FRONTENDS if f.repo]
+    for part in reversed(os.path.abspath(path).split(os.sep)):
+        for repo in repos:
+            name = repo.split("/")[-1]
+            if part == name or part.startswith(name + "-"):
+                return repo
+    return CSHARP.repo
+
+
+def for_local_path(path):
+    """Like for_path, but only languages of the repository the local file comes from, so a *.h
+    inside a Unity project is not indexed as API."""
+    frontend = for_path(path)
+    if frontend is None or frontend.repo in (None, repo_for_local(os.path.dirname(path))):
+        return frontend
+    return None
+
+
+def for_entry(entry):
+    language = entry.get("language")
+    if language:
+        return next((f for f in FRONTENDS if f.language == language), CSHARP)
+    return for_path(entry.get("path") or entry.get("name") or entry.get("script_name") or "") or CSHARP
+
+
+def stem(name):
+    """File name without its source extension: "SG_Haptics.cs" → "SG_Haptics"."""
+    base, ext = os.path.splitext(name)
+    return base if ext.lower() in extensions() else name
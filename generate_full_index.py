@@ -5,63 +5,79 @@
 # Fetches all .cs scripts from the official SenseGlove-Unity repo,
 # parses classes and functions, and builds a rich JSON index
 # compatible with your GUI assistant.
+#
+# Offline mode: --source PATH (repeatable) walks local checkouts
+# instead, parsing across a process pool and reusing entries whose
+# mtime and size are unchanged since the last run. With several
+# roots, stored paths start with the root's folder name(s).
+#
+# Stages are traced with tracing.py (SENSEGLOVE_TRACE=1).
+# Call/type-usage edges of re-parsed files are linked into
+# <index>.xref.json (xref.py).
+#
+# Languages come from frontends.py: Unity C# scripts and the
+# native SenseGlove-API C++ headers go through the same pool and
+# cache into one index, each entry tagged with its "language":
+#   python generate_full_index.py --source SenseGlove-Unity-master \
+#       --source SenseGlove-API-master/SenseGlove-API-master
 # ---------------------------------------------------------
 
-import os, re, json, base64, requests
+import os, re, mmap, hashlib, argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from csharp_parser import parse_csharp, to_function_entry, to_type_entry
+from github_fetch import GitHubFetcher
+from github_updater import save_meta
+from index_store import DEFAULT_INDEX, WRITE_LOCK, normalize_entry, open_store
+import frontends
+import retrieval
+import semantic
+import tracing
+import xref
+
 REPO = "Adjuvo/SenseGlove-Unity"
 BRANCH = "master"
-OUT_FILE = "senseglove_index_with_functions.json"
-HEADERS = {}
+OUT_FILE = DEFAULT_INDEX
+
+fetcher = GitHubFetcher(REPO)
 
-# Optional: read your GitHub token for higher rate limit (recommended)
-if os.getenv("GITHUB_TOKEN"):
-    HEADERS = {"Authorization": f"token {os.getenv('GITHUB_TOKEN')}"}
-else:
-    print("⚠️  No GitHub token detected (limit = 60 requests/hour).")
-    print("    Set one with:")
-    print('    setx GITHUB_TOKEN "your_token_here" (Windows)')
-    print('    export GITHUB_TOKEN="your_token_here" (Linux/Mac)')
 
-API_BASE = f"https://api.github.com/repos/{REPO}"
+def warn_missing_token():
+    # Optional: read your GitHub token for higher rate limit (recommended)
+    if not os.getenv("GITHUB_TOKEN"):
+        print("⚠️  No GitHub token detected (limit = 60 requests/hour).")
+        print("    Set one with:")
+        print('    setx GITHUB_TOKEN "your_token_here" (Windows)')
+        print('    export GITHUB_TOKEN="your_token_here" (Linux/Mac)')
 
 
 # ---------- GitHub helpers ----------
 
 def get_repo_tree(branch=BRANCH):
-    """Return all files in the repo tree."""
-    url = f"{API_BASE}/git/trees/{branch}?recursive=1"
-    r = requests.get(url, headers=HEADERS)
-    r.raise_for_status()
-    tree = [i for i in r.json()["tree"] if i["path"].endswith(".cs")]
-    return tree
+    """Return all source blobs ({path, sha, size}) a frontend can parse."""
+    return fetcher.get_tree(branch, frontends.extensions(REPO))
 
 
-def get_file_content(path):
-    """Download raw C# content from GitHub."""
-    url = f"{API_BASE}/contents/{path}"
-    r = requests.get(url, headers=HEADERS)
-    r.raise_for_status()
-    data = r.json()
-    return base64.b64decode(data["content"]).decode("utf-8", errors="ignore")
+def get_file_content(item):
+    """Download the raw content of one tree entry by its blob SHA."""
+    return fetcher.get_blob(item["sha"])
 
 
-# ---------- C# parsing logic ----------
+# ---------- Parsing logic ----------
 
 def extract_classes(code):
-    """Extract class names from C#."""
-    return re.findall(r"class\s+([A-Za-z0-9_]+)", code)
+    """Extract type names (class, struct, interface, enum) from C#."""
+    return parse_csharp(code)[0]
 
 
-def extract_functions(code):
-    """Extract function names and generate summaries."""
-    pattern = re.compile(
-        r"(?:public|private|protected|internal)?\s*(?:static\s+)?(?:void|int|float|bool|string|\w+)\s+([A-Za-z0-9_]+)\s*\("
-    )
-    functions = pattern.findall(code)
+def extract_functions(code, methods=None):
+    """Extract method declarations and generate summaries."""
+    if methods is None:
+        methods = parse_csharp(code)[1]
     results = []
-    for f in functions:
+    for m in methods:
+        f = m["name"]
         desc = (
             "Handles logic for " + f.lower().replace("_", " ")
             if len(f) > 3
@@ -77,13 +93,13 @@ def extract_functions(code):
             desc = "Controls object grabbing or releasing."
         elif "vibrate" in f.lower() or "haptic" in f.lower():
             desc = "Controls haptic vibration feedback on the glove."
-        results.append({"name": f, "description": desc})
+        results.append(to_function_entry(m, desc))
     return results
 
 
 def guess_summary(name, classes, functions):
     """Rough AI-style auto-summary."""
-    base = name.replace(".cs", "")
+    base = frontends.stem(name)
     if "Grab" in base:
         return "Manages object grabbing, releasing, or physics interactions."
     if "Hand" in base:
@@ -99,46 +115,218 @@ def guess_summary(name, classes, functions):
     return f"Auto-generated description for {base} script."
 
 
+def build_entry(name, code):
+    """Parse one source file (any frontend language) and build its index entry."""
+    frontend = frontends.for_path(name)
+    decls, types, methods = frontend.parse(code)
+    classes = [t["name"] for t in types]
+    functions = extract_functions(code, methods)
+    return normalize_entry({
+        "script_name": name,
+        "language": frontend.language,
+        "summary": frontend.summarize(code) or guess_summary(name, classes, functions),
+        "tags": list(set([tag.lower() for tag in re.findall(r"[A-Z][a-z]+", name)])),
+        "classes": classes,
+        "types": [to_type_entry(t) for t in types],
+        "functions": functions,
+        "last_updated": datetime.utcnow().isoformat() + "Z",
+        "refs": xref.file_refs(code, decls, frontend),
+    })
+
+
+# ---------- Local checkout helpers ----------
+
+def root_prefixes(roots):
+    """Prefix of the stored paths under each root. A single root has none; several get the last
+    components of their own path, as few as tell them apart ("Assets/SenseGlove/"), so two roots
+    holding the same relative file never store the same path."""
+    parts = [os.path.abspath(r).split(os.sep) for r in roots]
+    if len(parts) < 2:
+        return [""] * len(parts)
+    depth = 1
+    while len({tuple(p[-depth:]) for p in parts}) < len(parts):
+        depth += 1
+    return ["/".join(p[-depth:]) + "/" for p in parts]
+
+
+def unique_roots(roots):
+    """`roots` without repeats of the same directory, in order."""
+    seen = {}
+    for r in roots:
+        seen.setdefault(os.path.abspath(r), r)
+    return list(seen.values())
+
+
+def walk_sources(roots):
+    """Yield (local_path, stored path) for every source file a frontend of its checkout's
+    repository handles (frontends.repo_for_local). The stored path is relative to its root,
+    prefixed as root_prefixes() says."""
+    roots = unique_roots(roots)
+    for root, prefix in zip(roots, root_prefixes(roots)):
+        for dirpath, _, names in os.walk(root):
+            extensions = frontends.extensions(frontends.repo_for_local(dirpath))
+            for n in sorted(names):
+                if n.lower().endswith(extensions):
+                    local = os.path.join(dirpath, n)
+                    yield local, prefix + os.path.relpath(local, root).replace(os.sep, "/")
+
+
+def read_source(local_path):
+    """Read a file through a read-only memory map; returns raw bytes."""
+    with open(local_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return m[:]
+
+
+def parse_local_file(job):
+    """Process-pool worker: parse one local file into an index entry."""
+    local_path, rel_path, mtime, size = job
+    data = read_source(local_path)
+    code = data.decode("utf-8-sig", errors="ignore")
+    entry = build_entry(os.path.basename(local_path), code)
+    entry.update({
+        "path": rel_path,
+        "local_path": local_path,
+        "sha": hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest(),
+        "mtime": mtime,
+        "size": size,
+        "parser": frontends.for_path(local_path).version,
+    })
+    return entry
+
+
+def parse_local_job(job):
+    """Process-pool worker: (entry, None), or (None, error) for a file that cannot be read or parsed."""
+    try:
+        return parse_local_file(job), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def load_previous_entries():
+    """Entries from the last local build, keyed by local_path."""
+    store = open_store(OUT_FILE)
+    if not store.exists():
+        return {}
+    try:
+        scripts = store.entries()
+    except (OSError, ValueError):
+        return {}
+    return {s["local_path"]: s for s in scripts if isinstance(s, dict) and s.get("local_path")}
+
+
 # ---------- Main builder ----------
 
+def generate_local_index(roots, jobs=None):
+    """Build the index from local checkouts without touching the network."""
+    with WRITE_LOCK, tracing.span("generate_index", source="local") as span:
+        _generate_local_index(roots, jobs, span)
+
+
+def _generate_local_index(roots, jobs, span):
+    print(f"🔍 Scanning local sources: {', '.join(roots)}")
+    previous = load_previous_entries()
+    scripts, todo = [], []
+
+    for local, rel in walk_sources(roots):
+        try:
+            st = os.stat(local)
+        except OSError as e:
+            print(f"⚠️  Skipping {local}: {e}")
+            continue
+        old = previous.get(local)
+        if (old and old.get("mtime") == st.st_mtime and old.get("size") == st.st_size
+                and old.get("parser") == frontends.for_path(local).version and old.get("path") == rel):
+            scripts.append(old)
+        else:
+            todo.append((local, rel, st.st_mtime, st.st_size))
+
+    print(f"♻️  {len(scripts)} unchanged, 🛠️  {len(todo)} to parse")
+    span.set(unchanged=len(scripts), parsed=len(todo))
+    skipped = 0
+    if todo:
+        with tracing.span("parse", files=len(todo)), ProcessPoolExecutor(max_workers=jobs) as pool:
+            for job, (entry, error) in zip(todo, pool.map(parse_local_job, todo, chunksize=8)):
+                if error:
+                    print(f"⚠️  Skipping {job[0]}: {error}")
+                    skipped += 1
+                else:
+                    scripts.append(entry)
+        span.set(skipped=skipped)
+
+    scripts.sort(key=lambda s: s["local_path"])
+    if not todo and len(scripts) == len(previous):
+        print("✅ Nothing changed. Index is already up to date.")
+        return
+
+    refs = xref.take_refs(scripts)
+    open_store(OUT_FILE).replace_all(scripts)
+    retrieval.rebuild(OUT_FILE)
+    semantic.rebuild(OUT_FILE)
+    xref.rebuild(OUT_FILE, refs)
+    # The index no longer mirrors a GitHub commit or version: the next update diffs the whole tree.
+    save_meta({"last_sha": None, "version": None})
+
+    print(f"\n✅ Index generated: {OUT_FILE}")
+    print(f"📄 Total scripts indexed: {len(scripts)}" + (f", {skipped} skipped" if skipped else ""))
+
+
 def generate_index():
+    with WRITE_LOCK, tracing.span("generate_index", source="github") as span:
+        _generate_index(span)
+
+
+def _generate_index(span):
+    warn_missing_token()
     print("🔍 Fetching C# scripts from GitHub...")
-    tree = get_repo_tree()
+    head_sha = fetcher.get_commit_sha(BRANCH)
+    tree = get_repo_tree(head_sha)
     total = len(tree)
     scripts = []
 
-    for i, item in enumerate(tree, start=1):
-        name = os.path.basename(item["path"])
-        print(f"   [{i}/{total}] Parsing {name}")
-        try:
-            code = get_file_content(item["path"])
-            classes = extract_classes(code)
-            functions = extract_functions(code)
-            summary = guess_summary(name, classes, functions)
-            entry = {
-                "script_name": name,
-                "summary": summary,
-                "tags": list(set([tag.lower() for tag in re.findall(r"[A-Z][a-z]+", name)])),
-                "classes": classes,
-                "functions": functions,
-                "last_updated": datetime.utcnow().isoformat() + "Z",
-            }
-            scripts.append(entry)
-        except Exception as e:
-            print(f"⚠️  Skipping {name}: {e}")
-
-    final_data = {"total_scripts": len(scripts), "scripts": scripts}
-
-    with open(OUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(final_data, f, indent=2, ensure_ascii=False)
-
-    print(f"\n✅ JSON index generated: {OUT_FILE}")
+    print(f"📦 Downloading {total} scripts...")
+    contents = fetcher.fetch_files(tree, head_sha)
+
+    with tracing.span("parse", files=total):
+        for i, item in enumerate(tree, start=1):
+            name = os.path.basename(item["path"])
+            print(f"   [{i}/{total}] Parsing {name}")
+            try:
+                entry = build_entry(name, contents[item["path"]])
+                entry["path"] = item["path"]
+                entry["sha"] = item["sha"]
+                entry["commit"] = head_sha
+                scripts.append(entry)
+            except Exception as e:
+                print(f"⚠️  Skipping {name}: {e}")
+
+    refs = xref.take_refs(scripts)
+    open_store(OUT_FILE).replace_all(scripts)
+    retrieval.rebuild(OUT_FILE)
+    semantic.rebuild(OUT_FILE)
+    xref.rebuild(OUT_FILE, refs)
+    save_meta({"last_sha": head_sha, "version": BRANCH})
+
+    print(f"\n✅ Index generated: {OUT_FILE}")
     print(f"📄 Total scripts parsed: {len(scripts)}")
+    print(f"🌐 GitHub requests used: {fetcher.requests_made}")
+    span.set(scripts=len(scripts), github_requests=fetcher.requests_made, rate_remaining=fetcher.rate_remaining)
 
 
 # ---------- Run ----------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the SenseGlove script index.")
+    parser.add_argument("--source", action="append", metavar="PATH",
+                        help="index a local checkout instead of GitHub (repeatable)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="parser processes for --source (default: CPU count)")
+    args = parser.parse_args()
     try:
-        generate_index()
+        if args.source:
+            generate_local_index(args.source, jobs=args.jobs)
+        else:
+            generate_index()
     except Exception as e:
         print("❌ Error:", e)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# github_fetch.py
+# ---------------------------------------------------------
+# Shared GitHub fetch engine used by generate_full_index.py and
+# github_updater.py.
+# - One pooled requests.Session (keep-alive) for every call
+# - Raw blobs fetched by SHA with bounded concurrency
+# - Single tarball download for full rebuilds (1 request)
+# - Honours X-RateLimit-* / Retry-After headers with backoff
+# - Commit and tree lookups are conditional (If-None-Match):
+#   an unchanged answer is a 304, which costs no rate limit
+# - GITHUB_API_BASE can point at a local stand-in server
+#   (see fake_github.py)
+# - Request and rate-limit counters are published to tracing.py
+# ---------------------------------------------------------
+
+import io
+import os
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import tracing
+
+API_BASE = os.getenv("GITHUB_API_BASE", "https://api.github.com")
+MAX_WORKERS = 8
+MAX_RETRIES = 4
+MAX_WAIT = 60            # never sleep longer than this for a rate-limit reset
+TIMEOUT = 30
+TARBALL_THRESHOLD = 24   # above this many blobs one tarball is cheaper
+
+
+class GitHubFetcher:
+    """Pooled, rate-limit aware client for one GitHub repository."""
+
+    def __init__(self, repo, token=None, api_base=API_BASE, max_workers=MAX_WORKERS):
+        self.repo = repo
+        self.api_base = api_base.rstrip("/")
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "senseglove-assistant",
+        })
+        token = token if token is not None else os.getenv("GITHUB_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"token {token}"
+
+        self.requests_made = 0
+        self.rate_remaining = None
+        self.rate_reset = None
+        self._etags = {}         # (url, accept) → (ETag, response) of conditional lookups
+        self._lock = threading.Lock()
+
+    @property
+    def repo_url(self):
+        return f"{self.api_base}/repos/{self.repo}"
+
+    # ---------- Low-level request with rate-limit handling ----------
+    def _note_rate_limit(self, r):
+        with self._lock:
+            self.requests_made += 1
+            if "X-RateLimit-Remaining" in r.headers:
+                self.rate_remaining = int(r.headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in r.headers:
+                self.rate_reset = int(r.headers["X-RateLimit-Reset"])
+        tracing.count("github.requests")
+        if self.rate_remaining is not None:
+            tracing.gauge("github.rate_remaining", self.rate_remaining)
+        if r.status_code in (403, 429):
+            tracing.count("github.rate_limited")
+
+    def _wait_for_reset(self):
+        if self.rate_remaining == 0 and self.rate_reset:
+            delay = self.rate_reset - time.time()
+            if delay > 0:
+                time.sleep(min(delay, MAX_WAIT))
+
+    def _retry_delay(self, r, attempt):
+        if r is not None:
+            if "Retry-After" in r.headers:
+                return min(float(r.headers["Retry-After"]), MAX_WAIT)
+            if r.headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in r.headers:
+                return min(max(int(r.headers["X-RateLimit-Reset"]) - time.time(), 0), MAX_WAIT)
+        return min(2 ** attempt * 0.5, MAX_WAIT)
+
+    def get(self, url, accept=None, stream=False, conditional=False):
+        """GET with retries on rate limiting (403/429) and server errors.
+        `conditional` sends the last answer's ETag and reuses that answer on 304 Not Modified."""
+        headers = {"Accept": accept} if accept else {}
+        cached = self._etags.get((url, accept)) if conditional else None
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        r = None
+        for attempt in range(MAX_RETRIES + 1):
+            self._wait_for_reset()
+            try:
+                r = self.session.get(url, headers=headers, timeout=TIMEOUT, stream=stream)
+            except requests.exceptions.ConnectionError:
+                if attempt == MAX_RETRIES:
+                    raise
+                time.sleep(self._retry_delay(None, attempt))
+                continue
+            self._note_rate_limit(r)
+            limited = r.status_code == 429 or (
+                r.status_code == 403 and r.headers.get("X-RateLimit-Remaining") == "0"
+            )
+            if (limited or r.status_code >= 500) and attempt < MAX_RETRIES:
+                time.sleep(self._retry_delay(r, attempt))
+                continue
+            break
+        if r.status_code == 304 and cached:
+            tracing.count("github.not_modified")
+            return cached[1]
+        r.raise_for_status()
+        if conditional and r.headers.get("ETag"):
+            with self._lock:
+                self._etags[(url, accept)] = (r.headers["ETag"], r)
+        return r
+
+    # ---------- Repository endpoints ----------
+    def get_commit_sha(self, ref):
+        """Resolve a branch/tag to its current commit SHA (one small request)."""
+        r = self.get(f"{self.repo_url}/commits/{ref}", accept="application/vnd.github.sha", conditional=True)
+        return r.text.strip()
+
+    def get_tree(self, ref, suffixes=(".cs",)):
+        """Return blob entries ({path, sha, size}) of the recursive tree at `ref`."""
+        r = self.get(f"{self.repo_url}/git/trees/{ref}?recursive=1", conditional=True)
+        return [
+            t for t in r.json().get("tree", [])
+            if t.get("type", "blob") == "blob" and t["path"].endswith(tuple(suffixes))
+        ]
+
+    def get_blob(self, sha):
+        """Download one raw blob by its git SHA."""
+        r = self.get(f"{self.repo_url}/git/blobs/{sha}", accept="application/vnd.github.raw+json")
+        return r.content.decode("utf-8", errors="ignore")
+
+    def fetch_blobs(self, items):
+        """Fetch many blobs concurrently. Returns {path: text}; failures are skipped."""
+        def one(item):
+            try:
+                return item["path"], self.get_blob(item["sha"])
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️  Skipping {item['path']}: {e}")
+                return item["path"], None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return {p: text for p, text in pool.map(one, items) if text is not None}
+
+    def fetch_tarball(self, ref, paths):
+        """Download the whole tree at `ref` once and pull `paths` out of it."""
+        wanted = set(paths)
+        r = self.get(f"{self.repo_url}/tarball/{ref}")
+        files = {}
+        with tarfile.open(fileobj=io.BytesIO(r.content), mode="r:gz") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                # GitHub prefixes every member with "<owner>-<repo>-<sha>/"
+                path = member.name.split("/", 1)[-1]
+                if path in wanted:
+                    files[path] = tar.extractfile(member).read().decode("utf-8", errors="ignore")
+        return files
+
+    def fetch_files(self, items, ref):
+        """Fetch the content of tree `items`, picking the cheapest strategy."""
+        with tracing.span("github.fetch_files", files=len(items)) as span:
+            before = self.requests_made
+            if len(items) > TARBALL_THRESHOLD:
+                try:
+                    files = self.fetch_tarball(ref, [i["path"] for i in items])
+                    missing = [i for i in items if i["path"] not in files]
+                    if missing:
+                        files.update(self.fetch_blobs(missing))
+                    span.set(mode="tarball", requests=self.requests_made - before)
+                    return files
+                except (requests.exceptions.RequestException, tarfile.TarError) as e:
+                    print(f"⚠️  Tarball download failed ({e}); falling back to blobs.")
+            files = self.fetch_blobs(items)
+            span.set(mode="blobs", requests=self.requests_made - before)
+            return files
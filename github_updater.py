@@ -6,63 +6,60 @@
 # - Keeps full "functions" structure: [{"name": ..., "description": ...}]
 # - Smart auto-descriptions for Start, Update, Grab, Vibrate, etc.
 # - Skips empty or malformed files
-# - Merges safely with existing JSON (never wipes valid data)
+# - Merges safely with existing JSON (only drops deleted files)
+# - Declarations parsed by csharp_parser.py (no call-site noise)
+# - Pooled, concurrent blob fetching via github_fetch.py
+# - Incremental refresh: diffs path + blob SHA against the tree
+#   at the current commit, skips entirely if last_sha is unchanged
+# - Traced (tracing.py) with GitHub request / rate-limit counts
+# - Re-links only the changed files' call/type-usage edges (xref.py)
+# - Any language with a frontend (frontends.py) is indexed, each
+#   entry tagged with its "language"
 # ---------------------------------------------------------
 
 import os
-import re
 import json
-import base64
 import requests
 from datetime import datetime
 
+from csharp_parser import to_function_entry, to_type_entry
+from github_fetch import GitHubFetcher
+from index_store import DEFAULT_INDEX, WRITE_LOCK, normalize_entry, open_store
+import frontends
+import retrieval
+import semantic
+import tracing
+import xref
+
 REPO = "Adjuvo/SenseGlove-Unity"
 BRANCH = "master"
-INDEX_FILE = "senseglove_index_with_functions.json"
+INDEX_FILE = DEFAULT_INDEX
+META_FILE = "senseglove_repo_meta.json"
+
+_fetcher = None
 
-# ---------- Helper: GitHub Auth ----------
-def get_headers():
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        print("⚠️  Warning: GITHUB_TOKEN not set. You may hit rate limits.")
-        return {}
-    return {"Authorization": f"token {token}"}
+# ---------- Helper: GitHub client ----------
+def get_fetcher():
+    global _fetcher
+    if _fetcher is None:
+        if not os.getenv("GITHUB_TOKEN"):
+            print("⚠️  Warning: GITHUB_TOKEN not set. You may hit rate limits.")
+        _fetcher = GitHubFetcher(REPO)
+    return _fetcher
 
 # ---------- Helper: Fetch repo structure ----------
-def fetch_repo_tree():
-    url = f"https://api.github.com/repos/{REPO}/git/trees/{BRANCH}?recursive=1"
-    r = requests.get(url, headers=get_headers())
-    r.raise_for_status()
-    tree = r.json().get("tree", [])
-    return [t for t in tree if t["path"].endswith(".cs")]
-
-# ---------- Helper: Fetch C# content ----------
-def fetch_cs_content(path):
-    url = f"https://api.github.com/repos/{REPO}/contents/{path}"
-    r = requests.get(url, headers=get_headers())
-    if r.status_code != 200:
-        print(f"⚠️  Skipping {path}: HTTP {r.status_code}")
-        return ""
-    data = r.json()
-    return base64.b64decode(data["content"]).decode("utf-8", errors="ignore")
-
-# ---------- Helper: Parse C# for classes & functions ----------
-def parse_csharp(content):
-    class_pattern = re.compile(r"class\s+([A-Za-z0-9_]+)")
-    func_pattern = re.compile(
-        r"(?:public|private|protected|internal)?\s*(?:static\s+)?"
-        r"(?:void|int|float|bool|string|\w+)\s+([A-Za-z0-9_]+)\s*\("
-    )
-    classes = class_pattern.findall(content)
-    funcs = func_pattern.findall(content)
-    return classes, funcs
+def fetch_repo_tree(ref=BRANCH):
+    return get_fetcher().get_tree(ref, frontends.extensions(REPO))
 
 # ---------- Helper: Build detailed structured entry ----------
 def build_entry(name, content):
-    classes, funcs = parse_csharp(content)
+    frontend = frontends.for_path(name)
+    decls, types, funcs = frontend.parse(content)
+    classes = [t["name"] for t in types]
     functions = []
 
-    for f in funcs:
+    for m in funcs:
+        f = m["name"]
         desc = "Handles logic for " + f.lower().replace("_", " ")
         if "update" in f.lower():
             desc = "Called every frame to update states or visuals."
@@ -80,52 +77,118 @@ def build_entry(name, content):
             desc = "Manages rendering or display logic."
         elif "force" in f.lower():
             desc = "Computes or applies force feedback."
-        functions.append({"name": f, "description": desc})
+        functions.append(to_function_entry(m, desc))
 
-    return {
+    return normalize_entry({
         "name": name,
-        "description": f"Auto-generated entry for {name}. Found {len(classes)} class(es) and {len(functions)} function(s).",
+        "language": frontend.language,
+        "description": frontend.summarize(content)
+        or f"Auto-generated entry for {name}. Found {len(classes)} class(es) and {len(functions)} function(s).",
         "classes": classes,
+        "types": [to_type_entry(t) for t in types],
         "functions": functions,
         "tags": [],
-        "last_updated": datetime.utcnow().isoformat() + "Z"
-    }
+        "last_updated": datetime.utcnow().isoformat() + "Z",
+        "refs": xref.file_refs(content, decls, frontend)
+    })
+
+# ---------- Helper: Repo meta (last indexed commit) ----------
+def load_meta():
+    if os.path.exists(META_FILE):
+        try:
+            with open(META_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+def save_meta(meta):
+    """Merge `meta` into the stored meta; keys other writers own (e.g. "version") are kept."""
+    merged = {**load_meta(), **meta}
+    with open(META_FILE, "w", encoding="utf-8") as f:
+        json.dump(merged, f)
+
+# ---------- Helper: Diff indexed blobs against the remote tree ----------
+def diff_tree(indexed, remote_files):
+    """Split the remote tree into (added, modified, deleted) by path + blob SHA.
+
+    `indexed` maps path → blob SHA for what the index currently holds.
+    """
+    remote = {i["path"]: i for i in remote_files}
+    added = [i for p, i in remote.items() if p not in indexed]
+    modified = [i for p, i in remote.items() if p in indexed and indexed[p] != i["sha"]]
+    deleted = [p for p in indexed if p not in remote]
+    return added, modified, deleted
 
 # ---------- Update index ----------
 def update_index():
+    with WRITE_LOCK, tracing.span("update_index", repo=REPO) as span:
+        _update_index(span)
+
+def _update_index(span):
     try:
-        # Load existing data
-        if os.path.exists(INDEX_FILE):
-            with open(INDEX_FILE, "r", encoding="utf-8") as f:
-                local_data = json.load(f)
-            scripts = local_data.get("scripts", local_data) if isinstance(local_data, dict) else local_data
-        else:
-            scripts = []
+        # Only paths + SHAs are read; entries themselves stay on disk
+        store = open_store(INDEX_FILE)
+        indexed = store.path_shas() if store.exists() else {}
+        legacy = store.legacy_count() if store.exists() else 0
+
+        print(f"🔍 Checking GitHub repo ({REPO}) for script changes…")
+        meta = load_meta()
+        head_sha = get_fetcher().get_commit_sha(BRANCH)
+        if head_sha == meta.get("last_sha") and indexed:
+            print(f"✅ {BRANCH} is still at {head_sha[:7]}. Index is already up to date.")
+            return
+
+        remote_files = fetch_repo_tree(head_sha)
+        # Entries from older index versions carry no path/SHA and cannot be diffed;
+        # the remote tree is authoritative, so they are rebuilt as path-keyed entries.
+        if legacy:
+            print(f"♻️  Rebuilding {legacy} legacy entries without path/SHA…")
+        added, modified, deleted = diff_tree(indexed, remote_files)
+        span.set(added=len(added), modified=len(modified), deleted=len(deleted))
 
-        print(f"🔍 Checking GitHub repo ({REPO}) for new .cs scripts…")
-        remote_files = fetch_repo_tree()
-        existing_names = {s.get("name", s.get("script_name")) for s in scripts}
+        changed = added + modified
+        contents = get_fetcher().fetch_files(changed, head_sha) if changed else {}
 
-        added = 0
-        for item in remote_files:
+        for path in deleted:
+            print(f"➖ Removing deleted script: {path}")
+
+        added_paths = {i["path"] for i in added}
+        upserts, skipped = [], []
+        for item in changed:
             name = os.path.basename(item["path"])
-            if name not in existing_names:
-                print(f"➕ Adding new script: {name}")
-                code = fetch_cs_content(item["path"])
-                if not code.strip():
-                    print(f"⚠️  Skipping {name} (empty or unreadable)")
-                    continue
-                entry = build_entry(name, code)
-                scripts.append(entry)
-                added += 1
-
-        if added > 0:
-            print(f"✅ Added {added} new scripts. Writing updated index…")
-            with open(INDEX_FILE, "w", encoding="utf-8") as f:
-                json.dump({"total_scripts": len(scripts), "scripts": scripts}, f, indent=2)
+            print(f"{'➕ Adding new' if item['path'] in added_paths else '✏️  Re-parsing modified'} script: {item['path']}")
+            code = contents.get(item["path"], "")
+            if not code.strip():
+                print(f"⚠️  Skipping {name} (empty or unreadable)")
+                skipped.append(item["path"])
+                continue
+            entry = build_entry(name, code)
+            entry["path"] = item["path"]
+            entry["sha"] = item["sha"]
+            entry["commit"] = head_sha  # permalinks: this blob is reachable at this commit
+            upserts.append(entry)
+
+        if upserts or deleted or legacy:
+            print(f"✅ {len(added)} added, {len(modified)} modified, {len(deleted)} deleted. Writing updated index…")
+            refs = xref.take_refs(upserts)
+            store.apply_changes(upserts, deleted, drop_legacy=True)
+            retrieval.rebuild(INDEX_FILE)
+            semantic.rebuild(INDEX_FILE)
+            xref.rebuild(INDEX_FILE, refs)
             print("💾 Index successfully updated and saved.")
+        elif not skipped:
+            print("✅ No script changes found. Index is already up to date.")
+
+        if skipped:
+            # Keep last_sha where it was: the next run diffs again and retries exactly these blobs.
+            print(f"⚠️  {len(skipped)} changed scripts could not be indexed; they are retried on the next update.")
+            span.set(skipped=len(skipped))
         else:
-            print("✅ No new scripts found. Index is already up to date.")
+            # The index now mirrors BRANCH, whichever version was checked out before.
+            save_meta({"last_sha": head_sha, "version": BRANCH})
+        print(f"🌐 GitHub requests used: {get_fetcher().requests_made}")
+        span.set(github_requests=get_fetcher().requests_made, rate_remaining=get_fetcher().rate_remaining)
 
     except requests.exceptions.RequestException as e:
         print(f"❌ Network error: {e}")
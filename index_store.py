@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# index_store.py
+# ---------------------------------------------------------
+# Pluggable storage for the script index.
+# - JsonIndexStore:   the classic pretty-printed JSON file,
+#   rewritten through a temp file so readers never see half of it
+# - SqliteIndexStore: one row per script (zlib-compressed entry
+#   JSON, lossless), a functions table and an FTS5 full-text
+#   table; opened lazily, rows are only read when accessed; one
+#   connection shared by all threads behind a lock
+# normalize_entry() is the entry shape every writer stores;
+# writers hold WRITE_LOCK while they rewrite the index;
+# side_index_lock() lets a query save side indexes under it.
+# open_store() picks the backend from the file extension;
+# SENSEGLOVE_INDEX overrides the default index path.
+#
+# Lossless conversion either way:
+#   python index_store.py convert senseglove_index_with_functions.json senseglove_index.sqlite
+# ---------------------------------------------------------
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from collections.abc import Sequence
+
+DEFAULT_INDEX = os.getenv("SENSEGLOVE_INDEX", "senseglove_index_with_functions.json")
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+# Held by every writer of the index and its side indexes (updater, generator, version checkout,
+# live watcher, load-time repair), so one read-modify-write never interleaves with another.
+WRITE_LOCK = threading.RLock()
+
+
+def open_store(path=DEFAULT_INDEX):
+    """Return the storage backend for `path`, chosen by extension."""
+    if path.endswith(SQLITE_SUFFIXES):
+        return SqliteIndexStore(path)
+    return JsonIndexStore(path)
+
+
+def entry_name(entry):
+    return entry.get("name") or entry.get("script_name") or ""
+
+
+def normalize_entry(entry):
+    """Return `entry` repaired into {name, description, functions, ...}, or None if unusable.
+    Idempotent: index writers store normalized entries, so loading never has to rewrite them."""
+    if isinstance(entry, str):
+        entry = {"name": entry, "description": "Auto-added script entry"}
+    if not isinstance(entry, dict):
+        return None
+    name = entry.get("name") or entry.get("script_name", "Unnamed Script")
+    desc = entry.get("description") or entry.get("summary", "No description available.")
+    funcs = entry.get("functions", [])
+    if not funcs:
+        funcs = [{"name": "UnknownFunction", "description": "No function details available."}]
+    elif isinstance(funcs[0], str):
+        funcs = [{"name": fn, "description": "Recovered function"} for fn in funcs]
+    elif isinstance(funcs[0], dict) and "description" not in funcs[0]:
+        funcs = [{**f, "description": "Auto-fixed description."} for f in funcs]
+    # Keep updater bookkeeping (path, sha, ...) so incremental refreshes still work.
+    return {**entry, "name": name, "description": desc, "functions": funcs}
+
+
+class Snapshot(list):
+    """Entries as loaded, tagged with the fingerprint of the index they were read from."""
+
+    def __init__(self, entries=(), fingerprint=""):
+        super().__init__(entries)
+        self.fingerprint = fingerprint
+
+
+def is_current(data, fingerprint):
+    """True if `data` was loaded from the index as it is now, i.e. its side indexes may be read and saved."""
+    return bool(fingerprint) and getattr(data, "fingerprint", None) == fingerprint
+
+
+@contextlib.contextmanager
+def side_index_lock(data, index_file):
+    """For saving side indexes from the query path: yields True while holding WRITE_LOCK if `data` is
+    still the current index. Never waits: while a writer runs it yields False, and the writer rebuilds
+    the side indexes itself."""
+    if not WRITE_LOCK.acquire(blocking=False):
+        yield False
+        return
+    try:
+        try:
+            fingerprint = open_store(index_file).fingerprint()
+        except (OSError, ValueError):
+            fingerprint = ""
+        yield is_current(data, fingerprint)
+    finally:
+        WRITE_LOCK.release()
+
+
+def _functions_text(entry):
+    return " ".join(f.get("name", "") if isinstance(f, dict) else str(f)
+                    for f in entry.get("functions", []))
+
+
+# ---------- JSON backend ----------
+
+class JsonIndexStore:
+    """Whole-file JSON index; entries are parsed once on first access."""
+
+    lazy = False
+
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+        self._fingerprint = ""   # of the bytes `_data` was parsed from (or written as)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _load(self):
+        if self._data is None:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            data = json.loads(raw)
+            self._fingerprint = hashlib.sha1(raw).hexdigest()
+            if isinstance(data, dict):
+                extra = {k: v for k, v in data.items() if k not in ("scripts", "total_scripts")}
+                scripts = data.get("scripts", [])
+            else:
+                extra, scripts = {}, data
+            self._data = (scripts, extra)
+        return self._data
+
+    def entries(self):
+        return self._load()[0]
+
+    def extra(self):
+        return self._load()[1]
+
+    def snapshot(self):
+        scripts = self.entries()
+        return Snapshot(scripts, self._fingerprint)
+
+    def __len__(self):
+        return len(self.entries())
+
+    def __iter__(self):
+        return iter(self.entries())
+
+    def __getitem__(self, i):
+        return self.entries()[i]
+
+    def get(self, name):
+        return next((e for e in self.entries() if isinstance(e, dict) and entry_name(e) == name), None)
+
+    def search(self, text, limit=20):
+        words = text.lower().split()
+        hits = []
+        for e in self.entries():
+            if not isinstance(e, dict):
+                continue
+            hay = f"{entry_name(e)} {e.get('description', '')} {_functions_text(e)}".lower()
+            score = sum(hay.count(w) for w in words)
+            if score:
+                hits.append((score, e))
+        hits.sort(key=lambda h: -h[0])
+        return [e for _, e in hits[:limit]]
+
+    def path_shas(self):
+        return {e["path"]: e.get("sha") for e in self.entries() if isinstance(e, dict) and e.get("path")}
+
+    def replace_all(self, scripts, extra=None):
+        if extra is None:
+            try:
+                extra = self.extra()
+            except (OSError, ValueError):
+                extra = {}
+        raw = json.dumps({"total_scripts": len(scripts), "scripts": scripts, **extra},
+                         indent=2, ensure_ascii=False).encode("utf-8")
+        with open(self.path + ".tmp", "wb") as f:
+            f.write(raw)
+        os.replace(self.path + ".tmp", self.path)
+        self._data = (list(scripts), dict(extra))
+        self._fingerprint = hashlib.sha1(raw).hexdigest()
+
+    def apply_changes(self, upserts=(), deleted=(), drop_legacy=False):
+        """Insert/replace entries by path, drop `deleted` paths (and path-less entries)."""
+        by_path = {e["path"]: e for e in upserts}
+        gone = set(deleted)
+        scripts = []
+        for e in (self.entries() if self.exists() else []):
+            path = e.get("path") if isinstance(e, dict) else None
+            if path is None and drop_legacy:
+                continue
+            if path in gone or path in by_path:
+                continue
+            scripts.append(e)
+        scripts.extend(by_path.values())
+        scripts.sort(key=lambda e: (e.get("path") is not None, e.get("path") or ""))
+        self.replace_all(scripts)
+
+    def legacy_count(self):
+        return sum(1 for e in self.entries() if not (isinstance(e, dict) and e.get("path")))
+
+    def fingerprint(self):
+        """Content hash of the index file; changes whenever any entry changes."""
+        if not self.exists():
+            return ""
+        with open(self.path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+
+# ---------- SQLite backend ----------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scripts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    path TEXT UNIQUE,
+    sha TEXT,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    script_id INTEGER NOT NULL REFERENCES scripts(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    class TEXT,
+    start_line INTEGER,
+    end_line INTEGER
+);
+CREATE INDEX IF NOT EXISTS functions_name ON functions(name);
+CREATE INDEX IF NOT EXISTS functions_script ON functions(script_id);
+CREATE INDEX IF NOT EXISTS scripts_name ON scripts(name);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _pack(entry):
+    return zlib.compress(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _has_fts5():
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE t USING fts5(a)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+class SqliteIndexStore:
+    """SQLite-backed index; nothing is read until it is asked for."""
+
+    lazy = True
+
+    ITER_CHUNK = 256
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.RLock()   # the connection is shared across threads
+        self.fts = _has_fts5()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @property
+    def conn(self):
+        """The shared connection; callers hold `_lock` while they use it."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.executescript(SCHEMA)
+            if self.fts:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS scripts_fts USING fts5("
+                    "name, description, classes, functions, tokenize='unicode61')"
+                )
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- Read ----------
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM scripts").fetchone()[0]
+
+    def __iter__(self):
+        # Keyset pages, each read under the lock: no cursor stays open while the caller runs.
+        last = -1
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT id, data FROM scripts WHERE id > ? ORDER BY id LIMIT ?", (last, self.ITER_CHUNK)
+                ).fetchall()
+            for _, data in rows:
+                yield _unpack(data)
+            if len(rows) < self.ITER_CHUNK:
+                return
+            last = rows[-1][0]
+
+    def __getitem__(self, i):
+        with self._lock:
+            if isinstance(i, slice):
+                start, stop, step = i.indices(len(self))
+                rows = self.conn.execute(
+                    "SELECT data FROM scripts ORDER BY id LIMIT ? OFFSET ?", (max(stop - start, 0), start)
+                ).fetchall()
+                return [_unpack(r[0]) for r in rows][::step]
+            if i < 0:
+                i += len(self)
+            row = self.conn.execute("SELECT data FROM scripts ORDER BY id LIMIT 1 OFFSET ?", (i,)).fetchone()
+        if row is None:
+            raise IndexError(i)
+        return _unpack(row[0])
+
+    def entries(self):
+        return list(self)
+
+    def snapshot(self):
+        with self._lock:
+            return Snapshot(self, self.fingerprint())
+
+    def extra(self):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'extra'").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def get(self, name):
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM scripts WHERE name = ? LIMIT 1", (name,)).fetchone()
+        return _unpack(row[0]) if row else None
+
+    def search(self, text, limit=20):
+        words = [w for w in "".join(c if c.isalnum() or c == "_" else " " for c in text).split()]
+        if not words:
+            return []
+        with self._lock:
+            if self.fts:
+                query = " OR ".join(f'"{w}"*' for w in words)
+                rows = self.conn.execute(
+                    "SELECT s.data FROM scripts_fts f JOIN scripts s ON s.id = f.rowid "
+                    "WHERE scripts_fts MATCH ? ORDER BY rank LIMIT ?", (query, limit)
+                ).fetchall()
+            else:
+                like = " OR ".join("name LIKE ?" for _ in words)
+                rows = self.conn.execute(
+                    f"SELECT data FROM scripts WHERE {like} OR id IN "
+                    f"(SELECT script_id FROM functions WHERE {like}) LIMIT ?",
+                    [f"%{w}%" for w in words] * 2 + [limit],
+                ).fetchall()
+        return [_unpack(r[0]) for r in rows]
+
+    def find_functions(self, name):
+        """(script name, function row) pairs for an exact function name."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT s.name, f.name, f.class, f.start_line, f.end_line "
+                "FROM functions f JOIN scripts s ON s.id = f.script_id WHERE f.name = ?", (name,)
+            ).fetchall()
+
+    def path_shas(self):
+        with self._lock:
+            return dict(self.conn.execute("SELECT path, sha FROM scripts WHERE path IS NOT NULL"))
+
+    def legacy_count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM scripts WHERE path IS NULL").fetchone()[0]
+
+    def fingerprint(self):
+        """Content hash of all entries, maintained on every write."""
+        if not self.exists():
+            return ""
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if row:
+                return row[0]
+            with self.conn:
+                return self._update_fingerprint()
+
+    def _update_fingerprint(self):
+        h = hashlib.sha1()
+        for (data,) in self.conn.execute("SELECT data FROM scripts ORDER BY id"):
+            h.update(data)
+        fp = h.hexdigest()
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fp,))
+        return fp
+
+    # ---------- Write ----------
+    def _insert(self, entry):
+        cur = self.conn.execute(
+            "INSERT INTO scripts (name, path, sha, data) VALUES (?, ?, ?, ?)",
+            (entry_name(entry), entry.get("path"), entry.get("sha"), _pack(entry)),
+        )
+        sid = cur.lastrowid
+        funcs = [f for f in entry.get("functions", []) if isinstance(f, dict)]
+        self.conn.executemany(
+            "INSERT INTO functions (script_id, name, class, start_line, end_line) VALUES (?, ?, ?, ?, ?)",
+            [(sid, f.get("name", ""), f.get("class"), f.get("start_line"), f.get("end_line")) for f in funcs],
+        )
+        if self.fts:
+            self.conn.execute(
+                "INSERT INTO scripts_fts (rowid, name, description, classes, functions) VALUES (?, ?, ?, ?, ?)",
+                (sid, entry_name(entry), entry.get("description") or entry.get("summary", ""),
+                 " ".join(entry.get("classes", [])), _functions_text(entry)),
+            )
+
+    def _delete_where(self, where, args=()):
+        ids = [r[0] for r in self.conn.execute(f"SELECT id FROM scripts WHERE {where}", args)]
+        if self.fts:
+            self.conn.executemany("DELETE FROM scripts_fts WHERE rowid = ?", [(i,) for i in ids])
+        self.conn.executemany("DELETE FROM scripts WHERE id = ?", [(i,) for i in ids])
+
+    def replace_all(self, scripts, extra=None):
+        with self._lock:
+            with self.conn:
+                self._delete_where("1")
+                for e in scripts:
+                    self._insert(e)
+                if extra is not None:
+                    self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('extra', ?)", (json.dumps(extra),))
+                self._update_fingerprint()
+            self.conn.execute("VACUUM")
+
+    def apply_changes(self, upserts=(), deleted=(), drop_legacy=False):
+        with self._lock, self.conn:
+            if drop_legacy:
+                self._delete_where("path IS NULL")
+            for path in deleted:
+                self._delete_where("path = ?", (path,))
+            for e in upserts:
+                self._delete_where("path = ?", (e["path"],))
+                self._insert(e)
+            self._update_fingerprint()
+
+
+# ---------- Lazy view ----------
+
+class IndexView(Sequence):
+    """Read-only sequence over a lazy store, applying `transform` to each entry on access."""
+
+    def __init__(self, store, transform):
+        self.store = store
+        self.transform = transform
+
+    @property
+    def fingerprint(self):
+        return self.store.fingerprint()    # rows are read live, so the view is always current
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.transform(e) for e in self.store[i]]
+        return self.transform(self.store[i])
+
+    def __iter__(self):
+        return (self.transform(e) for e in self.store)
+
+    def get(self, name):
+        e = self.store.get(name)
+        return self.transform(e) if e is not None else None
+
+    def search(self, text, limit=20):
+        return [self.transform(e) for e in self.store.search(text, limit)]
+
+
+# ---------- Converter ----------
+
+def convert(src, dst):
+    """Copy every entry (and top-level extras) from one backend to another."""
+    source, target = open_store(src), open_store(dst)
+    if os.path.abspath(src) == os.path.abspath(dst):
+        raise ValueError("source and destination are the same file")
+    scripts = source.entries()
+    target.replace_all(scripts, source.extra())
+    check = open_store(dst)
+    if check.entries() != scripts or check.extra() != source.extra():
+        raise RuntimeError("round-trip mismatch")
+    return len(scripts)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "convert":
+        n = convert(sys.argv[2], sys.argv[3])
+        print(f"✅ Converted {n} scripts: {sys.argv[2]} → {sys.argv[3]} (verified lossless)")
+    else:
+        print("Usage: python index_store.py convert SRC DST")
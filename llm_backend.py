@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# llm_backend.py
+# ---------------------------------------------------------
+# LLM backends used by the assistant.
+# - OllamaHTTP: one kept-alive session to the Ollama HTTP API
+#   (/api/generate, stream=true); keep_alive keeps the model
+#   loaded between questions, and warm() can pre-evaluate the
+#   prompts' static prefix into Ollama's prompt cache
+# - OllamaSubprocess: the original `ollama run` path, used
+#   when the HTTP server cannot be reached
+# - Both stream text pieces to a callback as they arrive and
+#   stop early when a cancel Event is set
+# - OLLAMA_HOST can point at fake_ollama.py for testing
+# - Each call is traced (tracing.py): time to first token, and
+#   over HTTP Ollama's own load / prompt / generation timings
+#   and token counts
+# ---------------------------------------------------------
+
+import codecs
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import requests
+
+import tracing
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+CONNECT_TIMEOUT = 2
+READ_TIMEOUT = 90        # longest silence tolerated between two tokens
+PROBE_TTL = 30           # seconds a reachability check stays valid
+STDERR_TAIL = 4096       # bytes of `ollama run` stderr kept for the error message
+# Timing/usage fields of Ollama's final chunk; durations are in nanoseconds.
+STAT_FIELDS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration",
+               "eval_count", "eval_duration")
+
+
+def _host_url(host):
+    host = host.rstrip("/")
+    return host if host.startswith(("http://", "https://")) else f"http://{host}"
+
+
+class OllamaHTTP:
+    """Streaming client for a running Ollama server, over one pooled connection."""
+
+    name = "http"
+
+    def __init__(self, model, host=OLLAMA_HOST, keep_alive=KEEP_ALIVE):
+        self.model = model
+        self.host = _host_url(host)
+        self.keep_alive = keep_alive
+        self.session = requests.Session()
+        self._probe = (float("-inf"), False)
+
+    def available(self):
+        """Is the server up? Cached for PROBE_TTL seconds so it costs nothing per query."""
+        checked, ok = self._probe
+        if time.monotonic() - checked < PROBE_TTL:
+            return ok
+        try:
+            ok = self.session.get(f"{self.host}/api/version", timeout=CONNECT_TIMEOUT).ok
+        except requests.exceptions.RequestException:
+            ok = False
+        self._probe = (time.monotonic(), ok)
+        return ok
+
+    def warm(self, prefix=""):
+        """Load the model ahead of the first question; a `prefix` is also evaluated into its prompt cache."""
+        payload = {"model": self.model, "keep_alive": self.keep_alive}
+        if prefix:
+            payload.update(prompt=prefix, stream=False, options={"num_predict": 1})
+        self.session.post(f"{self.host}/api/generate", json=payload,
+                          timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)).raise_for_status()
+
+    def stream(self, prompt, cancel=None, stats=None):
+        """Yield response pieces as the model produces them; the final chunk's timings go into `stats`."""
+        payload = {"model": self.model, "prompt": prompt, "stream": True, "keep_alive": self.keep_alive}
+        try:
+            with self.session.post(f"{self.host}/api/generate", json=payload, stream=True,
+                                   timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as r:
+                r.raise_for_status()
+                for line in r.iter_lines():
+                    if cancel is not None and cancel.is_set():
+                        return
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(chunk["error"])
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        if stats is not None:
+                            stats.update((k, chunk[k]) for k in STAT_FIELDS if k in chunk)
+                        return
+        except requests.exceptions.ConnectionError:
+            self._probe = (float("-inf"), False)
+            raise
+
+
+class OllamaSubprocess:
+    """`ollama run MODEL` with the prompt on stdin; stdout is streamed as it is written."""
+
+    name = "subprocess"
+
+    def __init__(self, model, exe):
+        self.model = model
+        self.exe = exe
+
+    def available(self):
+        return bool(self.exe) and shutil.which(self.exe) is not None
+
+    @staticmethod
+    def _drain(pipe, tail):
+        for chunk in iter(lambda: pipe.read1(1024), b""):
+            tail.extend(chunk)
+            del tail[:-STDERR_TAIL]
+
+    def stream(self, prompt, cancel=None, stats=None):
+        # `ollama run` reports no timings; model load is only visible as time to first token.
+        proc = subprocess.Popen([self.exe, "run", self.model], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        watchdog = threading.Timer(READ_TIMEOUT, proc.kill)
+        watchdog.start()
+        # Drain stderr concurrently (progress spinners can fill the pipe and block the child).
+        err_tail = bytearray()
+        drain = threading.Thread(target=self._drain, args=(proc.stderr, err_tail), daemon=True)
+        drain.start()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        produced = False
+        try:
+            proc.stdin.write(prompt.encode("utf-8"))
+            proc.stdin.close()
+            while not (cancel is not None and cancel.is_set()):
+                chunk = proc.stdout.read1(256)
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    produced = True
+                    yield text
+            if not produced and not (cancel is not None and cancel.is_set()):
+                proc.wait()
+                drain.join(timeout=1)
+                err = bytes(err_tail).decode("utf-8", errors="ignore").strip()
+                raise RuntimeError(err or "No response from model.")
+        finally:
+            watchdog.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+
+def _span_stats(ttft, pieces, stats):
+    attrs = {"pieces": len(pieces), "reply_chars": sum(len(p) for p in pieces)}
+    if ttft is not None:
+        attrs["ttft_ms"] = round(ttft * 1000, 3)
+    for key in ("load_duration", "prompt_eval_duration", "eval_duration"):
+        if key in stats:
+            attrs[key.replace("_duration", "_ms")] = round(stats[key] / 1e6, 3)
+    if "prompt_eval_count" in stats:
+        attrs["prompt_tokens"] = stats["prompt_eval_count"]
+    if "eval_count" in stats:
+        attrs["reply_tokens"] = stats["eval_count"]
+    return attrs
+
+
+class LLMClient:
+    """HTTP backend when the server is reachable, subprocess otherwise."""
+
+    def __init__(self, model, exe=None, host=OLLAMA_HOST, keep_alive=KEEP_ALIVE):
+        self.http = OllamaHTTP(model, host, keep_alive)
+        self.subprocess = OllamaSubprocess(model, exe)
+        self._local = threading.local()   # per-thread stats of the last generate() call
+
+    @property
+    def last_backend(self):
+        return getattr(self._local, "backend", None)
+
+    @property
+    def last_ttft(self):
+        """Seconds until the first piece arrived in this thread's last call."""
+        return getattr(self._local, "ttft", None)
+
+    @property
+    def last_stats(self):
+        """Ollama's timings/token counts for this thread's last call ({} for the subprocess)."""
+        return getattr(self._local, "stats", {})
+
+    @property
+    def last_error(self):
+        """Why this thread's last reply broke off (it is then partial), or None."""
+        return self.last_stats.get("error")
+
+    def backends(self):
+        if self.http.available():
+            yield self.http
+        if self.subprocess.available():
+            yield self.subprocess
+
+    def warm_async(self, prefix=""):
+        """Preload the model, and the prompts' static `prefix`, in the background before the first question."""
+        def warm():
+            try:
+                if self.http.available():
+                    self.http.warm(prefix)
+            except requests.exceptions.RequestException:
+                pass
+        threading.Thread(target=warm, daemon=True).start()
+
+    def generate(self, prompt, on_token=None, cancel=None):
+        """Full reply text. Pieces go to `on_token` as they arrive; a set `cancel` stops early.
+        A backend failing mid-reply returns what arrived so far, with the error in last_error."""
+        error = None
+        self._local.backend = self._local.ttft = None
+        self._local.stats = {}
+        for backend in self.backends():
+            start = time.perf_counter()
+            pieces, stats = [], {}
+            with tracing.span("llm.generate", backend=backend.name, model=self.http.model) as span:
+                try:
+                    for piece in backend.stream(prompt, cancel, stats):
+                        if not pieces:
+                            self._local.ttft = time.perf_counter() - start
+                        pieces.append(piece)
+                        if on_token:
+                            on_token(piece)
+                except (requests.exceptions.RequestException, RuntimeError, OSError, ValueError) as e:
+                    error = e
+                    span.set(error=type(e).__name__)
+                    if not pieces:
+                        continue
+                    # Part of the answer is already on screen: return it rather than start over.
+                    stats["error"] = f"{type(e).__name__}: {e}"
+                finally:
+                    span.set(**_span_stats(self._local.ttft if pieces else None, pieces, stats))
+            self._local.backend = backend.name
+            self._local.stats = stats
+            return "".join(pieces)
+        raise RuntimeError(error or "No Ollama server or executable found.")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# prompt_builder.py
+# ---------------------------------------------------------
+# Prompt assembly for the LLM path of smart_search().
+# - A static prefix (persona, answer format, examples) that is
+#   byte-identical on every call, so Ollama keeps it in its
+#   prompt/KV cache and only evaluates the per-question tail
+# - Retrieved context is de-duplicated (repeated scripts,
+#   overloads, shared or placeholder descriptions, access
+#   modifiers) and packed into a token budget, most relevant
+#   script first
+# - Every build reports its size and the tokens saved against
+#   the unpacked prompt (tracing.estimate_tokens)
+# ---------------------------------------------------------
+
+import re
+import threading
+
+import frontends
+import index_store
+import tracing
+
+CONTEXT_BUDGET = 600     # tokens of retrieved context per prompt
+PLACEHOLDERS = ("Auto-generated description for", "No description available", "Auto-added script entry")
+_MODIFIERS = re.compile(r"^(?:(?:public|private|protected|internal|virtual|override|sealed|abstract|extern)\s+)+")
+
+# Everything up to the context must stay identical between calls: no query, time or index data here.
+STATIC_PREFIX = """You are a professional Unity developer specializing in SenseGlove SDK.
+Answer with up to {show_top} relevant scripts and functions, one per line, using this format:
+ScriptName.cs → FunctionName() — short explanation.
+
+Examples:
+Q: How can I make the glove vibrate?
+A: SG_Haptics.cs → SendHapticCommand() — sends vibration to the glove.
+   SG_ObjectVibration.cs → ApplyVibration() — applies vibration to grabbed objects.
+
+Q: How to detect when an object is grabbed?
+A: SG_Grabable.cs → OnGrab() — detects grab event.
+   SG_PhysicsGrab.cs → AttachRigidbody() — attaches object physics to hand.
+
+Q: How to start calibration?
+A: SG_CalibrationVoid.cs → StartCalibration() — starts glove calibration process.
+
+"""
+
+
+def _signature(f):
+    return f.get("signature") or f["name"]
+
+
+def _label(entry):
+    frontend = frontends.for_entry(entry)
+    return "" if frontend is frontends.CSHARP else f" ({frontend.label} API)"
+
+
+def compact_functions(funcs):
+    """Signatures without access modifiers, one per name ("+N overloads"), placeholders dropped."""
+    groups = {}      # name → [first signature, count]; dicts keep first-seen order
+    for f in funcs:
+        name = f.get("name")
+        if not name or name == "UnknownFunction":
+            continue
+        group = groups.setdefault(name, [_MODIFIERS.sub("", _signature(f)), 0])
+        group[1] += 1
+    return [sig + (f" (+{n - 1} overload{'s' if n > 2 else ''})" if n > 1 else "") for sig, n in groups.values()]
+
+
+def raw_context(candidates):
+    """Context as smart_search used to send it: every candidate, every signature, verbatim."""
+    lines = []
+    for entry, funcs in candidates:
+        lines.append(f"{entry['name']}{_label(entry)}: {entry.get('description', '')}")
+        lines.append("  Functions: " + ", ".join(_signature(f) for f in funcs))
+    return "\n".join(lines)
+
+
+class PromptBuilder:
+    """Static prefix + packed context + question; per-thread stats of the last build."""
+
+    def __init__(self, show_top, budget=CONTEXT_BUDGET):
+        self.prefix = STATIC_PREFIX.format(show_top=show_top)
+        self.prefix_tokens = tracing.estimate_tokens(self.prefix)
+        self.budget = budget
+        self.built = 0
+        self._local = threading.local()
+
+    @property
+    def last_stats(self):
+        return getattr(self._local, "stats", {})
+
+    def pack(self, candidates):
+        """(context text, scripts kept, candidates dropped) within the token budget, in ranked order."""
+        lines, used, kept, dropped = [], 0, 0, 0
+        seen_scripts, seen_descs = set(), set()
+        for entry, funcs in candidates:
+            name = index_store.entry_name(entry)
+            if name in seen_scripts:
+                dropped += 1
+                continue
+            seen_scripts.add(name)
+            header = f"{name}{_label(entry)}"
+            desc = (entry.get("description") or "").strip()
+            if desc and not desc.startswith(PLACEHOLDERS) and desc not in seen_descs:
+                seen_descs.add(desc)
+                header += f": {desc}"
+            cost = tracing.estimate_tokens(header) + 1
+            sigs = compact_functions(funcs)
+            taken = []
+            for sig in sigs:
+                extra = tracing.estimate_tokens(sig) + 1
+                if used + cost + extra > self.budget and (taken or kept):
+                    break
+                taken.append(sig)
+                cost += extra
+            if kept and (used + cost > self.budget or (sigs and not taken)):
+                dropped += 1      # a less relevant script that no longer fits; smaller ones may
+                continue
+            lines.append(header)
+            if taken:
+                lines.append("  Functions: " + ", ".join(taken))
+            used += cost
+            kept += 1
+        return "\n".join(lines), kept, dropped
+
+    def build(self, query, candidates):
+        """Full prompt for `query` over ranked [(entry, [functions])] candidates."""
+        context, kept, dropped = self.pack(candidates)
+        tail = f"Scripts and their functions:\n{context}\n\nQ: {query}\nA:"
+        prompt = self.prefix + tail
+        total = tracing.estimate_tokens(prompt)
+        baseline = self.prefix_tokens + tracing.estimate_tokens(raw_context(candidates)) + \
+            tracing.estimate_tokens(f"\n\nUser query: \"{query}\"\n")
+        # After the first call the model holds the prefix in its cache; only the tail is evaluated.
+        cached = self.built > 0
+        evaluated = total - self.prefix_tokens if cached else total
+        self.built += 1
+        self._local.stats = {
+            "prompt_tokens": total, "prefix_tokens": self.prefix_tokens, "context_tokens": tracing.estimate_tokens(context),
+            "evaluated_tokens": evaluated, "baseline_tokens": baseline, "tokens_saved": max(baseline - evaluated, 0),
+            "scripts": kept, "dropped": dropped, "prefix_cached": cached,
+        }
+        return prompt
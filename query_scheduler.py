@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# query_scheduler.py
+# ---------------------------------------------------------
+# Runs assistant queries off the Tk thread.
+# - Bounded worker pool for retrieval + LLM calls
+# - Workers never touch widgets: progress, streamed tokens and
+#   results go into a queue the GUI drains with root.after()
+# - Every query has its own cancel Event
+# - Only the newest MAX_ACTIVE queries are kept; older ones are
+#   cancelled (running) or dropped (still queued) as stale
+# ---------------------------------------------------------
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+MAX_WORKERS = 2          # Ollama answers one prompt at a time per model anyway
+MAX_ACTIVE = 3           # running + waiting queries kept before the oldest is dropped
+
+# Event kinds put on the results queue
+STARTED, TOKEN, DONE, ERROR, CANCELLED, STALE = "started", "token", "done", "error", "cancelled", "stale"
+
+
+class Job:
+    def __init__(self, job_id, query):
+        self.id = job_id
+        self.query = query
+        self.cancel = threading.Event()
+        self.stale = False
+        self.submitted = time.perf_counter()
+
+
+class QueryScheduler:
+    """Bounded pool running `worker(query, on_token, cancel)`; results come back via poll()."""
+
+    def __init__(self, worker, max_workers=MAX_WORKERS, max_active=MAX_ACTIVE):
+        self.worker = worker
+        self.max_active = max_active
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self.results = queue.Queue()
+        self.active = {}        # job id → Job, oldest first
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, query):
+        """Queue `query`; returns its job id. The oldest queries beyond max_active go stale."""
+        job = Job(next(self._ids), query)
+        with self._lock:
+            self.active[job.id] = job
+            while len(self.active) > self.max_active:
+                old = self.active.pop(next(iter(self.active)))
+                old.stale = True
+                old.cancel.set()
+                self.results.put((old.id, STALE, None))
+        self.pool.submit(self._run, job)
+        return job.id
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.active.get(job_id)
+        if job is not None:
+            job.cancel.set()
+
+    def cancel_all(self):
+        with self._lock:
+            jobs = list(self.active.values())
+        for job in jobs:
+            job.cancel.set()
+
+    def _finish(self, job, kind, payload):
+        with self._lock:
+            self.active.pop(job.id, None)
+        if not job.stale:
+            self.results.put((job.id, kind, payload))
+
+    def _run(self, job):
+        if job.cancel.is_set():
+            return self._finish(job, CANCELLED, None)   # dropped before it started
+        waited = time.perf_counter() - job.submitted
+        self.results.put((job.id, STARTED, waited))
+
+        def on_token(piece):
+            if not job.cancel.is_set():
+                self.results.put((job.id, TOKEN, piece))
+
+        try:
+            with tracing.span("job", job=job.id, queue_ms=round(waited * 1000, 3)):
+                result = self.worker(job.query, on_token, job.cancel)
+        except Exception as e:
+            return self._finish(job, ERROR, e)
+        self._finish(job, CANCELLED if job.cancel.is_set() else DONE, result)
+
+    def poll(self, limit=500):
+        """Drain up to `limit` pending events without blocking: [(job id, kind, payload)]."""
+        events = []
+        try:
+            while len(events) < limit:
+                events.append(self.results.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+    def shutdown(self):
+        self.cancel_all()
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# retrieval.py
+# ---------------------------------------------------------
+# Lexical pre-retrieval for smart_search().
+# - Inverted index with BM25 scoring over script names,
+#   CamelCase-split function names, classes and doc comments
+# - Built at index time and saved next to the index
+#   (<index>.bm25.json), tagged with the index fingerprint
+# - Picks the top-K scripts and their best-matching functions
+#   so the LLM prompt only carries relevant context
+# ---------------------------------------------------------
+
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+import frontends
+import index_store
+import snapshot_cache
+import tracing
+
+K1 = 1.2
+B = 0.75
+FORMAT_VERSION = 1
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "from", "by",
+    "is", "are", "be", "it", "its", "this", "that", "my", "me", "i", "you", "your", "we",
+    "how", "do", "does", "can", "what", "which", "where", "when", "why", "should", "would",
+    "want", "need", "make", "using", "use", "script", "scripts", "function", "functions",
+    "cs", "hpp", "sg", "sgex", "unity", "senseglove",
+}
+_SUFFIXES = ("ational", "ations", "ation", "ating", "ated", "ates", "ate", "ings", "ing",
+             "ions", "ion", "ers", "er", "ies", "ied", "es", "ed", "e", "ly", "s")
+_CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_WORD = re.compile(r"[A-Za-z0-9_]+")
+
+
+# ---------- Text normalization ----------
+
+def stem(word):
+    """Tiny suffix stripper: vibrate / vibration / vibrating → vibr."""
+    for suf in _SUFFIXES:
+        if word.endswith(suf) and len(word) - len(suf) >= 3:
+            word = word[:-len(suf)]
+            break
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "aeiou":
+        word = word[:-1]  # grabb → grab
+    return word
+
+
+def split_identifier(ident):
+    """SendImpactVibration → [send, impact, vibration, sendimpactvibration]."""
+    parts = [p.lower() for chunk in ident.split("_") for p in _CAMEL.findall(chunk)]
+    whole = ident.replace("_", "").lower()
+    return parts + [whole] if len(parts) > 1 else parts
+
+
+def tokenize(text):
+    """Identifier-aware, stop-worded, stemmed tokens of free text or code names."""
+    tokens = []
+    for word in _WORD.findall(text or ""):
+        for part in split_identifier(word):
+            if part not in STOPWORDS:
+                tokens.append(stem(part))
+    return tokens
+
+
+def index_path_for(index_file):
+    base, _ = os.path.splitext(index_file)
+    return base + ".bm25.json"
+
+
+# ---------- Document fields ----------
+
+def _functions(entry):
+    funcs = entry.get("functions", []) if isinstance(entry, dict) else []
+    return [f if isinstance(f, dict) else {"name": str(f)} for f in funcs]
+
+
+def _script_tokens(entry):
+    if not isinstance(entry, dict):
+        return []
+    name = frontends.stem(index_store.entry_name(entry))
+    tokens = tokenize(name) * 3
+    tokens += tokenize(" ".join(entry.get("classes", []))) * 2
+    tokens += tokenize(entry.get("description") or entry.get("summary", ""))
+    for f in _functions(entry):
+        tokens += tokenize(f.get("name", ""))
+    return tokens
+
+
+def _function_tokens(func):
+    return tokenize(func.get("name", "")) * 2 + tokenize(func.get("description", ""))
+
+
+# ---------- BM25 index ----------
+
+class LexicalIndex:
+    """BM25 inverted index over scripts (and, within them, functions)."""
+
+    def __init__(self, data):
+        self.data = data
+        self.fingerprint = data.get("fingerprint", "")
+        self.postings = data["postings"]
+        self.doc_len = data["doc_len"]
+        self.avgdl = data["avgdl"] or 1.0
+        self.func_postings = data["func_postings"]
+        self.func_len = data["func_len"]
+        self.func_avgdl = data["func_avgdl"] or 1.0
+        n = len(self.doc_len)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()}
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    @classmethod
+    def build(cls, scripts, fingerprint=""):
+        postings = defaultdict(list)
+        func_postings = defaultdict(list)
+        doc_len, func_len = [], {}
+        for i, entry in enumerate(scripts):
+            tokens = _script_tokens(entry)
+            doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append([i, tf])
+            for j, func in enumerate(_functions(entry)):
+                ftokens = _function_tokens(func)
+                func_len[f"{i}:{j}"] = len(ftokens)
+                for term, tf in Counter(ftokens).items():
+                    func_postings[term].append([i, j, tf])
+        return cls({
+            "version": FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "postings": dict(postings),
+            "doc_len": doc_len,
+            "avgdl": sum(doc_len) / len(doc_len) if doc_len else 0.0,
+            "func_postings": dict(func_postings),
+            "func_len": func_len,
+            "func_avgdl": sum(func_len.values()) / len(func_len) if func_len else 0.0,
+        })
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError("outdated lexical index")
+        return cls(data)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, separators=(",", ":"))
+
+    def search(self, query, k=8, funcs_per_script=6):
+        """Return [(score, script_index, [function_index, ...])] best first."""
+        terms = set(tokenize(query))
+        scores = defaultdict(float)
+        for t in terms:
+            idf = self.idf.get(t)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[t]:
+                norm = K1 * (1 - B + B * self.doc_len[doc] / self.avgdl)
+                scores[doc] += idf * tf * (K1 + 1) / (tf + norm)
+        top = sorted(scores.items(), key=lambda s: -s[1])[:k]
+        wanted = {doc for doc, _ in top}
+
+        func_scores = defaultdict(float)
+        for t in terms:
+            idf = self.idf.get(t, 0.0)
+            for doc, j, tf in self.func_postings.get(t, ()):
+                if doc in wanted:
+                    norm = K1 * (1 - B + B * self.func_len[f"{doc}:{j}"] / self.func_avgdl)
+                    func_scores[(doc, j)] += idf * tf * (K1 + 1) / (tf + norm)
+        per_doc = defaultdict(list)
+        for (doc, j), s in sorted(func_scores.items(), key=lambda x: -x[1]):
+            if len(per_doc[doc]) < funcs_per_script:
+                per_doc[doc].append(j)
+        return [(score, doc, per_doc.get(doc, [])) for doc, score in top]
+
+
+# ---------- Build / load next to the index ----------
+
+def rebuild(index_file=index_store.DEFAULT_INDEX):
+    """Build the lexical index for `index_file` and save it alongside. Called by the indexers."""
+    with tracing.span("retrieval.rebuild"):
+        store = index_store.open_store(index_file)
+        lex = LexicalIndex.build(list(store), store.fingerprint())
+        lex.save(index_path_for(index_file))
+        return lex
+
+
+def get_retriever(data, index_file=None):
+    """Lexical index matching `data`; loads the saved one if its fingerprint is current."""
+    return _cache.get(data, index_file)
+
+
+def prime(data, index_file=None):
+    """Build the lexical index for a freshly loaded `data` off the query path, then make it current."""
+    return _cache.prime(data, index_file)
+
+
+def _load_or_build(data, index_file):
+    if not index_file:
+        return LexicalIndex.build(list(data))
+    store = index_store.open_store(index_file)
+    side = index_path_for(index_file)
+    try:
+        fingerprint = store.fingerprint()
+    except (OSError, ValueError):
+        fingerprint = ""
+    if not index_store.is_current(data, fingerprint):
+        # The sidecar describes other entries (a newer index, or an unknown one): memory only.
+        return LexicalIndex.build(list(data), getattr(data, "fingerprint", ""))
+    try:
+        lex = LexicalIndex.load(side) if os.path.exists(side) else None
+        if lex is not None and (lex.fingerprint != fingerprint or len(lex) != len(data)):
+            lex = None
+    except (OSError, ValueError):
+        lex = None
+    if lex is None:
+        lex = LexicalIndex.build(list(data), fingerprint)
+        with index_store.side_index_lock(data, index_file) as current:
+            if current:
+                lex.save(side)
+    return lex
+
+
+_cache = snapshot_cache.SnapshotCache(_load_or_build)
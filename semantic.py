@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# semantic.py
+# ---------------------------------------------------------
+# Optional embedding-based retrieval next to BM25.
+# - One vector per script (name, classes, description) and per
+#   function (name, signature, doc comment)
+# - Embedder: a local Ollama embedding model when
+#   SENSEGLOVE_EMBED_MODEL is set (e.g. nomic-embed-text),
+#   otherwise an offline hashing vectorizer over words,
+#   word pairs and character trigrams
+# - Vectors live in a float32 matrix next to the index
+#   (<index>.vectors.<generation>.f32, memory-mapped) with a
+#   small JSON manifest naming the current generation; rows are
+#   content-hashed so a refresh only embeds entries whose text
+#   changed. A refresh writes a new generation instead of
+#   replacing a file that loaded indexes still have mapped
+# - Top-K cosine search is one matrix-vector product
+# - Needs numpy; without it this stage is skipped
+# ---------------------------------------------------------
+
+import hashlib
+import json
+import math
+import os
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # semantic retrieval is optional
+    np = None
+
+import requests
+
+import frontends
+import index_store
+import retrieval
+import snapshot_cache
+import tracing
+
+FORMAT_VERSION = 1
+HASH_DIM = 512
+EMBED_MODEL = os.getenv("SENSEGLOVE_EMBED_MODEL", "")
+EMBED_BATCH = 64
+MIN_SCORE = 0.05
+ENABLED = os.getenv("SENSEGLOVE_SEMANTIC", "1") != "0"
+
+
+def available():
+    return ENABLED and np is not None
+
+
+def paths_for(index_file, generation=None):
+    """(matrix file of `generation`, manifest file); generation None is the pre-generation file name."""
+    base, _ = os.path.splitext(index_file)
+    vectors = base + (f".vectors.{generation}.f32" if generation else ".vectors.f32")
+    return vectors, base + ".vectors.json"
+
+
+def _generations(index_file):
+    """{generation: matrix file} of every matrix written next to `index_file` (0 = pre-generation name)."""
+    legacy, _ = paths_for(index_file)
+    folder, prefix = os.path.split(legacy[:-len("f32")])
+    found = {0: legacy} if os.path.exists(legacy) else {}
+    for name in os.listdir(folder or "."):
+        gen = name[len(prefix):-len(".f32")]
+        if name.startswith(prefix) and name.endswith(".f32") and gen.isdigit():
+            found[int(gen)] = os.path.join(folder, name)
+    return found
+
+
+# ---------- Embedders ----------
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of words, word pairs and char trigrams."""
+
+    def __init__(self, dim=HASH_DIM):
+        self.dim = dim
+        self.name = f"hashing-v1-{dim}"
+
+    @staticmethod
+    def features(text):
+        tokens = retrieval.tokenize(text)
+        feats = [(t, 1.0) for t in tokens]
+        feats += [(f"{a} {b}", 0.5) for a, b in zip(tokens, tokens[1:])]
+        for t in tokens:
+            # Trigrams let "clips" meet "clipping" and tolerate typos.
+            padded = f"<{t}>"
+            feats += [(padded[i:i + 3], 0.3) for i in range(len(padded) - 2)]
+        return feats
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            weights = {}
+            for feat, w in self.features(text):
+                weights[feat] = weights.get(feat, 0.0) + w
+            for feat, w in weights.items():
+                h = zlib.crc32(feat.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                out[row, h % self.dim] += sign * (1.0 + math.log(w)) if w >= 1 else sign * w
+        return _normalize(out)
+
+
+class OllamaEmbedder:
+    """Embeddings from a local Ollama model via /api/embed."""
+
+    def __init__(self, model, host=None):
+        import llm_backend
+        self.model = model
+        self.host = llm_backend._host_url(host or llm_backend.OLLAMA_HOST)
+        self.name = f"ollama-{model}"
+        self.session = requests.Session()
+
+    def embed(self, texts):
+        vectors = []
+        for i in range(0, len(texts), EMBED_BATCH):
+            r = self.session.post(f"{self.host}/api/embed",
+                                  json={"model": self.model, "input": texts[i:i + EMBED_BATCH]}, timeout=120)
+            r.raise_for_status()
+            vectors.extend(r.json()["embeddings"])
+        return _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1))
+
+
+def _normalize(m):
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+
+def get_embedder():
+    return OllamaEmbedder(EMBED_MODEL) if EMBED_MODEL else HashingEmbedder()
+
+
+# ---------- Rows ----------
+
+def _rows(scripts):
+    """(script index, function index or -1, text) for every embeddable entry."""
+    for i, entry in enumerate(scripts):
+        if not isinstance(entry, dict):
+            continue
+        name = index_store.entry_name(entry)
+        head = " ".join([frontends.stem(name), " ".join(entry.get("classes", [])),
+                         entry.get("description") or entry.get("summary", "")])
+        yield i, -1, head
+        for j, f in enumerate(retrieval._functions(entry)):
+            if f.get("name") and f["name"] != "UnknownFunction":
+                text = " ".join([f["name"], f.get("signature", ""), f.get("description", ""), name])
+                yield i, j, text
+
+
+def _text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+# ---------- Vector index ----------
+
+class VectorIndex:
+    """Memory-mapped float32 matrix of unit vectors plus the row → entry mapping."""
+
+    def __init__(self, matrix, manifest, embedder):
+        self.matrix = matrix
+        self.manifest = manifest
+        self.fingerprint = manifest.get("fingerprint", "")
+        self.script_ids = np.asarray(manifest["script"], dtype=np.int64)
+        self.func_ids = np.asarray(manifest["func"], dtype=np.int64)
+        self.embedder = embedder
+
+    def __len__(self):
+        return int(self.script_ids.max()) + 1 if len(self.script_ids) else 0
+
+    @classmethod
+    def load(cls, index_file, embedder):
+        _, man_path = paths_for(index_file)
+        with open(man_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        vec_path, _ = paths_for(index_file, manifest.get("generation"))
+        if manifest.get("version") != FORMAT_VERSION or manifest.get("model") != embedder.name:
+            raise ValueError("outdated vector index")
+        rows, dim = manifest["rows"], manifest["dim"]
+        matrix = np.memmap(vec_path, dtype=np.float32, mode="r", shape=(rows, dim)) if rows else \
+            np.zeros((0, dim), dtype=np.float32)
+        return cls(matrix, manifest, embedder)
+
+    def search(self, query, k=8, funcs_per_script=6):
+        """Return [(score, script_index, [function_index, ...])] best first, like BM25."""
+        if not len(self.script_ids):
+            return []
+        q = self.embedder.embed([query])[0]
+        scores = self.matrix @ q
+        n = min(len(scores), k * (funcs_per_script + 1) * 4)
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+
+        best, funcs = {}, {}
+        for r in top:
+            s = float(scores[r])
+            if s < MIN_SCORE:
+                break
+            i, j = int(self.script_ids[r]), int(self.func_ids[r])
+            best[i] = max(best.get(i, 0.0), s)
+            if j >= 0 and len(funcs.setdefault(i, [])) < funcs_per_script:
+                funcs[i].append(j)
+        ranked = sorted(best.items(), key=lambda x: -x[1])[:k]
+        return [(s, i, funcs.get(i, [])) for i, s in ranked]
+
+
+def _load_saved(index_file, embedder):
+    try:
+        return VectorIndex.load(index_file, embedder) if index_file else None
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _embed(scripts, fingerprint, embedder, old):
+    """(matrix, manifest, rows embedded) for `scripts`, reusing the vectors of `old` by text hash."""
+    rows = list(_rows(scripts))
+    hashes = [_text_hash(text) for _, _, text in rows]
+    old_pos = {h: k for k, h in enumerate(old.manifest["hash"])} if old is not None else {}
+
+    todo = [k for k, h in enumerate(hashes) if h not in old_pos]
+    new_vectors = embedder.embed([rows[k][2] for k in todo]) if todo else None
+    dim = new_vectors.shape[1] if new_vectors is not None else (old.matrix.shape[1] if old else HASH_DIM)
+    matrix = np.empty((len(rows), dim), dtype=np.float32)
+    for k, h in enumerate(hashes):
+        if h in old_pos:
+            matrix[k] = old.matrix[old_pos[h]]
+    if todo:
+        matrix[todo] = new_vectors
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "model": embedder.name,
+        "fingerprint": fingerprint,
+        "rows": len(rows),
+        "dim": dim,
+        "script": [i for i, _, _ in rows],
+        "func": [j for _, j, _ in rows],
+        "hash": hashes,
+    }
+    return matrix, manifest, len(todo)
+
+
+def build(scripts, index_file, fingerprint="", embedder=None):
+    """Write the vector index for `scripts`, embedding only rows whose text is new."""
+    embedder = embedder or get_embedder()
+    old = _load_saved(index_file, embedder)
+    matrix, manifest, embedded = _embed(scripts, fingerprint, embedder, old)
+    del old
+    return _write(index_file, matrix, manifest, embedder, embedded)
+
+
+def _write(index_file, matrix, manifest, embedder, embedded):
+    """Save `matrix` as the next generation of the vector index and return it loaded."""
+    # Cached VectorIndex objects may still map the current matrix (Windows cannot replace a mapped
+    # file), so the new one gets the next generation's name and the manifest is switched over to it.
+    generations = _generations(index_file)
+    manifest["generation"] = max(generations, default=0) + 1
+    vec_path, man_path = paths_for(index_file, manifest["generation"])
+    matrix.tofile(vec_path + ".tmp")
+    os.replace(vec_path + ".tmp", vec_path)
+    with open(man_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(man_path + ".tmp", man_path)
+    for path in generations.values():
+        try:
+            os.remove(path)
+        except OSError:
+            pass         # still mapped (Windows): removed by a later build
+    print(f"🧭 Semantic index: {embedded} rows embedded, {manifest['rows'] - embedded} reused ({embedder.name}).")
+    return VectorIndex.load(index_file, embedder)
+
+
+def rebuild(index_file=index_store.DEFAULT_INDEX):
+    """Refresh the vector index for `index_file`. Called by the indexers; no-op without numpy."""
+    if not available():
+        return None
+    store = index_store.open_store(index_file)
+    try:
+        with tracing.span("semantic.rebuild"):
+            return build(list(store), index_file, store.fingerprint())
+    except (OSError, requests.exceptions.RequestException) as e:
+        print(f"⚠️ Semantic index not built: {e}")
+        return None
+
+
+def get_searcher(data, index_file=None):
+    """Vector index matching `data`, rebuilt incrementally if stale; None when unavailable."""
+    return _cache.get(data, index_file)
+
+
+def prime(data, index_file=None):
+    """Build the vector index for a freshly loaded `data` off the query path, then make it current."""
+    return _cache.prime(data, index_file)
+
+
+def _load_or_build(data, index_file):
+    if not available() or not index_file:
+        return None
+    embedder = get_embedder()
+    fingerprint = index_store.open_store(index_file).fingerprint()
+    try:
+        if not index_store.is_current(data, fingerprint):
+            # Another snapshot's vectors are on disk: embed in memory, reusing them where the text matches.
+            matrix, manifest, _ = _embed(data, getattr(data, "fingerprint", ""), embedder,
+                                         _load_saved(index_file, embedder))
+            return VectorIndex(matrix, manifest, embedder)
+        old = _load_saved(index_file, embedder)
+        if old is not None and old.fingerprint == fingerprint and len(old) <= len(data):
+            return old
+        matrix, manifest, embedded = _embed(data, fingerprint, embedder, old)
+        del old
+        with index_store.side_index_lock(data, index_file) as current:
+            if current:
+                return _write(index_file, matrix, manifest, embedder, embedded)
+        return VectorIndex(matrix, manifest, embedder)
+    except (OSError, requests.exceptions.RequestException) as e:
+        print(f"⚠️ Semantic retrieval disabled: {e}")
+        return None
+
+
+_cache = snapshot_cache.SnapshotCache(_load_or_build)
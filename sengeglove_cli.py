@@ -3,30 +3,78 @@
 # SenseGlove Assistant v3.0 — Fully Stable & Self-Healing
 # ---------------------------------------------------------
 # ✨ Features:
-# - Opens suggested scripts directly on GitHub
+# - Opens suggested scripts at the function's line: local copy in
+#   VS Code, or a GitHub permalink pinned to the indexed commit
 # - Detects and fixes broken JSON structures
 # - Syncs GitHub updates automatically if new scripts exist
 # - Friendly GUI with clean ChatGPT-like styling
+# - Headless batch mode for scripts/CI:
+#     python sengeglove_cli.py --batch questions.jsonl --jobs 4 > answers.jsonl
+# - Per-stage tracing (--trace → senseglove_trace.jsonl) and a
+#   debug panel (🐞 / F12) with live spans and counters
+# - Instant usage answers ("what calls X", "which scripts use Y")
+#   from the cross-reference graph (xref.py)
+# - One index for the Unity C# scripts and the native C++ API
+#   headers (frontends.py)
+# - SDK version picker: switch between indexed releases without
+#   re-fetching, and ask "what changed between v2.4 and v2.5"
+#   (versions.py)
+# - Live watch mode (--watch): local script edits are re-parsed
+#   and swapped into the running assistant (watcher.py)
+# - Token-budgeted LLM prompts with a static, cache-friendly
+#   prefix; each answer reports the tokens saved (prompt_builder.py)
 # ---------------------------------------------------------
 
 import os
+import argparse
+import contextlib
 import json
-import re
-import subprocess
-import threading
+import math
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import tkinter as tk
 from tkinter import PhotoImage, Canvas, Scrollbar, messagebox
 
+import answer_cache
+import fast_answer
 import github_updater  # local module
+import index_store
+import llm_backend
+import prompt_builder
+import query_scheduler
+import retrieval
+import semantic
+import symbol_locator
+import tracing
+import transcript
+import versions
+import watcher
+import xref
 
 # ---------- CONFIG ----------
-INDEX_FILE = "senseglove_index_with_functions.json"
+INDEX_FILE = index_store.DEFAULT_INDEX
 OLLAMA_PATH = r"C:\Users\mkarim1\AppData\Local\Programs\Ollama\ollama.exe"
 OLLAMA_MODEL = "llama3.2"
 SHOW_TOP = 4
+CONTEXT_SCRIPTS = 8      # scripts passed to the LLM after lexical + semantic retrieval
+CONTEXT_FUNCS = 6        # best-matching functions listed per script
+CONTEXT_TOKENS = prompt_builder.CONTEXT_BUDGET   # token budget the ranked context is packed into
+RRF_K = 60               # reciprocal-rank fusion constant for BM25 + embeddings
+FAST_CONFIDENCE = 0.75   # answer from the index alone at or above this
+FAST_BUDGET_MS = 50      # latency budget of the no-LLM path
+FORCE_LLM_PREFIX = "/llm"
+CACHE_FILE = answer_cache.CACHE_FILE
+NO_RESULT = "No relevant scripts or functions found."
 LOGO_FILE = "senseglove_logo.png"
-
-SCRIPT_DIR = None
+POLL_MS = 16             # result-queue poll interval (~60 fps)
+HISTORY_FILE = transcript.HISTORY_FILE
+WINDOW = 40              # chat bubbles kept as widgets at once
+PAGE = 20                # older bubbles paged in per scroll-up
+DEBUG_REFRESH_MS = 500   # debug panel refresh interval
+DEBUG_TRACES = 15        # most recent traces listed in the debug panel
+
+SCRIPT_DIR = None        # local SenseGlove-Unity checkout; None = the vendored copies
 VSCODE_EXE = r"C:\Users\mkarim1\AppData\Local\Programs\Microsoft VS Code\Code.exe"
 
 # GUI theme
@@ -39,118 +87,310 @@ ACCENT_COLOR = "#10A37F"
 
 # ---------- HELPER: LOAD + FIX INDEX ----------
 def load_index():
-    """Load or rebuild the index; auto-fix malformed data."""
-    if not os.path.exists(INDEX_FILE):
+    """Open the index (lazily for SQLite); repair malformed data without needless rewrites."""
+    with tracing.span("load_index") as span:
+        data = _load_index()
+        span.set(scripts=len(data), lazy=isinstance(data, index_store.IndexView))
+        return data
+
+
+def _load_index():
+    store = index_store.open_store(INDEX_FILE)
+    if not store.exists():
         print("⚠️ Index not found — fetching from GitHub...")
         github_updater.update_index()
 
     try:
-        with open(INDEX_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if store.lazy:
+            # Rows are decoded and repaired on access; startup cost is independent of size.
+            data = index_store.IndexView(store, index_store.normalize_entry)
+            print(f"✅ Index opened — {len(data)} scripts available.")
+            return data
+        scripts = store.snapshot()
     except Exception as e:
-        print(f"❌ Failed to read JSON: {e}. Regenerating...")
+        print(f"❌ Failed to read index: {e}. Regenerating...")
         github_updater.update_index()
-        with open(INDEX_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-    scripts = data.get("scripts", data) if isinstance(data, dict) else data
-    fixed = []
-    for entry in scripts:
-        if isinstance(entry, str):
-            fixed.append({"name": entry, "description": "Auto-added script entry", "functions": []})
-            continue
-        if not isinstance(entry, dict):
-            continue
-        name = entry.get("name", "Unnamed Script")
-        desc = entry.get("description", "No description available.")
-        funcs = entry.get("functions", [])
-        if not funcs:
-            funcs = [{"name": "UnknownFunction", "description": "No function details available."}]
-        elif isinstance(funcs[0], str):
-            funcs = [{"name": fn, "description": "Recovered function"} for fn in funcs]
-        elif isinstance(funcs[0], dict) and "description" not in funcs[0]:
-            for f in funcs:
-                f["description"] = "Auto-fixed description."
-        fixed.append({"name": name, "description": desc, "functions": funcs})
-
-    with open(INDEX_FILE, "w", encoding="utf-8") as f:
-        json.dump({"scripts": fixed}, f, indent=2)
-    print(f"✅ JSON validated — {len(fixed)} scripts loaded.")
-    return fixed
+        store = index_store.open_store(INDEX_FILE)
+        scripts = store.snapshot()
+
+    fixed = [f for f in (index_store.normalize_entry(e) for e in scripts) if f is not None]
+    if fixed != scripts:
+        with index_store.WRITE_LOCK:
+            store.replace_all(fixed)
+            scripts = store.snapshot()
+        print("🩹 Repaired malformed entries and saved the index.")
+    print(f"✅ JSON validated — {len(scripts)} scripts loaded.")
+    return scripts
 
 
 # ---------- HELPER: LLM ----------
-def local_llm(prompt: str) -> str:
-    """Run a local Ollama LLM query safely."""
+# Ollama HTTP API (kept-alive, streaming) with `ollama run` as the fallback.
+llm = llm_backend.LLMClient(OLLAMA_MODEL, OLLAMA_PATH)
+cache = answer_cache.AnswerCache(CACHE_FILE)
+prompts = prompt_builder.PromptBuilder(SHOW_TOP, CONTEXT_TOKENS)
+
+
+def local_llm(prompt: str, on_token=None, cancel=None) -> str:
+    """Run a local Ollama LLM query safely, streaming pieces to `on_token`."""
     try:
-        result = subprocess.run(
-            [OLLAMA_PATH, "run", OLLAMA_MODEL],
-            input=prompt.encode("utf-8"),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=90,
-        )
-        output = result.stdout.decode("utf-8").strip()
-        if not output:
-            err = result.stderr.decode("utf-8").strip()
-            return f"[LLM Error] {err or 'No response from model.'}"
-        return output
+        output = llm.generate(prompt, on_token, cancel).strip()
+        return output or "[LLM Error] No response from model."
     except Exception as e:
         return f"[LLM Error] {e}"
 
 
 # ---------- SMART SEARCH ----------
-def smart_search(query: str, data):
+def fuse_hits(*rankings, k=CONTEXT_SCRIPTS):
+    """Reciprocal-rank fusion of several [(score, script, [funcs])] rankings."""
+    scores, funcs = {}, {}
+    for ranking in rankings:
+        for rank, (_, idx, func_ids) in enumerate(ranking):
+            scores[idx] = scores.get(idx, 0.0) + 1.0 / (RRF_K + rank + 1)
+            merged = funcs.setdefault(idx, [])
+            merged.extend(j for j in func_ids if j not in merged)
+    best = sorted(scores.items(), key=lambda s: -s[1])[:k]
+    return [(score, idx, funcs[idx][:CONTEXT_FUNCS]) for idx, score in best]
+
+
+def build_context(query: str, data):
+    """Rank the scripts/functions most relevant to `query` (BM25 + embeddings): [(entry, [functions])]."""
+    with tracing.span("context.bm25") as span:
+        retriever = retrieval.get_retriever(data, INDEX_FILE)
+        hits = retriever.search(query, k=CONTEXT_SCRIPTS, funcs_per_script=CONTEXT_FUNCS)
+        span.set(hits=len(hits))
+    with tracing.span("context.semantic") as span:
+        searcher = semantic.get_searcher(data, INDEX_FILE)
+        vec_hits = [] if searcher is None else \
+            searcher.search(query, k=CONTEXT_SCRIPTS, funcs_per_script=CONTEXT_FUNCS)
+        span.set(hits=len(vec_hits), enabled=searcher is not None)
+    if searcher is not None:
+        # Embeddings catch paraphrases BM25 misses ("finger clips through objects").
+        hits = fuse_hits(hits, vec_hits)
+    if not hits:
+        # Nothing matched lexically: fall back to a small slice so the LLM has something.
+        hits = [(0.0, i, []) for i in range(min(CONTEXT_SCRIPTS, len(data)))]
+
+    candidates = []
+    for _, idx, func_ids in hits:
+        d = data[idx]
+        funcs = d["functions"]
+        candidates.append((d, [funcs[j] for j in func_ids if j < len(funcs)] or funcs[:CONTEXT_FUNCS]))
+    return candidates
+
+
+def smart_search(query: str, data, on_token=None, cancel=None):
     """Use the LLM to map a query → script + function."""
     if not data:
         return "No script data loaded."
 
-    context = "\n".join(
-        f"{d['name']}: {d.get('description','')}\n"
-        f"  Functions: {', '.join(f['name'] for f in d['functions'][:8])}"
-        for d in data[:80]
-    )
-
-    examples = """
-Examples:
-Q: How can I make the glove vibrate?
-A: SG_Haptics.cs → SendHapticCommand() — sends vibration to the glove.
-   SG_ObjectVibration.cs → ApplyVibration() — applies vibration to grabbed objects.
-
-Q: How to detect when an object is grabbed?
-A: SG_Grabable.cs → OnGrab() — detects grab event.
-   SG_PhysicsGrab.cs → AttachRigidbody() — attaches object physics to hand.
-
-Q: How to start calibration?
-A: SG_CalibrationVoid.cs → StartCalibration() — starts glove calibration process.
-"""
-
-    prompt = f"""
-You are a professional Unity developer specializing in SenseGlove SDK.
-
-Scripts and their functions:
-{context}
-
-{examples}
-
-User query: "{query}"
-
-List up to {SHOW_TOP} relevant scripts and functions using this format:
-ScriptName.cs → FunctionName() — short explanation.
-"""
-
-    reply = local_llm(prompt)
-    return reply if len(reply) > 5 else "No relevant scripts or functions found."
-
-
-def extract_script_names(text):
-    """Extract script filenames from model output."""
-    return re.findall(r"(SG_[A-Za-z0-9_]+\.cs)", text)
+    with tracing.span("build_context") as span:
+        candidates = build_context(query, data)
+        prompt = prompts.build(query, candidates)
+        stats = prompts.last_stats
+        span.set(candidates=len(candidates), scripts=stats["scripts"], context_tokens=stats["context_tokens"])
+
+    tracing.event("prompt", chars=len(prompt), tokens_est=stats["prompt_tokens"],
+                  prefix_tokens=stats["prefix_tokens"], tokens_saved=stats["tokens_saved"])
+    reply = local_llm(prompt, on_token, cancel)
+    return reply if len(reply) > 5 else NO_RESULT
+
+
+def answer_query(query: str, data, on_token=None, cancel=None):
+    """Return (reply, path, elapsed_ms): instant index answer when confident, LLM otherwise."""
+    with tracing.span("query", chars=len(query)) as span:
+        reply, path, elapsed = _answer_query(query, data, on_token, cancel)
+        span.set(source=SOURCES.get(path[:1], "llm"), reply_chars=len(reply))
+        return reply, path, elapsed
+
+
+def _answer_query(query, data, on_token, cancel):
+    start = time.perf_counter()
+    with tracing.span("retriever"):
+        retriever = retrieval.get_retriever(data, INDEX_FILE)
+    force_llm = query.lower().startswith(FORCE_LLM_PREFIX)
+    if force_llm:
+        query = query[len(FORCE_LLM_PREFIX):].strip()
+    else:
+        with tracing.span("xref"):
+            graph = xref.get_graph(data, INDEX_FILE)
+            store = versions.get_store()
+        with tracing.span("fast_path") as span:
+            text, confidence, how = fast_answer.answer(query, data, retriever, limit=SHOW_TOP,
+                                                       graph=graph, versions=store)
+            span.set(confidence=round(confidence, 3), how=how)
+        elapsed = (time.perf_counter() - start) * 1000
+        if elapsed > FAST_BUDGET_MS:
+            print(f"⚠️ Fast path took {elapsed:.0f} ms (budget {FAST_BUDGET_MS} ms).")
+        if text and confidence >= FAST_CONFIDENCE:
+            return text, f"⚡ Instant · {how} · confidence {confidence:.2f}", elapsed
+
+    # The index fingerprint is part of the key: a refreshed index never serves old answers.
+    key = cache.key(query, retriever.fingerprint, OLLAMA_MODEL)
+    with tracing.span("cache.lookup") as span:
+        cached = None if force_llm else cache.get(key)
+        span.set(hit=cached is not None)
+    if cached is not None:
+        stats = cache.stats()
+        return cached, f"💾 Cached answer · {stats['hit_rate']:.0%} hit rate", (time.perf_counter() - start) * 1000
+
+    reply = smart_search(query, data, on_token, cancel)
+    stopped = cancel is not None and cancel.is_set()
+    if not stopped and not llm.last_error and not reply.startswith("[LLM Error]") and reply != NO_RESULT:
+        cache.put(key, query, reply)
+    path = f"🧠 LLM ({OLLAMA_MODEL}, {llm.last_backend or 'unavailable'})"
+    if llm.last_ttft is not None:
+        path += f" · first token {format_elapsed(llm.last_ttft * 1000)}"
+    if prompts.last_stats.get("tokens_saved"):
+        path += f" · {prompts.last_stats['tokens_saved']} prompt tokens saved"
+    if force_llm:
+        path += " · forced"
+    if stopped:
+        path += " · stopped"
+    elif llm.last_error:
+        path += f" · cut off ({llm.last_error})"
+    return reply, path, (time.perf_counter() - start) * 1000
+
+
+def format_elapsed(ms):
+    return f"{ms:.0f} ms" if ms < 1000 else f"{ms / 1000:.1f} s"
+
+
+# ---------- TRACES ----------
+TRACE_FIELDS = {"type", "ts", "trace", "id", "parent", "name", "ms", "thread"}
+
+
+def format_traces(records, limit=DEBUG_TRACES):
+    """Newest `limit` traces as text, one indented line per span/event, newest trace first."""
+    by_trace = {}
+    for r in records:
+        if r.get("trace") is not None and r.get("type") in ("span", "event"):
+            by_trace.setdefault(r["trace"], []).append(r)
+    lines = []
+    for trace in sorted(by_trace, reverse=True)[:limit]:
+        depth = {}
+        for r in sorted(by_trace[trace], key=lambda r: r["id"]):
+            d = depth[r["id"]] = depth.get(r["parent"], -1) + 1
+            attrs = " ".join(f"{k}={v}" for k, v in r.items() if k not in TRACE_FIELDS)
+            if r["type"] == "span":
+                lines.append(f"{'  ' * d}{r['name']:<{max(30 - 2 * d, 8)}} {r['ms']:>10.1f} ms  {attrs}")
+            else:
+                lines.append(f"{'  ' * d}· {r['name']:<{max(28 - 2 * d, 6)}} {'':>13}  {attrs}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# ---------- HEADLESS BATCH MODE ----------
+SOURCES = {"⚡": "instant", "💾": "cache", "🧠": "llm"}
+
+
+def read_queries(stream):
+    """Yield (id, query) from JSONL ({"query"|"question"|"title": ...}) or plain-text lines."""
+    for n, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            rec = line
+        if isinstance(rec, dict):
+            query = rec.get("query") or rec.get("question") or rec.get("title") or ""
+            qid = rec.get("id") or rec.get("request_id") or n
+        else:
+            query, qid = str(rec), n
+        if query.strip():
+            yield qid, query.strip()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def run_batch(queries, data, out, jobs=4, force_llm=False, live=None):
+    """Answer `queries` with `jobs` workers, writing one JSON line per result as it finishes.
+    With a `live` watcher each query runs on its latest index snapshot."""
+    latencies, sources, errors = [], {}, 0
+    start = time.perf_counter()
+
+    def one(qid, query):
+        t0 = time.perf_counter()
+        try:
+            snapshot = live.data if live is not None else data
+            reply, path, _ = answer_query(f"{FORCE_LLM_PREFIX} {query}" if force_llm else query, snapshot)
+            rec = {"id": qid, "query": query, "answer": reply, "source": SOURCES.get(path[:1], "llm"), "path": path}
+        except Exception as e:
+            rec = {"id": qid, "query": query, "error": str(e)}
+        rec["latency_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        return rec
+
+    def emit(rec):
+        nonlocal errors
+        if "error" in rec or rec["answer"].startswith("[LLM Error]"):
+            errors += 1
+        latencies.append(rec["latency_ms"])
+        sources[rec.get("source", "error")] = sources.get(rec.get("source", "error"), 0) + 1
+        out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        out.flush()
+
+    # Read lazily and keep at most 2×jobs queries in flight, so stdin can be a live stream.
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        in_flight = set()
+        for qid, query in queries:
+            in_flight.add(pool.submit(one, qid, query))
+            if len(in_flight) >= 2 * jobs:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for f in done:
+                    emit(f.result())
+        for f in in_flight:
+            emit(f.result())
+
+    wall = time.perf_counter() - start
+    summary = {"queries": len(latencies), "errors": errors, "jobs": jobs, "wall_s": round(wall, 3),
+               "throughput_qps": round(len(latencies) / wall, 2) if wall else 0.0, "sources": sources}
+    if latencies:
+        summary.update({f"p{p}_ms": percentile(latencies, p) for p in (50, 95, 99)})
+    return summary
+
+
+def start_watch(args, data, on_swap=None):
+    """Start the live watcher when --watch was given; None otherwise."""
+    if args.watch is None:
+        return None
+    roots = args.watch or ([SCRIPT_DIR] if SCRIPT_DIR else watcher.DEFAULT_ROOTS)
+    live = watcher.IndexWatcher(roots, data, load_index, INDEX_FILE, on_swap=on_swap, poll=args.poll)
+    return live.start()
+
+
+def batch_main(args):
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    if out is sys.stdout and hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    source = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    # Status prints go to stderr so stdout stays valid JSONL.
+    with contextlib.redirect_stdout(sys.stderr):
+        data = load_index()
+        live = start_watch(args, data)
+        summary = run_batch(read_queries(source), data, out, jobs=args.jobs, force_llm=args.llm, live=live)
+        if live is not None:
+            live.stop()
+    if out is not sys.stdout:
+        out.close()
+    if source is not sys.stdin:
+        source.close()
+    print(f"📊 {summary['queries']} queries in {summary['wall_s']} s — {summary['throughput_qps']} q/s, "
+          f"p50 {summary.get('p50_ms', 0)} ms · p95 {summary.get('p95_ms', 0)} ms · p99 {summary.get('p99_ms', 0)} ms, "
+          f"{summary['errors']} errors, sources {summary['sources']}", file=sys.stderr)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["errors"] else 0
 
 
 # ---------- GUI CLASS ----------
 class SenseGloveUI:
-    def __init__(self, root):
+    def __init__(self, root, args=None):
         self.root = root
         self.root.title("SenseGlove Assistant v3.0")
         self.root.geometry("900x660")
@@ -174,6 +414,23 @@ class SenseGloveUI:
                 pass
         tk.Label(header, text="SenseGlove Assistant", fg=ACCENT_COLOR,
                  bg=BG_COLOR, font=("Cambria", 18, "bold")).pack(side=tk.LEFT)
+        tk.Button(header, text="🐞", bg=BG_COLOR, fg="#9AA0A6", relief="flat", cursor="hand2",
+                  font=("Cambria", 12), command=self.toggle_debug).pack(side=tk.RIGHT)
+        self.root.bind("<F12>", lambda e: self.toggle_debug())
+        self.debug = None        # debug panel window, when open
+        self.debug_owns_tracing = False
+
+        # SDK version picker: a checkout only rewrites the local index from stored blobs.
+        self.versions = versions.get_store()
+        self.switcher = ThreadPoolExecutor(max_workers=1)
+        self.switching = None    # (ref, future, started) of a running checkout
+        refs = [r for r, _, _ in self.versions.refs()] if self.versions else []
+        if refs:
+            self.version_var = tk.StringVar(value=versions.active_version())
+            picker = tk.OptionMenu(header, self.version_var, *refs, command=self.switch_version)
+            picker.configure(bg="#40444B", fg=TEXT_COLOR, activebackground="#5A5F66", relief="flat",
+                             highlightthickness=0, font=("Cambria", 11))
+            picker.pack(side=tk.RIGHT, padx=(0, 8))
 
         self.chat_container = tk.Frame(root, bg=BG_COLOR)
         self.chat_container.pack(fill=tk.BOTH, expand=True)
@@ -184,7 +441,20 @@ class SenseGloveUI:
         self.canvas.configure(yscrollcommand=scrollbar.set)
         self.chat_frame = tk.Frame(self.canvas, bg=BG_COLOR)
         self.canvas.create_window((0, 0), window=self.chat_frame, anchor="nw")
-        self.chat_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        self.chat_frame.bind("<Configure>", lambda e: self.schedule_scrollregion())
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind_all(seq, self.on_mousewheel)
+
+        # Windowed transcript: only messages [first, last) exist as widgets; the rest stay on disk.
+        nav = dict(bg=BG_COLOR, fg=ACCENT_COLOR, relief="flat", cursor="hand2", font=("Cambria", 10, "bold"))
+        self.earlier_btn = tk.Button(self.chat_frame, text="⬆ Earlier messages", command=self.load_earlier, **nav)
+        self.messages_frame = tk.Frame(self.chat_frame, bg=BG_COLOR)
+        self.messages_frame.pack(fill=tk.X)
+        self.latest_btn = tk.Button(self.chat_frame, text="⬇ Jump to latest", command=self.show_latest, **nav)
+        self.transcript = transcript.TranscriptStore(HISTORY_FILE)
+        self.rendered = {}       # message index → widgets of a realized bubble
+        self.first = self.last = 0
+        self._region_queued = False
 
         input_bar = tk.Frame(root, bg="#2A2D32")
         input_bar.pack(fill=tk.X, pady=(6, 10))
@@ -193,64 +463,362 @@ class SenseGloveUI:
                               font=("Cambria", 13))
         self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10, pady=6)
         self.entry.bind("<Return>", lambda e: self.send_query())
+        tk.Button(input_bar, text="Stop all", bg="#5A5F66", fg="white",
+                  font=("Cambria", 12, "bold"), relief="flat", cursor="hand2",
+                  command=self.stop_all).pack(side=tk.RIGHT, padx=(0, 10))
         tk.Button(input_bar, text="Send", bg=ACCENT_COLOR, fg="white",
                   font=("Cambria", 12, "bold"), activebackground="#0E8C6A",
                   relief="flat", cursor="hand2",
                   command=self.send_query).pack(side=tk.RIGHT, padx=10)
-
-        self.add_message("assistant", "👋 Hello! I’m your SenseGlove SDK Assistant.\nAsk me about any script, function, or system behavior.")
-        self.thinking_label = None
-
-    def add_message(self, sender, text):
-        frame = tk.Frame(self.chat_frame, bg=BG_COLOR)
+        # Workers only compute; every widget change happens here on the Tk thread.
+        self.scheduler = query_scheduler.QueryScheduler(
+            lambda query, on_token, cancel: answer_query(query, self.data, on_token, cancel))
+        self.pending = {}        # job id → state of an in-flight answer
+        self.pending_by_index = {}
+        self._scroll_queued = False
+        self.show_latest()
+        llm.warm_async(prompts.prefix)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.add_message("assistant", "👋 Hello! I’m your SenseGlove SDK Assistant.\nAsk me about any script, function, or system behavior.\n"
+                         f"Start with {FORCE_LLM_PREFIX} to always ask the LLM.", persist=False)
+        self.root.after(POLL_MS, self.poll_results)
+
+        self.index_updates = []  # summaries from the watcher thread, shown on the Tk thread
+        self.live = start_watch(args, self.data, self.on_index_swap) if args is not None else None
+
+    # ---------- Transcript window ----------
+    def add_message(self, sender, text, final=True, persist=True):
+        """Store a message and show it; returns its transcript index."""
+        with tracing.span("add_message", sender=sender, chars=len(text)):
+            index = self.transcript.append(sender, text, final, persist)
+            self.follow(index)
+            return index
+
+    def follow(self, index):
+        """Show the newly appended message `index`, trimming the window from the top."""
+        if self.last != index:
+            return self.show_latest()   # the user was reading older messages; jump back down
+        self.render(index)
+        self.last = index + 1
+        while self.last - self.first > WINDOW:
+            self.unrender(self.first)
+            self.first += 1
+        self.update_nav()
+        self.scroll_to_bottom()
+
+    def render(self, index, before=None):
+        sender, text = self.transcript.get(index)
+        frame = tk.Frame(self.messages_frame, bg=BG_COLOR)
         bubble = tk.Frame(frame, bg=USER_COLOR if sender == "user" else ASSIST_COLOR, padx=14, pady=10)
         label = tk.Label(bubble, text=text, wraplength=680, justify="left",
                          bg=bubble["bg"], fg=TEXT_COLOR, font=("Cambria", 12))
         label.pack(anchor="w")
+        widgets = {"frame": frame, "bubble": bubble, "label": label}
 
-        if sender == "assistant":
-            for name in extract_script_names(text):
-                tk.Button(bubble, text=f"Open {name}", bg=ACCENT_COLOR, fg="white",
-                          cursor="hand2", relief="flat", font=("Cambria", 10, "bold"),
-                          command=lambda n=name: self.open_script(n)).pack(anchor="w", pady=(4, 2))
+        job_id = self.pending_by_index.get(index)
+        if job_id is not None:
+            widgets.update(self.add_controls(bubble, job_id))
+        elif sender == "assistant":
+            self.add_script_buttons(bubble, text)
 
         bubble.pack(anchor="e" if sender == "user" else "w", padx=12, pady=6)
-        frame.pack(fill=tk.X)
-        self.canvas.update_idletasks()
+        if before is not None:
+            frame.pack(fill=tk.X, before=before)
+        else:
+            frame.pack(fill=tk.X)
+        self.rendered[index] = widgets
+
+    def unrender(self, index):
+        self.rendered.pop(index)["frame"].destroy()
+
+    def update_nav(self):
+        if self.first > 0:
+            self.earlier_btn.pack(before=self.messages_frame, pady=(4, 0))
+        else:
+            self.earlier_btn.pack_forget()
+        if self.last < len(self.transcript):
+            self.latest_btn.pack(after=self.messages_frame, pady=(0, 4))
+        else:
+            self.latest_btn.pack_forget()
+
+    def show_latest(self):
+        for index in list(self.rendered):
+            self.unrender(index)
+        self.last = len(self.transcript)
+        self.first = max(0, self.last - WINDOW)
+        for index in range(self.first, self.last):
+            self.render(index)
+        self.update_nav()
+        self.scroll_to_bottom()
+
+    def load_earlier(self):
+        """Page in up to PAGE older messages above the window, dropping as many at the bottom."""
+        if self.first == 0:
+            return
+        anchor = self.rendered[self.first]["frame"] if self.rendered else None
+        start = max(0, self.first - PAGE)
+        for index in range(start, self.first):
+            self.render(index, before=anchor)
+        self.first = start
+        while self.last - self.first > WINDOW:
+            self.last -= 1
+            self.unrender(self.last)
+        self.update_nav()
+        if anchor is not None:
+            # Keep the message that was on top where the reader left it.
+            self.root.after_idle(lambda: self.canvas.yview_moveto(
+                anchor.winfo_y() / max(1, self.chat_frame.winfo_height())))
+
+    def on_mousewheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        if up and self.canvas.yview()[0] <= 0 and self.first > 0:
+            self.load_earlier()
+            return
+        self.canvas.yview_scroll(-1 if up else 1, "units")
+
+    def schedule_scrollregion(self):
+        """One scrollregion recompute per idle period, however many bubbles changed."""
+        if not self._region_queued:
+            self._region_queued = True
+            self.root.after_idle(self._update_scrollregion)
+
+    def _update_scrollregion(self):
+        self._region_queued = False
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def scroll_to_bottom(self):
+        """Scroll once the pending layout is done; many calls per frame cost one scroll."""
+        if not self._scroll_queued:
+            self._scroll_queued = True
+            self.root.after_idle(self._scroll)
+
+    def _scroll(self):
+        self._scroll_queued = False
         self.canvas.yview_moveto(1)
 
+    def add_script_buttons(self, bubble, text):
+        for script, func in symbol_locator.extract_references(text):
+            label = f"Open {script} → {func}()" if func else f"Open {script}"
+            tk.Button(bubble, text=label, bg=ACCENT_COLOR, fg="white",
+                      cursor="hand2", relief="flat", font=("Cambria", 10, "bold"),
+                      command=lambda s=script, f=func: self.open_script(s, f)).pack(anchor="w", pady=(4, 2))
+
+    def add_controls(self, bubble, job_id):
+        controls = tk.Frame(bubble, bg=bubble["bg"])
+        status = tk.Label(controls, text="⏳ queued", bg=bubble["bg"], fg="#9AA0A6", font=("Cambria", 10))
+        status.pack(side=tk.LEFT)
+        tk.Button(controls, text="✕ Cancel", bg="#5A5F66", fg="white", relief="flat", cursor="hand2",
+                  font=("Cambria", 9, "bold"),
+                  command=lambda: self.scheduler.cancel(job_id)).pack(side=tk.LEFT, padx=(8, 0))
+        controls.pack(anchor="w", pady=(6, 0))
+        return {"controls": controls, "status": status}
+
+    # ---------- Queries ----------
     def send_query(self):
         query = self.entry.get().strip()
         if not query:
             return
         self.add_message("user", query)
         self.entry.delete(0, tk.END)
-        threading.Thread(target=self.process_query, args=(query,), daemon=True).start()
-
-    def process_query(self, query):
-        self.add_message("assistant", "Thinking …")
+        job_id = self.scheduler.submit(query)
+        index = self.transcript.append("assistant", "Thinking …", final=False)
+        self.pending[job_id] = {"index": index, "status_text": "", "tokens": [], "dirty": False,
+                                "started": None, "submitted": time.perf_counter()}
+        self.pending_by_index[index] = job_id
+        self.follow(index)
+
+    def stop_all(self):
+        self.scheduler.cancel_all()
+
+    def on_index_swap(self, data, summary):
+        """Watcher thread: the refreshed index is ready; new questions use it from now on."""
+        self.data = data
+        self.index_updates.append(summary)
+
+    def poll_results(self):
+        """Apply worker events on the Tk thread, at most one label update per bubble per tick."""
+        while self.index_updates:
+            summary = self.index_updates.pop(0)
+            names = ", ".join(summary["parsed"] + [f"{n} (removed)" for n in summary["removed"]])
+            self.add_message("assistant", f"🔄 Index updated from your edits: {names} · "
+                                          f"{format_elapsed(summary['ms'])}", persist=False)
+        if self.switching is not None and self.switching[1].done():
+            self.finish_switch()
+        for job_id, kind, payload in self.scheduler.poll():
+            state = self.pending.get(job_id)
+            if state is None:
+                continue
+            if kind == query_scheduler.STARTED:
+                state["started"] = time.perf_counter()
+            elif kind == query_scheduler.TOKEN:
+                state["tokens"].append(payload)
+                state["dirty"] = True
+            elif kind == query_scheduler.DONE:
+                reply, path, elapsed = payload
+                self.finish_message(job_id, f"{reply}\n\n{path} · {format_elapsed(elapsed)}")
+            elif kind == query_scheduler.ERROR:
+                self.finish_message(job_id, f"❌ Error: {payload}")
+            elif kind == query_scheduler.CANCELLED:
+                partial = "".join(state["tokens"]).strip()
+                self.finish_message(job_id, (partial + "\n\n" if partial else "") + "⏹ Stopped.")
+            elif kind == query_scheduler.STALE:
+                self.finish_message(job_id, "⏭ Skipped — newer questions took its place.")
+
+        now = time.perf_counter()
+        for state in self.pending.values():
+            widgets = self.rendered.get(state["index"])
+            if state["dirty"]:
+                text = "".join(state["tokens"])
+                self.transcript.update(state["index"], text)
+                state["dirty"] = False
+                if widgets is not None:
+                    widgets["label"].config(text=text)
+                    self.scroll_to_bottom()
+            since = state["started"] or state["submitted"]
+            status = f"{'⏳ working' if state['started'] else '⏳ queued'} · {now - since:.1f} s"
+            if widgets is not None and status != state["status_text"]:
+                widgets["status"].config(text=status)
+                state["status_text"] = status
+        self.root.after(POLL_MS, self.poll_results)
+
+    def finish_message(self, job_id, text):
+        with tracing.span("finish_message", job=job_id, chars=len(text)):
+            self._finish_message(job_id, text)
+
+    def _finish_message(self, job_id, text):
+        state = self.pending.pop(job_id)
+        index = state["index"]
+        del self.pending_by_index[index]
+        self.transcript.update(index, text, final=True)
+        widgets = self.rendered.get(index)
+        if widgets is not None:
+            widgets.pop("controls").destroy()
+            widgets.pop("status")
+            widgets["label"].config(text=text)
+            self.add_script_buttons(widgets["bubble"], text)
+            self.scroll_to_bottom()
+
+    def close(self):
+        if self.live is not None:
+            self.live.stop()
+        self.scheduler.shutdown()
+        self.switcher.shutdown(wait=False)
+        self.root.destroy()
+
+    # ---------- SDK versions ----------
+    def switch_version(self, ref):
+        """Check out another indexed version in the background; questions keep the old index until done."""
+        if self.switching is not None:
+            self.version_var.set(self.switching[0])
+            return
+        if ref == versions.active_version():
+            return
+        future = self.switcher.submit(self._checkout, ref)
+        self.switching = (ref, future, time.perf_counter())
+
+    def _checkout(self, ref):
+        versions.checkout(ref, INDEX_FILE, self.versions)
+        data = load_index()      # loaded off the Tk thread too, with its retrieval structures
+        retrieval.prime(data, INDEX_FILE)
+        semantic.prime(data, INDEX_FILE)
+        xref.prime(data, INDEX_FILE)
+        return data
+
+    def finish_switch(self):
+        ref, future, started = self.switching
+        self.switching = None
         try:
-            reply = smart_search(query, self.data)
+            data = future.result()
         except Exception as e:
-            reply = f"❌ Error: {e}"
-
-        if self.thinking_label:
-            self.thinking_label.destroy()
-            self.thinking_label = None
-        self.add_message("assistant", reply)
-
-    def open_script(self, script_name):
-        """Always open the script directly on GitHub."""
+            self.add_message("assistant", f"❌ Could not switch to {ref}: {e}", persist=False)
+        else:
+            self.data = data
+            elapsed = (time.perf_counter() - started) * 1000
+            self.add_message("assistant", f"🔀 Switched to {ref} · {len(self.data)} scripts · "
+                                          f"{format_elapsed(elapsed)}", persist=False)
+        self.version_var.set(versions.active_version())
+
+    # ---------- Debug panel ----------
+    def toggle_debug(self):
+        """Show/hide live spans and counters; tracing is switched on while the panel is open."""
+        if self.debug is not None:
+            return self.close_debug()
+        if not tracing.enabled():
+            tracing.enable()     # in memory only; --trace also writes the JSONL log
+            self.debug_owns_tracing = True
+        self.debug = tk.Toplevel(self.root)
+        self.debug.title("Assistant debug — stages & counters")
+        self.debug.geometry("780x480")
+        self.debug.configure(bg=BG_COLOR)
+        self.debug.protocol("WM_DELETE_WINDOW", self.close_debug)
+        self.debug_counters = tk.Label(self.debug, anchor="w", justify="left", bg=BG_COLOR,
+                                       fg=ACCENT_COLOR, font=("Consolas", 10))
+        self.debug_counters.pack(fill=tk.X, padx=8, pady=(6, 2))
+        self.debug_text = tk.Text(self.debug, bg="#16181B", fg=TEXT_COLOR, relief="flat",
+                                  font=("Consolas", 10), wrap="none")
+        self.debug_text.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 8))
+        self.debug_seen = None
+        self.refresh_debug()
+
+    def close_debug(self):
+        if self.debug_owns_tracing:
+            tracing.disable()
+            self.debug_owns_tracing = False
+        self.debug.destroy()
+        self.debug = None
+
+    def refresh_debug(self):
+        if self.debug is None:
+            return
+        records = tracing.recent()
+        newest = records[-1] if records else None
+        if newest is not self.debug_seen:   # redraw only when something new finished
+            self.debug_seen = newest
+            self.debug_text.delete("1.0", tk.END)
+            self.debug_text.insert("1.0", format_traces(records) or "No spans yet — ask a question.")
+        counters = "  ·  ".join(f"{k} {v}" for k, v in sorted(tracing.counters().items()))
+        log = tracing.log_path()
+        self.debug_counters.config(text=(counters or "No counters yet.") + (f"\nLogging to {log}" if log else ""))
+        self.root.after(DEBUG_REFRESH_MS, self.refresh_debug)
+
+    def open_script(self, script_name, function=None):
+        """Open the definition locally in VS Code, else on GitHub at the indexed commit."""
         try:
-            github_url = f"https://github.com/Adjuvo/SenseGlove-Unity/search?q={script_name}"
-            subprocess.run(["start", github_url], shell=True)
-            self.add_message("assistant", f"🌐 Opened **{script_name}** on GitHub — showing latest version online.")
+            roots = [SCRIPT_DIR] if SCRIPT_DIR else symbol_locator.LOCAL_ROOTS
+            loc = symbol_locator.locate(self.data, script_name, function, roots,
+                                        default_commit=github_updater.load_meta().get("last_sha"))
+            if loc is None:
+                loc = {"script": script_name, "path": None}
+            where, target = symbol_locator.open_location(loc, VSCODE_EXE)
+            what = f"{script_name} → {function}()" if function else script_name
+            if where == "vscode":
+                self.add_message("assistant", f"📝 Opened **{what}** in VS Code — {target}")
+            else:
+                self.add_message("assistant", f"🌐 Opened **{what}** on GitHub — {target}")
         except Exception as e:
-            self.add_message("assistant", f"❌ Could not open GitHub link: {e}")
+            self.add_message("assistant", f"❌ Could not open {script_name}: {e}")
 
 
 # ---------- MAIN ----------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SenseGlove SDK assistant (GUI, or headless with --batch).")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer queries from a JSONL/text file ('-' for stdin) instead of opening the GUI")
+    parser.add_argument("--jobs", type=int, default=4, help="concurrent queries in batch mode")
+    parser.add_argument("--out", help="write JSONL results here instead of stdout")
+    parser.add_argument("--summary", help="also write the run summary as JSON to this file")
+    parser.add_argument("--llm", action="store_true", help="always ask the LLM (skip the instant path and cache)")
+    parser.add_argument("--trace", nargs="?", const=tracing.TRACE_FILE, metavar="FILE",
+                        help=f"record per-stage timings to a rolling JSONL log (default {tracing.TRACE_FILE})")
+    parser.add_argument("--watch", nargs="*", metavar="DIR",
+                        help="re-index local script edits live (default: SCRIPT_DIR or Assets/SenseGlove)")
+    parser.add_argument("--poll", action="store_true", help="with --watch: poll instead of using inotify")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+    if args.batch:
+        sys.exit(batch_main(args))
     root = tk.Tk()
-    SenseGloveUI(root)
+    SenseGloveUI(root, args)
     root.mainloop()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# snapshot_cache.py
+# ---------------------------------------------------------
+# One cache for the structures retrieval.py, semantic.py and
+# xref.py derive from a loaded index snapshot.
+# - Keyed by the identity of the snapshot (the `data` object a
+#   query holds) and held weakly: every snapshot still in use
+#   keeps its own structures, however many swaps ago it was
+#   loaded, and they are dropped together with the snapshot
+# - prime() builds for a new snapshot off the query path, so
+#   queries never wait for a live swap
+# - Whether a snapshot is current, and so may read and save the
+#   sidecar files, is decided by the modules' `build` callbacks
+#   (index_store.is_current; saves under index_store.side_index_lock)
+# ---------------------------------------------------------
+
+import threading
+import weakref
+
+
+class SnapshotCache:
+    """Memoizes `build(data, index_file)` per snapshot object."""
+
+    def __init__(self, build):
+        self.build = build
+        self._entries = {}           # id(data) → (weakref to data, or data itself, structure)
+        self._lock = threading.Lock()
+
+    def _holder(self, data):
+        key = id(data)
+        try:
+            return weakref.ref(data, lambda ref: self._forget(key, ref))
+        except TypeError:
+            return data              # plain lists cannot be weakly referenced; see _put
+
+    def _forget(self, key, ref):
+        # Runs from the garbage collector, possibly while _lock is held: no locking here.
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is ref:
+            self._entries.pop(key, None)
+
+    def _lookup(self, data):
+        entry = self._entries.get(id(data))
+        if entry is None:
+            return None
+        holder = entry[0]
+        target = holder() if isinstance(holder, weakref.ref) else holder
+        return entry if target is data else None
+
+    def _put(self, data, value):
+        holder = self._holder(data)
+        if holder is data:
+            # Held strongly, so keep only the newest such snapshot rather than all of them.
+            for key in [k for k, e in self._entries.items() if not isinstance(e[0], weakref.ref)]:
+                del self._entries[key]
+        self._entries[id(data)] = (holder, value)
+
+    def get(self, data, index_file=None):
+        with self._lock:
+            entry = self._lookup(data)
+            if entry is None:
+                entry = (None, self.build(data, index_file))
+                self._put(data, entry[1])
+            return entry[1]
+
+    def prime(self, data, index_file=None):
+        """Build for `data` without holding the lock, so queries on other snapshots keep running."""
+        value = self.build(data, index_file)
+        with self._lock:
+            self._put(data, value)
+        return value
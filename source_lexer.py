@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# source_lexer.py
+# ---------------------------------------------------------
+# Lexing helpers shared by the language scanners
+# (csharp_parser.py, cpp_parser.py). Each scanner keeps its
+# own token regexes; these only drive them:
+# - line_index():      offset → 1-based line, by bisection
+# - join_tokens():     re-join type tokens into their spelling
+# - clean_doc():       doc comment lines → plain summary text
+# - skip_block():      jump over a brace-balanced body
+# - scan_identifiers(): identifier references for xref.py
+# ---------------------------------------------------------
+
+import bisect
+import re
+
+
+def line_index(code):
+    """Function mapping an offset in `code` to its 1-based line number."""
+    newlines = [m.start() for m in re.finditer("\n", code)]
+    return lambda offset: bisect.bisect_right(newlines, offset - 1) + 1
+
+
+def join_tokens(tokens):
+    """Re-join type tokens: words get a space between them, punctuation does not."""
+    out = ""
+    prev = None
+    for kind, text, _, _ in tokens:
+        if prev == "word" and kind == "word":
+            out += " "
+        out += text + (" " if text == "," else "")
+        prev = kind
+    return out
+
+
+def clean_doc(lines):
+    """Doc comment lines as one line of text: the <summary> if there is one, XML tags removed."""
+    if not lines:
+        return ""
+    text = " ".join(lines)
+    m = re.search(r"<summary>(.*?)</summary>", text, re.S)
+    if m:
+        text = m.group(1)
+    text = re.sub(r'<see\w*\s+\w+="([^"]+)"\s*/>', r"\1", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    return " ".join(text.split())
+
+
+def skip_block(code, pos, body):
+    """`pos` is just after an opening brace; return the offset just after its match.
+    `body` matches braces and everything that could hide one (comments, strings)."""
+    depth = 1
+    search = body.search
+    while depth:
+        m = search(code, pos)
+        if m is None:
+            return len(code)
+        pos = m.end()
+        t = m.group()
+        if t == "{":
+            depth += 1
+        elif t == "}":
+            depth -= 1
+    return pos
+
+
+def scan_identifiers(code, pattern, not_called, not_named=frozenset()):
+    """[(name, kind, line)] for identifiers `pattern` finds in `code`: kind "call" for Name(...),
+    "new" for `new Name`, "name" for other capitalized names (types, static members).
+    `pattern` skips comments / strings itself and sets the `word` and `call` groups."""
+    line_of = line_index(code)
+    refs = []
+    prev = None
+    for m in pattern.finditer(code):
+        word = m.group("word")
+        if word is None:
+            continue
+        word = word.lstrip("@")
+        if prev == "new":
+            refs.append((word, "new", line_of(m.start())))
+        elif m.group("call") is not None:
+            if word not in not_called:
+                refs.append((word, "call", line_of(m.start())))
+        elif word[0].isupper() and word not in not_named:
+            refs.append((word, "name", line_of(m.start())))
+        prev = word
+    return refs
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# symbol_locator.py
+# ---------------------------------------------------------
+# Jump-to-definition for "SG_Script.cs → Function()" references
+# (and native headers: "HapticGlove.hpp → SendHaptics()").
+# - Script/function names resolve through the in-memory symbol
+#   table (fast_answer.SymbolTable) to the indexed path and the
+#   start/end lines recorded by the indexers
+# - The file is found in the vendored checkouts (no network);
+#   entries indexed without line numbers are located by
+#   scanning that local file once
+# - Opens VS Code at file:line (`code -g`), otherwise a GitHub
+#   permalink pinned to the indexed commit with #L anchors
+# ---------------------------------------------------------
+
+import os
+import re
+import shutil
+import subprocess
+import webbrowser
+
+import fast_answer
+import frontends
+
+GITHUB_REPO = "Adjuvo/SenseGlove-Unity"
+DEFAULT_REF = "master"
+LOCAL_ROOTS = [
+    os.path.join("SenseGlove-Unity-master", "SenseGlove-Unity-master"),
+    os.path.join("Assets", "SenseGlove"),
+    os.path.join("SenseGlove-API-master", "SenseGlove-API-master"),
+]
+_REF = re.compile(r"(SG(?:Ex)?_[A-Za-z0-9_]+\.cs|[A-Z][A-Za-z0-9_]*\.hpp)(?:\s*(?:→|->|::|\.)\s*([A-Za-z_][A-Za-z0-9_]*)\s*\()?")
+
+_basenames = {}   # roots tuple → {file name: full path}
+_scanned = {}     # (file, mtime) → (types, methods)
+
+
+def extract_references(text):
+    """Unique (script, function or None) pairs mentioned in an answer, in order."""
+    seen, refs = set(), []
+    for script, func in _REF.findall(text):
+        ref = (script, func or None)
+        if ref not in seen:
+            seen.add(ref)
+            refs.append(ref)
+    return refs
+
+
+# ---------- Local files ----------
+
+def _local_files(roots):
+    key = tuple(roots)
+    if key not in _basenames:
+        found = {}
+        for root in roots:
+            for dirpath, _, names in os.walk(root):
+                for n in names:
+                    if frontends.for_path(n):
+                        found.setdefault(n, os.path.join(dirpath, n))
+        _basenames[key] = found
+    return _basenames[key]
+
+
+def find_local_file(entry, roots=LOCAL_ROOTS):
+    """Path of the vendored copy of `entry`, or None."""
+    local = entry.get("local_path")
+    if local and os.path.exists(local):
+        return local
+    if entry.get("path"):
+        for root in roots:
+            candidate = os.path.join(root, *entry["path"].split("/"))
+            if os.path.exists(candidate):
+                return candidate
+    return _local_files(roots).get(entry["name"])
+
+
+def _scan_file(path):
+    key = (path, os.path.getmtime(path))
+    if key not in _scanned:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            _scanned[key] = frontends.for_path(path).parse(f.read())[1:]
+    return _scanned[key]
+
+
+# ---------- Resolution ----------
+
+def _pick_type(types, stem):
+    for t in types:
+        if t["name"] == stem:
+            return t
+    return types[0] if types else None
+
+
+def locate(data, script, function=None, roots=LOCAL_ROOTS, default_commit=None):
+    """Resolve a reference to {script, function, path, file, line, end_line, commit}; None if unknown."""
+    stem = frontends.stem(script)
+    table = fast_answer.symbol_table(data)
+    idx = next((i for i, j in table.lookup(stem) if j is None), None)
+    if idx is None:
+        return None
+    entry = data[idx]
+    loc = {"script": entry["name"], "function": function, "path": entry.get("path"),
+           "file": find_local_file(entry, roots), "line": None, "end_line": None,
+           "commit": entry.get("commit") or default_commit or DEFAULT_REF,
+           "repo": frontends.for_entry(entry).repo}
+
+    if function:
+        spans = [f for f in entry.get("functions", []) if f.get("name") == function and f.get("start_line")]
+    else:
+        spans = [t for t in [_pick_type(entry.get("types", []), stem)] if t and t.get("start_line")]
+    if not spans and loc["file"]:
+        # Indexed before line numbers were recorded: scan the local copy instead.
+        types, methods = _scan_file(loc["file"])
+        spans = [m for m in methods if m["name"] == function] if function else \
+            [t for t in [_pick_type(types, stem)] if t]
+    if spans:
+        loc["line"], loc["end_line"] = spans[0]["start_line"], spans[0]["end_line"]
+    return loc
+
+
+def github_permalink(loc, repo=GITHUB_REPO):
+    """Blob URL pinned to the indexed commit, with a #L anchor for the declaration."""
+    repo = loc.get("repo") or repo
+    if not loc.get("path"):
+        return f"https://github.com/{repo}/search?q={loc['script']}"
+    url = f"https://github.com/{repo}/blob/{loc['commit']}/{loc['path']}"
+    if loc.get("line"):
+        url += f"#L{loc['line']}"
+        if loc.get("end_line") and loc["end_line"] != loc["line"]:
+            url += f"-L{loc['end_line']}"
+    return url
+
+
+def vscode_command(vscode_exe=None):
+    """VS Code launcher: the configured executable if present, else `code` on PATH."""
+    if vscode_exe and os.path.exists(vscode_exe):
+        return vscode_exe
+    return shutil.which("code")
+
+
+def open_location(loc, vscode_exe=None, repo=GITHUB_REPO):
+    """Open `loc` locally in VS Code if possible, else on GitHub. Returns (where, target)."""
+    code = vscode_command(vscode_exe)
+    if loc.get("file") and code:
+        target = os.path.abspath(loc["file"]) + (f":{loc['line']}" if loc.get("line") else "")
+        subprocess.Popen([code, "-g", target], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return "vscode", target
+    url = github_permalink(loc, repo)
+    webbrowser.open(url)
+    return "github", url
@@ -0,0 +1,44 @@
+import pytest
+
+import fast_answer
+import retrieval
+
+
+def script(name, description, *functions):
+    return {"name": name, "description": description,
+            "functions": [{"name": f, "description": f"{f} of {name}"} for f in functions]}
+
+
+DATA = [
+    script("SG_Haptics.cs", "Sends haptic vibrations to the glove.", "Start", "Update", "SendImpactVibration"),
+    script("SG_Grabable.cs", "An object the hand can grab.", "Start", "Update", "Grab"),
+    script("SG_TrackedHand.cs", "Follows the tracked hand.", "Start", "LateUpdate"),
+]
+
+
+def ask(query):
+    return fast_answer.answer(query, DATA, retrieval.LexicalIndex.build(DATA))
+
+
+@pytest.mark.parametrize("query", ["start", "update", "how to start"])
+def test_plain_words_naming_many_symbols_are_not_exact(query):
+    _, confidence, how = ask(query)
+    assert how != "exact symbol" and confidence < 1.0
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("SendImpactVibration", "SG_Haptics.cs → SendImpactVibration()"),
+    ("Start()", "SG_Haptics.cs → Start()"),
+    ("SG_Grabable.Update", "SG_Grabable.cs — "),
+    ("grab", "SG_Grabable.cs → Grab()"),            # plain, but only one symbol has this name
+])
+def test_code_names_and_unique_symbols_are_exact(query, expected):
+    text, confidence, how = ask(query)
+    assert how == "exact symbol" and confidence == 1.0
+    assert text.startswith(expected)
+
+
+def test_code_words():
+    assert fast_answer.code_words("what does Start() do in SG_Haptics.cs and in hand.Update") == \
+        {"Start", "SG_Haptics", "cs", "hand", "Update"}
+    assert fast_answer.code_words("how do I start. Then grab (the cube)") == set()
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+import generate_full_index
+import github_updater
+import index_store
+
+SCRIPT = "public class SG_Same { public void Ping() { } }\n"
+
+
+@pytest.fixture
+def out_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)          # the repo meta file lives in the working directory
+    path = str(tmp_path / "index.sqlite")
+    monkeypatch.setattr(generate_full_index, "OUT_FILE", path)
+    return path
+
+
+def write(path, text=SCRIPT):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_root_prefixes_tell_roots_apart():
+    assert generate_full_index.root_prefixes(["Assets/SenseGlove"]) == [""]
+    a, b = generate_full_index.root_prefixes([os.path.join("Assets", "SenseGlove"),
+                                              os.path.join("Unity-master", "Scripts", "SenseGlove")])
+    assert (a, b) == ("Assets/SenseGlove/", "Scripts/SenseGlove/")
+
+
+def test_two_roots_with_the_same_relative_file(tmp_path, out_file):
+    roots = [str(tmp_path / "Assets" / "SenseGlove"), str(tmp_path / "vendored" / "SenseGlove")]
+    for root in roots:
+        write(os.path.join(root, "Scripts", "SG_Same.cs"))
+
+    generate_full_index.generate_local_index(roots + roots[:1], jobs=1)
+
+    shas = index_store.open_store(out_file).path_shas()
+    assert sorted(shas) == ["Assets/SenseGlove/Scripts/SG_Same.cs", "vendored/SenseGlove/Scripts/SG_Same.cs"]
+
+
+def test_unreadable_files_are_skipped(tmp_path, out_file):
+    root = tmp_path / "src"
+    write(str(root / "SG_Good.cs"))
+    os.symlink(str(root / "missing.cs"), str(root / "SG_Dangling.cs"))
+
+    generate_full_index.generate_local_index([str(root)], jobs=1)
+
+    assert [e["name"] for e in index_store.open_store(out_file)] == ["SG_Good.cs"]
+    entry, error = generate_full_index.parse_local_job((str(root / "gone.cs"), "gone.cs", 0, 0))
+    assert entry is None and "FileNotFoundError" in error
+
+
+def test_local_build_forgets_the_github_commit(tmp_path, out_file):
+    with open(github_updater.META_FILE, "w", encoding="utf-8") as f:
+        json.dump({"last_sha": "abc123", "version": "v2.5.0"}, f)
+    write(str(tmp_path / "src" / "SG_Same.cs"))
+
+    generate_full_index.generate_local_index([str(tmp_path / "src")], jobs=1)
+
+    meta = github_updater.load_meta()
+    assert meta["last_sha"] is None and meta["version"] is None
+
+
+def test_headers_only_from_api_checkouts(tmp_path):
+    unity, api = tmp_path / "Assets" / "SenseGlove", tmp_path / "SenseGlove-API-master"
+    for path in (unity / "SG_Same.cs", unity / "Plugins" / "sgcore.h", api / "include" / "HapticGlove.hpp",
+                 api / "include" / "Device.h", api / "examples" / "Unused.cs"):
+        write(str(path))
+
+    found = sorted(rel for _, rel in generate_full_index.walk_sources([str(unity), str(api)]))
+
+    assert found == ["SenseGlove-API-master/include/Device.h", "SenseGlove-API-master/include/HapticGlove.hpp",
+                     "SenseGlove/SG_Same.cs"]
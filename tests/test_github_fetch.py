@@ -0,0 +1,69 @@
+import pytest
+import requests
+
+import fake_github
+import github_fetch
+
+SCRIPT = "public class SG_Script{} {{ public void Run() {{ }} }}\n"
+
+
+@pytest.fixture
+def github(tmp_path):
+    for i in range(30):
+        (tmp_path / f"SG_Script{i}.cs").write_text(SCRIPT.format(i), encoding="utf-8")
+    (tmp_path / "README.md").write_text("not a script", encoding="utf-8")
+    server, url = fake_github.start_server(str(tmp_path))
+    yield server, github_fetch.GitHubFetcher("Adjuvo/SenseGlove-Unity", token="", api_base=url, max_workers=4)
+    server.shutdown()
+    server.server_close()
+
+
+def test_blobs_share_a_few_pooled_connections(github):
+    server, fetcher = github
+    tree = fetcher.get_tree("master")
+
+    files = fetcher.fetch_blobs(tree)
+
+    assert len(tree) == 30 and files["SG_Script7.cs"] == SCRIPT.format(7)
+    assert server.request_count == fetcher.requests_made == 31
+    assert server.connections <= fetcher.max_workers
+
+
+def test_large_fetches_take_one_tarball(github):
+    server, fetcher = github
+    tree = fetcher.get_tree("master")
+    before = server.request_count
+
+    files = fetcher.fetch_files(tree, fetcher.get_commit_sha("master"))
+
+    assert len(files) == 30 and files["SG_Script0.cs"] == SCRIPT.format(0)
+    assert server.request_count - before == 2      # the commit SHA, then one tarball
+
+
+def test_unchanged_lookups_are_conditional(github, tmp_path):
+    server, fetcher = github
+    sha = fetcher.get_commit_sha("master")
+    tree = fetcher.get_tree(sha)
+    remaining = server.remaining
+
+    assert fetcher.get_commit_sha("master") == sha
+    assert fetcher.get_tree(sha) == tree
+    assert server.not_modified == 2 and server.remaining == remaining
+
+    (tmp_path / "SG_New.cs").write_text(SCRIPT.format("New"), encoding="utf-8")
+    assert fetcher.get_commit_sha("master") != sha
+    assert server.not_modified == 2
+
+
+def test_server_errors_are_retried_with_backoff(github, monkeypatch):
+    server, fetcher = github
+    delays = []
+    monkeypatch.setattr(github_fetch.time, "sleep", delays.append)
+    server.fail_next = 2
+
+    assert fetcher.get_commit_sha("master")
+    assert fetcher.requests_made == 3 and delays == [0.5, 1.0]
+
+    server.fail_next = github_fetch.MAX_RETRIES + 1
+    with pytest.raises(requests.exceptions.HTTPError):
+        fetcher.get_commit_sha("master")
@@ -0,0 +1,32 @@
+from github_updater import diff_tree
+
+
+def item(path, sha):
+    return {"path": path, "sha": sha, "size": 1}
+
+
+def test_diff_tree_splits_added_modified_deleted():
+    indexed = {"A.cs": "a1", "B.cs": "b1", "C.cs": "c1"}
+    remote = [item("A.cs", "a1"), item("B.cs", "b2"), item("D.cs", "d1")]
+
+    added, modified, deleted = diff_tree(indexed, remote)
+
+    assert [i["path"] for i in added] == ["D.cs"]
+    assert [(i["path"], i["sha"]) for i in modified] == [("B.cs", "b2")]
+    assert deleted == ["C.cs"]
+
+
+def test_diff_tree_unchanged_tree_is_empty():
+    indexed = {"A.cs": "a1", "Sub/B.cs": "b1"}
+    assert diff_tree(indexed, [item("A.cs", "a1"), item("Sub/B.cs", "b1")]) == ([], [], [])
+
+
+def test_diff_tree_empty_index_adds_everything():
+    remote = [item("A.cs", "a1"), item("B.cs", "b1")]
+    added, modified, deleted = diff_tree({}, remote)
+    assert added == remote and modified == [] and deleted == []
+
+
+def test_diff_tree_entry_without_sha_is_reparsed():
+    added, modified, deleted = diff_tree({"A.cs": None}, [item("A.cs", "a1")])
+    assert [i["path"] for i in modified] == ["A.cs"] and added == [] and deleted == []
@@ -0,0 +1,143 @@
+import contextlib
+import json
+import os
+import threading
+
+import pytest
+
+import index_store
+import retrieval
+
+SCRIPTS = [
+    {"name": "SG_Haptics.cs", "description": "Sends haptics — ünïcode kept", "path": "Haptics/SG_Haptics.cs",
+     "sha": "h1", "classes": ["SG_Haptics"],
+     "functions": [{"name": "SendCmd", "description": "Sends a command.", "start_line": 4, "end_line": 9}]},
+    {"name": "SG_Grabable.cs", "description": "Grab logic", "path": "SG_Grabable.cs", "sha": "g1",
+     "functions": [{"name": "OnGrab", "description": "Grabbed."}]},
+]
+EXTRA = {"generated_at": "2026-01-01T00:00:00Z"}
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def path(request, tmp_path):
+    return str(tmp_path / f"index.{request.param}")
+
+
+def test_round_trip(path):
+    store = index_store.open_store(path)
+    store.replace_all(SCRIPTS, EXTRA)
+    reopened = index_store.open_store(path)
+    assert reopened.entries() == SCRIPTS
+    assert reopened.extra() == EXTRA
+    assert len(reopened) == 2 and reopened[1] == SCRIPTS[1]
+    assert reopened.get("SG_Grabable.cs") == SCRIPTS[1]
+    assert reopened.path_shas() == {"Haptics/SG_Haptics.cs": "h1", "SG_Grabable.cs": "g1"}
+    assert [e["name"] for e in reopened.search("haptics")] == ["SG_Haptics.cs"]
+
+
+def test_apply_changes_upserts_deletes_and_drops_legacy(path):
+    store = index_store.open_store(path)
+    store.replace_all(SCRIPTS + [{"name": "Legacy.cs", "description": "", "functions": []}])
+    assert store.legacy_count() == 1
+    before = store.fingerprint()
+
+    changed = {**SCRIPTS[0], "sha": "h2"}
+    added = {"name": "SG_New.cs", "description": "", "path": "SG_New.cs", "sha": "n1", "functions": []}
+    store.apply_changes([changed, added], ["SG_Grabable.cs"], drop_legacy=True)
+
+    reopened = index_store.open_store(path)
+    assert reopened.path_shas() == {"Haptics/SG_Haptics.cs": "h2", "SG_New.cs": "n1"}
+    assert reopened.legacy_count() == 0
+    assert reopened.fingerprint() != before
+
+
+def test_fingerprint_follows_content(path):
+    store = index_store.open_store(path)
+    store.replace_all(SCRIPTS)
+    first = index_store.open_store(path).fingerprint()
+    store.replace_all(SCRIPTS)
+    assert index_store.open_store(path).fingerprint() == first
+    store.replace_all(SCRIPTS[:1])
+    assert index_store.open_store(path).fingerprint() != first
+
+
+def test_snapshot_is_current_until_the_index_changes(path):
+    store = index_store.open_store(path)
+    store.replace_all(SCRIPTS)
+    snapshot = index_store.open_store(path).snapshot()
+    assert list(snapshot) == SCRIPTS
+    assert index_store.is_current(snapshot, store.fingerprint())
+    store.replace_all(SCRIPTS[:1])
+    assert not index_store.is_current(snapshot, index_store.open_store(path).fingerprint())
+    assert not index_store.is_current(list(SCRIPTS), store.fingerprint())     # untagged data
+
+
+@contextlib.contextmanager
+def writer_running():
+    """WRITE_LOCK held by another thread for the duration of the block."""
+    held, release = threading.Event(), threading.Event()
+
+    def writer():
+        with index_store.WRITE_LOCK:
+            held.set()
+            release.wait(5)
+
+    t = threading.Thread(target=writer)
+    t.start()
+    held.wait(5)
+    try:
+        yield
+    finally:
+        release.set()
+        t.join()
+
+
+def test_side_index_lock_only_for_the_current_snapshot_and_never_waits(path):
+    store = index_store.open_store(path)
+    store.replace_all(SCRIPTS)
+    snapshot = index_store.open_store(path).snapshot()
+    with index_store.side_index_lock(snapshot, path) as current:
+        assert current
+    with index_store.side_index_lock(list(SCRIPTS), path) as current:
+        assert not current
+    with writer_running(), index_store.side_index_lock(snapshot, path) as current:
+        assert not current
+
+
+def test_query_path_leaves_the_lexical_index_to_a_running_writer(tmp_path):
+    path = str(tmp_path / "index.json")
+    index_store.open_store(path).replace_all(SCRIPTS)
+    side = retrieval.index_path_for(path)
+    with writer_running():
+        assert len(retrieval.get_retriever(index_store.open_store(path).snapshot(), path)) == 2
+        assert not os.path.exists(side)
+    assert len(retrieval.get_retriever(index_store.open_store(path).snapshot(), path)) == 2
+    assert os.path.exists(side)
+
+
+@pytest.mark.parametrize("src_kind,dst_kind", [("json", "sqlite"), ("sqlite", "json")])
+def test_convert_is_lossless(tmp_path, src_kind, dst_kind):
+    src, dst = str(tmp_path / f"a.{src_kind}"), str(tmp_path / f"b.{dst_kind}")
+    index_store.open_store(src).replace_all(SCRIPTS, EXTRA)
+    assert index_store.convert(src, dst) == 2
+    assert index_store.open_store(dst).entries() == SCRIPTS
+    with pytest.raises(ValueError):
+        index_store.convert(src, src)
+
+
+def test_json_writes_leave_no_temp_file(tmp_path):
+    path = tmp_path / "index.json"
+    index_store.open_store(str(path)).replace_all(SCRIPTS)
+    assert [p.name for p in tmp_path.iterdir()] == ["index.json"]
+    assert json.loads(path.read_text(encoding="utf-8"))["total_scripts"] == 2
+
+
+def test_normalize_entry_repairs_and_is_idempotent():
+    cases = ["Bare.cs", {"script_name": "A.cs", "summary": "S", "functions": ["Run"]},
+             {"name": "B.cs", "functions": []}, {"name": "C.cs", "functions": [{"name": "Go"}]}]
+    for raw in cases:
+        fixed = index_store.normalize_entry(raw)
+        assert fixed["name"] and fixed["description"] and fixed["functions"]
+        assert all("description" in f for f in fixed["functions"])
+        assert index_store.normalize_entry(fixed) == fixed
+    assert index_store.normalize_entry(42) is None
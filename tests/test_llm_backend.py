@@ -0,0 +1,87 @@
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+import fake_ollama
+import llm_backend
+
+
+@pytest.fixture
+def ollama():
+    server, url = fake_ollama.start_server()
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+
+def fake_exe(tmp_path, reply):
+    """An `ollama` stand-in for the subprocess backend: prints `reply` for `ollama run MODEL`."""
+    path = tmp_path / "ollama"
+    path.write_text(f"#!/bin/sh\ncat > /dev/null\nprintf '%s' '{reply}'\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+def unused_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def test_http_streams_the_reply_over_one_session(ollama):
+    server, url = ollama
+    client = llm_backend.LLMClient("llama3.2", host=url)
+    pieces = []
+
+    assert client.generate("How do I vibrate?", pieces.append) == fake_ollama.DEFAULT_REPLY
+    assert client.generate("And stop it?") == fake_ollama.DEFAULT_REPLY
+
+    assert len(pieces) > 1 and "".join(pieces) == fake_ollama.DEFAULT_REPLY
+    assert client.last_backend == "http" and client.last_error is None
+    assert client.last_stats["eval_count"] == len(pieces)
+    assert server.request_count == 3          # one reachability probe, then one POST per question
+    assert server.loads == 1                  # keep_alive: the model stays loaded
+
+
+def test_cancel_stops_mid_stream(ollama):
+    server, url = ollama
+    server.token_delay = 0.01
+    client = llm_backend.LLMClient("llama3.2", host=url)
+    cancel = threading.Event()
+
+    reply = client.generate("How do I vibrate?", lambda piece: cancel.set(), cancel)
+
+    assert reply and len(reply) < len(fake_ollama.DEFAULT_REPLY)
+    deadline = time.monotonic() + 5
+    while not server.cancelled and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert server.cancelled == 1
+
+
+def test_failure_mid_reply_keeps_the_partial_text(ollama, tmp_path):
+    server, url = ollama
+    server.error_after = 3
+    client = llm_backend.LLMClient("llama3.2", exe=fake_exe(tmp_path, "from the subprocess"), host=url)
+
+    reply = client.generate("How do I vibrate?")
+
+    assert reply and fake_ollama.DEFAULT_REPLY.startswith(reply)
+    assert client.last_backend == "http"
+    assert "unexpectedly stopped" in client.last_error
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="needs a POSIX shell script as `ollama`")
+def test_falls_back_to_the_subprocess_when_http_is_down(tmp_path):
+    client = llm_backend.LLMClient("llama3.2", exe=fake_exe(tmp_path, "from the subprocess"), host=unused_url())
+
+    assert client.generate("How do I vibrate?") == "from the subprocess"
+    assert client.last_backend == "subprocess"
+
+
+def test_no_backend_raises():
+    client = llm_backend.LLMClient("llama3.2", exe=None, host=unused_url())
+    with pytest.raises(RuntimeError):
+        client.generate("How do I vibrate?")
@@ -0,0 +1,130 @@
+import cpp_parser
+import csharp_parser
+
+CSHARP = '''using System;
+namespace SG.Test {
+    /// <summary>A <see cref="Thing"/> holder.</summary>
+    [Serializable]
+    public class Outer<T> : Base, IFoo where T : class {
+        private string s = "{ not a brace";
+        private string v = @"C:\\path"" { ";
+        // } comment brace
+        public Outer() { }
+        /// <summary>Gets it.</summary>
+        [Obsolete("x")] public static async Task<List<int>> Get(int a, Dictionary<string, int> b) { if (a > 0) { return null; } return null; }
+        public int Twice(int x) => x * 2;
+        public class Inner { void Ping() { char c = '}'; } }
+        public abstract void Abs();
+    }
+}
+'''
+
+CPP = r'''/**
+ * @section DESCRIPTION
+ * Haptic glove interface.
+ */
+#pragma once
+#define SG_MACRO(x) \
+    { x }
+namespace SGCore {
+    class HapticGlove;   // forward declaration
+    /// <summary> A glove. </summary>
+    class SGCORE_API HapticGlove : public virtual Device, private Helper<int> {
+    public:
+        HapticGlove();
+        virtual ~HapticGlove();
+        /** Sends a waveform.
+         *  @param w the waveform */
+        SG_NODISCARD virtual bool SendCustomWaveform(const Waveform& w, int ch = 0) const override;
+        virtual int Pure() = 0;
+        bool operator==(const HapticGlove& o) const { return R"({ "not": "}" })" == nullptr; }
+        int operator()(int i) { return i; }
+        template<typename T> static T Get(T v) { char c = '{'; return v; }
+    private:
+        int count = 0;
+        enum class Mode { A, B };
+    };
+    SGCORE_API int FreeFunction(int a);
+}
+'''
+
+
+def by_name(decls):
+    return {(d["owner"], d["name"]): d for d in decls}
+
+
+# ---------- C# ----------
+
+def test_csharp_braces_in_strings_and_comments_do_not_break_nesting():
+    decls = by_name(csharp_parser.scan_declarations(CSHARP))
+    assert set(decls) == {("", "Outer"), ("Outer", "Outer"), ("Outer", "Get"), ("Outer", "Twice"),
+                          ("Outer", "Inner"), ("Outer.Inner", "Ping"), ("Outer", "Abs")}
+    outer = decls[("", "Outer")]
+    assert (outer["start_line"], outer["end_line"]) == (5, 15)
+    assert outer["namespace"] == "SG.Test"
+
+
+def test_csharp_generics_attributes_and_docs():
+    decls = by_name(csharp_parser.scan_declarations(CSHARP))
+    outer, get = decls[("", "Outer")], decls[("Outer", "Get")]
+    assert outer["bases"] == ["Base", "IFoo"]          # the `where` clause is not a base
+    assert outer["doc"] == "A Thing holder."
+    assert get["return_type"] == "Task<List<int>>"
+    assert get["modifiers"] == ["public", "static", "async"]
+    assert get["doc"] == "Gets it."
+    assert decls[("Outer", "Outer")]["kind"] == "constructor"
+    assert decls[("Outer", "Twice")]["return_type"] == "int"     # expression-bodied
+    assert "abstract" in decls[("Outer", "Abs")]["modifiers"]
+
+
+def test_csharp_references_skip_comments_and_strings():
+    code = 'var g = new SG_Haptics(); g.SendCmd(x); SG_Util.Run<int>(3); if (a) {} // Fake(1)\nstring s = "Nope(1)";'
+    assert csharp_parser.scan_references(code) == [
+        ("SG_Haptics", "new", 1), ("SendCmd", "call", 1), ("SG_Util", "name", 1), ("Run", "call", 1)]
+
+
+# ---------- C++ ----------
+
+def test_cpp_class_members_and_modifiers():
+    decls = by_name(cpp_parser.scan_declarations(CPP))
+    glove = decls[("", "HapticGlove")]
+    assert glove["kind"] == "class" and glove["namespace"] == "SGCore"
+    assert glove["bases"] == ["Device", "Helper<int>"]
+    assert (glove["start_line"], glove["end_line"]) == (11, 25)
+    assert decls[("HapticGlove", "HapticGlove")]["kind"] == "constructor"
+    assert decls[("HapticGlove", "~HapticGlove")]["kind"] == "destructor"
+    send = decls[("HapticGlove", "SendCustomWaveform")]
+    assert send["modifiers"] == ["public", "virtual", "const", "override"]
+    assert send["return_type"] == "bool"              # SG_NODISCARD dropped
+    assert send["doc"] == "Sends a waveform."
+    assert "pure" in decls[("HapticGlove", "Pure")]["modifiers"]
+    assert decls[("HapticGlove", "Get")]["return_type"] == "T"          # template<...> dropped
+
+
+def test_cpp_operators_raw_strings_and_forward_declarations():
+    decls = cpp_parser.scan_declarations(CPP)
+    names = [(d["owner"], d["name"]) for d in decls]
+    assert names.count(("", "HapticGlove")) == 1       # the forward declaration is ignored
+    assert ("HapticGlove", "operator==") in names and ("HapticGlove", "operator()") in names
+    assert ("HapticGlove", "Mode") in names
+    free = by_name(decls)[("", "FreeFunction")]
+    assert free["kind"] == "method" and free["namespace"] == "SGCore"
+
+
+def test_cpp_file_summary():
+    assert cpp_parser.file_summary(CPP) == "Haptic glove interface."
+    assert cpp_parser.file_summary("class A {};") == ""
+
+
+def test_cpp_references_skip_literals_casts_and_macros():
+    code = '\n'.join([
+        '#define SG_CALL(x) \\',
+        '    DoNotCount(x)',
+        '// Commented(Call)',
+        'auto s = R"(Fake("x"))"; auto n = 1\'000\'000;',
+        'SGCORE_API void Foo::Bar() { auto* g = new HapticGlove(); g->SendCustomWaveform(w);'
+        ' int k = static_cast<int>(v); std::vector<Waveform> ws; Helper<int>(3); }',
+    ])
+    assert cpp_parser.scan_references(code) == [
+        ("Foo", "name", 5), ("Bar", "call", 5), ("HapticGlove", "new", 5),
+        ("SendCustomWaveform", "call", 5), ("Waveform", "name", 5), ("Helper", "call", 5)]
@@ -0,0 +1,51 @@
+import pytest
+
+import versions
+
+
+def entry(name, *signatures):
+    return {"name": name, "functions": [{"name": s.split("(")[0].split()[-1], "signature": s} for s in signatures]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = versions.VersionStore(str(tmp_path / "versions.sqlite"))
+    s.put("h1", "Haptics/SG_Haptics.cs", entry("SG_Haptics.cs", "void Buzz(int a)"), None)
+    s.put("h2", "Haptics/SG_Haptics.cs", entry("SG_Haptics.cs", "void Buzz(int a, float b)"), None)
+    s.put("b1", "SG_Battery.cs", entry("SG_Battery.cs", "float Level()"), None)
+    s.save_manifest("v2.4.0", "Adjuvo/SenseGlove-Unity", "a" * 40, {"Haptics/SG_Haptics.cs": "h1"})
+    s.save_manifest("v2.5.0", "Adjuvo/SenseGlove-Unity", "b" * 40,
+                    {"Haptics/SG_Haptics.cs": "h2", "SG_Battery.cs": "b1"})
+    yield s
+    s.close()
+
+
+@pytest.mark.parametrize("question", [
+    "how do I change the waveform from vibration to impact",
+    "what is new between grabbing and releasing objects?",
+    "diff haptics calibration",
+    "how can I make the glove vibrate?",
+    "changing from left hand to right hand",
+])
+def test_answer_ignores_non_version_questions(store, question):
+    assert store.answer(question) == ("", 0.0, "none")
+
+
+def test_answer_describes_diff_between_indexed_versions(store):
+    text, confidence, how = store.answer("What changed between v2.4 and v2.5?")
+    assert confidence == 1.0 and how == "version diff"
+    assert "1 added, 0 removed, 1 modified" in text
+    assert "SG_Battery.cs" in text
+    assert "Buzz() — signature changed" in text
+
+
+def test_answer_hints_at_unindexed_version(store):
+    text, confidence, how = store.answer("what changed between v2.4 and v9.1")
+    assert confidence == versions.UNINDEXED_CONFIDENCE and how == "version diff"
+    assert "v9.1 is not indexed" in text
+
+
+def test_resolve_tolerates_prefix_and_short_versions(store):
+    assert store.resolve("2.5.0") == "v2.5.0"
+    assert store.resolve("v2.4") == "v2.4.0"
+    assert store.resolve("v3") is None
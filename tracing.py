@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# tracing.py
+# ---------------------------------------------------------
+# Lightweight spans and counters for the assistant pipeline.
+# - span("build_context", chars=...) times a stage; spans nest
+#   per thread, so every stage of one question shares a trace id
+# - count()/gauge() keep running totals (GitHub requests,
+#   rate-limit headroom, ...)
+# - Finished spans go to an in-memory ring (the GUI debug panel
+#   reads it) and, when a log file is set, to a rolling JSONL
+#   log (senseglove_trace.jsonl, .1, .2, ...)
+# - Disabled by default: span() then returns a shared no-op
+#   object, so instrumented code pays one flag check
+# - SENSEGLOVE_TRACE=1 enables it with the default log;
+#   SENSEGLOVE_TRACE=path.jsonl logs there
+# ---------------------------------------------------------
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_FILE = "senseglove_trace.jsonl"
+MAX_BYTES = 5 * 1024 * 1024     # roll the log over at this size
+BACKUPS = 3                     # rolled files kept: .1 (newest) … .3
+RECENT = 500                    # finished spans kept in memory
+CHARS_PER_TOKEN = 4             # rough English/code average for llama-style tokenizers
+
+_enabled = False
+_log = None
+_recent = deque(maxlen=RECENT)
+_counters = {}
+_ids = itertools.count(1)
+_local = threading.local()
+_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """Approximate token count of `text` (the model reports exact counts over HTTP)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+# ---------- Rolling JSONL log ----------
+
+class RollingLog:
+    """Append-only JSONL file that rolls over to .1 … .N past `max_bytes`."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = None
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._file.write(line)
+        if self._file.tell() >= self.max_bytes:
+            self._roll()
+
+    def _roll(self):
+        self._file.close()
+        self._file = None
+        for n in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{n}"):
+                os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ---------- Switches ----------
+
+def enable(log_file=None):
+    """Start recording spans; with `log_file` they are also appended to that JSONL log."""
+    global _enabled, _log
+    with _lock:
+        if _log is not None and (log_file is None or _log.path != log_file):
+            _log.close()
+            _log = None
+        if log_file and _log is None:
+            _log = RollingLog(log_file)
+        _enabled = True
+
+
+def disable():
+    global _enabled, _log
+    with _lock:
+        _enabled = False
+        if _log is not None:
+            _log.close()
+            _log = None
+
+
+def enabled():
+    return _enabled
+
+
+def log_path():
+    return _log.path if _log is not None else None
+
+
+def _emit(record):
+    with _lock:
+        _recent.append(record)
+        if _log is not None:
+            try:
+                _log.write(record)
+            except OSError:
+                pass   # tracing must never break the assistant
+
+
+# ---------- Spans ----------
+
+class _NullSpan:
+    """What span() returns while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "id", "parent", "trace", "start")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach results known only at the end (sizes, counts, backend)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = _stack()
+        parent = stack[-1] if stack else None
+        self.id = next(_ids)
+        self.parent = parent.id if parent else None
+        self.trace = parent.trace if parent else self.id
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        record = {"type": "span", "ts": round(time.time(), 3), "trace": self.trace, "id": self.id,
+                  "parent": self.parent, "name": self.name, "ms": round(ms, 3),
+                  "thread": threading.current_thread().name, **self.attrs}
+        _emit(record)
+        if self.parent is None and _counters:
+            _emit({"type": "counters", "ts": record["ts"], "trace": self.trace, **counters()})
+        return False
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def span(name, **attrs):
+    """Context manager timing one stage: `with span("load_index") as s: ... s.set(scripts=n)`."""
+    if not _enabled:
+        return _NULL
+    return Span(name, attrs)
+
+
+def event(name, **attrs):
+    """Record a point-in-time measurement inside the current trace."""
+    if not _enabled:
+        return
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    _emit({"type": "event", "ts": round(time.time(), 3), "trace": parent.trace if parent else None,
+           "id": next(_ids), "parent": parent.id if parent else None, "name": name, **attrs})
+
+
+# ---------- Counters ----------
+
+def count(name, n=1):
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def gauge(name, value):
+    if _enabled:
+        with _lock:
+            _counters[name] = value
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def recent(limit=RECENT):
+    """Newest finished spans/events, oldest first."""
+    with _lock:
+        items = list(_recent)
+    return items[-limit:]
+
+
+if os.getenv("SENSEGLOVE_TRACE", "") not in ("", "0"):
+    _setting = os.environ["SENSEGLOVE_TRACE"]
+    enable(TRACE_FILE if _setting in ("1", "true", "yes") else _setting)
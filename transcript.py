@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# transcript.py
+# ---------------------------------------------------------
+# Compact chat history behind the GUI's windowed transcript.
+# - Finished messages are appended to a JSONL file and only
+#   their byte offsets stay in memory (array of int64), so a
+#   long session costs 8 bytes per message, not a widget tree
+# - Messages still being answered live in memory until final
+# - History survives restarts; the newest MAX_HISTORY are kept,
+#   and unsaved (persist=False) messages older than that are
+#   dropped from memory as new ones arrive
+# ---------------------------------------------------------
+
+import json
+import os
+import threading
+import time
+from array import array
+from collections import deque
+
+HISTORY_FILE = "senseglove_chat_history.jsonl"
+MAX_HISTORY = 5000
+MISSING = -1
+
+
+class TranscriptStore:
+    """Indexable (sender, text) sequence; finished messages are read back from disk on demand."""
+
+    def __init__(self, path=HISTORY_FILE, max_history=MAX_HISTORY):
+        self.path = path
+        self.offsets = array("q")    # index → byte offset in `path`, or MISSING
+        self.live = {}               # index → [sender, text] not (yet) on disk
+        self.max_history = max_history
+        self._unsaved = deque()      # indices of final messages that are never written, oldest first
+        self.session = time.time()   # orders records across runs; "i" orders them within one
+        self._lock = threading.Lock()
+        self._load(max_history)
+
+    def _load(self, max_history):
+        if not os.path.exists(self.path):
+            return
+        records = []
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    records.append((rec.get("s", 0), rec["i"], offset))
+                except (ValueError, KeyError):
+                    pass   # torn last line after a crash
+                offset += len(line)
+        # Answers are written when they finish, so file order can differ from chat order.
+        records.sort()
+        for _, _, offset in records[-max_history:]:
+            self.offsets.append(offset)
+        if len(records) > max_history:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the file with only the retained messages, renumbered from 0."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            new_offsets = array("q")
+            for i in range(len(self.offsets)):
+                sender, text, ts = self._read(self.offsets[i])
+                new_offsets.append(out.tell())
+                rec = {"s": 0, "i": i, "sender": sender, "text": text, "ts": ts}
+                out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+        self.offsets = new_offsets
+
+    def _read(self, offset):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            rec = json.loads(f.readline())
+        return rec["sender"], rec["text"], rec.get("ts")
+
+    def _write(self, index, sender, text):
+        rec = {"s": self.session, "i": index, "sender": sender, "text": text, "ts": time.time()}
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.offsets[index] = offset
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def append(self, sender, text, final=True, persist=True):
+        """Add a message and return its index. Non-final ones stay in memory until update(final=True)."""
+        with self._lock:
+            index = len(self.offsets)
+            self.offsets.append(MISSING)
+            if final and persist:
+                self._write(index, sender, text)
+            else:
+                self.live[index] = [sender, text]
+                if final:
+                    self._unsaved.append(index)
+                    self._trim(index)
+            return index
+
+    def _trim(self, newest):
+        while self._unsaved and self._unsaved[0] <= newest - self.max_history:
+            del self.live[self._unsaved.popleft()]
+
+    def update(self, index, text, final=False):
+        with self._lock:
+            entry = self.live[index]
+            entry[1] = text
+            if final:
+                del self.live[index]
+                self._write(index, entry[0], text)
+
+    def get(self, index):
+        """(sender, text) of message `index`."""
+        with self._lock:
+            if index in self.live:
+                sender, text = self.live[index]
+                return sender, text
+            offset = self.offsets[index]
+        if offset == MISSING:
+            return "assistant", "(message not saved)"
+        sender, text, _ = self._read(offset)
+        return sender, text
+
+    def clear(self):
+        with self._lock:
+            self.offsets = array("q")
+            self.live.clear()
+            self._unsaved.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# versions.py
+# ---------------------------------------------------------
+# Content-addressed, multi-version index of SDK releases.
+# - Parsed entries are stored once per blob SHA (plus file name
+#   and parser version) in senseglove_versions.sqlite; a file
+#   unchanged between releases is fetched and parsed only once
+# - Every branch/tag is a manifest: commit + {path: blob SHA}
+# - checkout() turns a manifest into the working index without
+#   any network access or parsing; the BM25, vector and
+#   cross-reference side indexes are refreshed incrementally
+# - "what changed between v2.4 and v2.5" is answered from the
+#   two manifests: added/removed scripts, added/removed methods
+#   and changed signatures
+#
+# Usage:
+#   python versions.py add v2.5.0 master      # index releases
+#   python versions.py list
+#   python versions.py checkout v2.5.0        # make it the working index
+#   python versions.py diff v2.4.0 v2.5.0
+# ---------------------------------------------------------
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import frontends
+import github_updater
+import index_store
+import retrieval
+import semantic
+import tracing
+import xref
+from index_store import _pack, _unpack
+
+VERSIONS_FILE = "senseglove_versions.sqlite"
+MAX_CHANGES = 25         # changed methods listed in one answer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha TEXT NOT NULL,
+    name TEXT NOT NULL,
+    parser TEXT NOT NULL,
+    entry BLOB NOT NULL,
+    refs BLOB,
+    PRIMARY KEY (sha, name, parser)
+);
+CREATE TABLE IF NOT EXISTS manifests (
+    ref TEXT PRIMARY KEY,
+    repo TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    indexed_at TEXT NOT NULL,
+    files BLOB NOT NULL
+);
+"""
+
+_DIFF = re.compile(
+    r"\b(?:chang\w*|diff\w*|new)\b.*?\b(?:between|from)\s+([\w./-]+)\s+(?:and|to|vs\.?|→|->)\s+([\w./-]+)"
+    r"|\bdiff\s+([\w./-]+)\s+(?:\.\.\.?\s*)?([\w./-]+)", re.I)
+# What a version operand must look like when it is not indexed yet: a release number or a commit SHA.
+_REF_LIKE = re.compile(r"v?\d+(?:\.\d+)*|[0-9a-f]{7,40}", re.I)
+UNINDEXED_CONFIDENCE = 0.5   # "not indexed" hint: below the instant-answer threshold, so the LLM still runs
+
+
+def _parser_for(path):
+    frontend = frontends.for_path(path)
+    return frontend.version if frontend else None
+
+
+class VersionStore:
+    """Blobs shared by all versions + one manifest per branch/tag; safe across threads."""
+
+    def __init__(self, path=VERSIONS_FILE):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._diffs = {}     # (commit a, commit b) → diff
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ---------- Blobs ----------
+    def has(self, sha, path):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM blobs WHERE sha = ? AND name = ? AND parser = ?",
+                                     (sha, os.path.basename(path), _parser_for(path))).fetchone() is not None
+
+    def put(self, sha, path, entry, refs):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?)",
+                              (sha, os.path.basename(path), _parser_for(path), _pack(entry),
+                               _pack(refs) if refs is not None else None))
+
+    def entry(self, sha, path):
+        """(entry, refs) stored for this blob, or (None, None)."""
+        with self._lock:
+            row = self.conn.execute("SELECT entry, refs FROM blobs WHERE sha = ? AND name = ? AND parser = ?",
+                                    (sha, os.path.basename(path), _parser_for(path))).fetchone()
+        if row is None:
+            return None, None
+        return _unpack(row[0]), (_unpack(row[1]) if row[1] is not None else None)
+
+    # ---------- Manifests ----------
+    def save_manifest(self, ref, repo, commit, files):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO manifests VALUES (?, ?, ?, ?, ?)",
+                              (ref, repo, commit, datetime.utcnow().isoformat() + "Z", _pack(files)))
+
+    def manifest(self, ref):
+        """{"ref", "repo", "commit", "indexed_at", "files": {path: sha}} or None."""
+        with self._lock:
+            row = self.conn.execute("SELECT ref, repo, commit_sha, indexed_at, files FROM manifests WHERE ref = ?",
+                                    (ref,)).fetchone()
+        if row is None:
+            return None
+        return {"ref": row[0], "repo": row[1], "commit": row[2], "indexed_at": row[3], "files": _unpack(row[4])}
+
+    def refs(self):
+        """Indexed branches/tags, oldest first: [(ref, commit, indexed_at)]."""
+        if not self.exists():
+            return []
+        with self._lock:
+            return self.conn.execute(
+                "SELECT ref, commit_sha, indexed_at FROM manifests ORDER BY indexed_at").fetchall()
+
+    def resolve(self, name):
+        """Manifest ref matching `name`, tolerating a missing/extra "v" and a shortened version."""
+        refs = [r for r, _, _ in self.refs()]
+        for candidate in (name, name.lstrip("vV"), "v" + name):
+            if candidate in refs:
+                return candidate
+        lowered = {r.lower(): r for r in refs}
+        if name.lower() in lowered:
+            return lowered[name.lower()]
+        # "v2.4" → "v2.4.0" when exactly one indexed release has that prefix
+        prefix = name.lower().lstrip("v") + "."
+        matches = [r for r in refs if r.lower().lstrip("v").startswith(prefix)]
+        return matches[0] if len(matches) == 1 else None
+
+    def stats(self):
+        with self._lock:
+            blobs = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(entry) + COALESCE(LENGTH(refs), 0)), 0) "
+                                      "FROM blobs").fetchone()
+            manifests = self.conn.execute("SELECT COUNT(*) FROM manifests").fetchone()[0]
+        return {"blobs": blobs[0], "bytes": blobs[1], "manifests": manifests}
+
+    # ---------- Diffs ----------
+    def diff(self, ref_a, ref_b):
+        """Script- and method-level changes from `ref_a` to `ref_b`."""
+        a, b = self.manifest(ref_a), self.manifest(ref_b)
+        if a is None or b is None:
+            raise KeyError(ref_a if a is None else ref_b)
+        key = (a["commit"], b["commit"])
+        if key not in self._diffs:
+            self._diffs[key] = self._diff(a, b)
+        return self._diffs[key]
+
+    def _diff(self, a, b):
+        fa, fb = a["files"], b["files"]
+        added = sorted(p for p in fb if p not in fa)
+        removed = sorted(p for p in fa if p not in fb)
+        modified = sorted(p for p in fb if p in fa and fa[p] != fb[p])
+        methods = []     # (path, method, "added" | "removed" | "changed", old signature, new signature)
+        for path in modified:
+            old, new = self.entry(fa[path], path)[0], self.entry(fb[path], path)[0]
+            if old is None or new is None:
+                continue
+            before, after = _signatures(old), _signatures(new)
+            for name in sorted(set(before) | set(after)):
+                if name not in before:
+                    methods.append((path, name, "added", "", after[name][0]))
+                elif name not in after:
+                    methods.append((path, name, "removed", before[name][0], ""))
+                elif sorted(before[name]) != sorted(after[name]):
+                    methods.append((path, name, "changed", " | ".join(before[name]), " | ".join(after[name])))
+        return {"from": a["ref"], "to": b["ref"], "added": added, "removed": removed,
+                "modified": modified, "methods": methods, "total": len(fb)}
+
+    def describe_diff(self, ref_a, ref_b, limit=MAX_CHANGES):
+        d = self.diff(ref_a, ref_b)
+        lines = [f"{d['from']} → {d['to']} ({d['total']} scripts): {len(d['added'])} added, "
+                 f"{len(d['removed'])} removed, {len(d['modified'])} modified."]
+        lines += [f"➕ {os.path.basename(p)} — new in {d['to']}" for p in d["added"][:limit]]
+        lines += [f"➖ {os.path.basename(p)} — removed" for p in d["removed"][:limit]]
+        changed = {p for p, *_ in d["methods"]}
+        for path, name, what, old, new in d["methods"][:limit]:
+            script = os.path.basename(path)
+            if what == "changed":
+                lines.append(f"✏️ {script} → {name}() — signature changed: {old}  ⇒  {new}")
+            else:
+                lines.append(f"✏️ {script} → {name}() — {what}")
+        if len(d["methods"]) > limit:
+            lines.append(f"… and {len(d['methods']) - limit} more method changes")
+        bodies = [os.path.basename(p) for p in d["modified"] if p not in changed]
+        if bodies:
+            lines.append(f"🔧 Implementation-only changes: {', '.join(bodies[:limit])}"
+                         + (f" … and {len(bodies) - limit} more" if len(bodies) > limit else ""))
+        if len(lines) == 1:
+            lines.append("No script changes.")
+        return "\n".join(lines)
+
+    # ---------- Questions ----------
+    def answer(self, query):
+        """(text, confidence, how) for "what changed between X and Y"; ("", 0, "none") otherwise."""
+        m = _DIFF.search(query)
+        if m is None or not self.exists():
+            return "", 0.0, "none"
+        names = [g.rstrip("?.,") for g in m.groups() if g]
+        refs = [self.resolve(n) for n in names]
+        if None not in refs:
+            return self.describe_diff(*refs), 1.0, "version diff"
+        # "change the waveform from vibration to impact" is not a version question.
+        if not all(r is not None or _REF_LIKE.fullmatch(n) for n, r in zip(names, refs)):
+            return "", 0.0, "none"
+        known = ", ".join(r for r, _, _ in self.refs()) or "none yet"
+        missing = names[refs.index(None)]
+        return (f"Version {missing} is not indexed. Indexed versions: {known}.\n"
+                f"Add it with: python versions.py add {missing}"), UNINDEXED_CONFIDENCE, "version diff"
+
+
+def _signatures(entry):
+    """{method name: [signatures]} of one entry (overloads share a name)."""
+    out = {}
+    for f in entry.get("functions", []):
+        if isinstance(f, dict) and f.get("name") and f["name"] != "UnknownFunction":
+            out.setdefault(f["name"], []).append(f.get("signature") or f["name"])
+    return out
+
+
+# ---------- Indexing a version ----------
+
+def add_version(ref, store=None, fetcher=None):
+    """Index branch/tag `ref`: fetch and parse only blobs no other version has. Returns the manifest."""
+    store = store or VersionStore()
+    fetcher = fetcher or github_updater.get_fetcher()
+    with tracing.span("versions.add", ref=ref) as span:
+        commit = fetcher.get_commit_sha(ref)
+        old = store.manifest(ref)
+        if old is not None and old["commit"] == commit:
+            print(f"✅ {ref} is already indexed at {commit[:7]}.")
+            return old
+
+        tree = fetcher.get_tree(commit, frontends.extensions(fetcher.repo))
+        todo = [i for i in tree if not store.has(i["sha"], i["path"])]
+        print(f"📦 {ref} ({commit[:7]}): {len(tree)} files, {len(tree) - len(todo)} shared with indexed versions, "
+              f"{len(todo)} to fetch")
+        contents = fetcher.fetch_files(todo, commit) if todo else {}
+        files = {i["path"]: i["sha"] for i in tree}
+        for item in todo:
+            code = contents.get(item["path"], "")
+            if not code.strip():
+                print(f"⚠️  Skipping {item['path']} (empty or unreadable)")
+                files.pop(item["path"])
+                continue
+            entry = github_updater.build_entry(os.path.basename(item["path"]), code)
+            refs = entry.pop("refs", None)
+            store.put(item["sha"], item["path"], entry, refs)
+        store.save_manifest(ref, fetcher.repo, commit, files)
+        span.set(files=len(files), parsed=len(todo), github_requests=fetcher.requests_made)
+        print(f"✅ {ref} indexed. 🌐 GitHub requests used: {fetcher.requests_made}")
+        return store.manifest(ref)
+
+
+def checkout(ref, index_file=index_store.DEFAULT_INDEX, store=None):
+    """Make `ref` the working index, straight from stored blobs (no network, no parsing)."""
+    store = store or VersionStore()
+    with index_store.WRITE_LOCK, tracing.span("versions.checkout", ref=ref) as span:
+        start = time.perf_counter()
+        manifest = store.manifest(ref)
+        if manifest is None:
+            raise KeyError(f"{ref} is not indexed; run: python versions.py add {ref}")
+        index = index_store.open_store(index_file)
+        current = index.path_shas() if index.exists() else {}
+
+        scripts, refs = [], {}
+        for path, sha in sorted(manifest["files"].items()):
+            entry, file_refs = store.entry(sha, path)
+            if entry is None:
+                continue
+            entry.update({"path": path, "sha": sha, "commit": manifest["commit"]})
+            scripts.append(index_store.normalize_entry(entry))   # blobs stored by older versions
+            if file_refs is not None and current.get(path) != sha:
+                refs[path] = file_refs      # only files that differ from the working index get relinked
+
+        index.replace_all(scripts)
+        retrieval.rebuild(index_file)
+        semantic.rebuild(index_file)
+        xref.rebuild(index_file, refs)
+        github_updater.save_meta({"last_sha": manifest["commit"], "version": ref})
+        elapsed = time.perf_counter() - start
+        span.set(scripts=len(scripts), changed=len(refs))
+        print(f"🔀 Working index is now {ref} ({manifest['commit'][:7]}): {len(scripts)} scripts, "
+              f"{len(refs)} differ from before, {elapsed:.2f} s.")
+        return manifest
+
+
+def active_version():
+    """Branch/tag the working index was checked out from (the updater's branch otherwise)."""
+    return github_updater.load_meta().get("version") or github_updater.BRANCH
+
+
+# ---------- Shared store for the assistant ----------
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(path=VERSIONS_FILE):
+    """The assistant's version store, or None until a version has been indexed."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = VersionStore(path) if os.path.exists(path) else None
+        return _store
+
+
+# ---------- Run ----------
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Index several SDK versions and switch between them.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("add", help="index branches/tags").add_argument("refs", nargs="+")
+    sub.add_parser("list", help="show indexed versions")
+    sub.add_parser("checkout", help="make a version the working index").add_argument("ref")
+    p = sub.add_parser("diff", help="what changed between two versions")
+    p.add_argument("ref_a")
+    p.add_argument("ref_b")
+    args = ap.parse_args()
+
+    vs = VersionStore()
+    try:
+        if args.cmd == "add":
+            for r in args.refs:
+                add_version(r, vs)
+            s = vs.stats()
+            print(f"💾 {s['manifests']} versions share {s['blobs']} parsed files ({s['bytes'] / 1024:.0f} KB).")
+        elif args.cmd == "list":
+            active = active_version()
+            for r, commit, when in vs.refs():
+                print(f"{'▶' if r == active else ' '} {r:<20} {commit[:7]}  indexed {when[:19]}")
+        elif args.cmd == "checkout":
+            checkout(args.ref, store=vs)
+        elif args.cmd == "diff":
+            print(vs.describe_diff(vs.resolve(args.ref_a) or args.ref_a, vs.resolve(args.ref_b) or args.ref_b))
+    except KeyError as e:
+        print(f"❌ Unknown version: {e.args[0]}")
+    except Exception as e:
+        print("❌ Error:", e)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# watcher.py
+# ---------------------------------------------------------
+# Live watch mode: keeps the index in sync with local script
+# edits (Assets/SenseGlove by default) while the assistant runs.
+# - inotify on Linux (ctypes, no extra packages), polling of
+#   mtime/size everywhere else or when inotify is unavailable
+# - Events are debounced: a save burst (editor temp file,
+#   rename, Unity reimport) becomes one refresh
+# - Only the touched files are re-parsed; the BM25, vector and
+#   cross-reference side indexes are refreshed incrementally
+# - The refreshed index and its retrieval structures are built
+#   off the query path and swapped in with one assignment;
+#   queries already running finish on the previous snapshot
+#
+# Usage:
+#   python sengeglove_cli.py --watch                  # GUI
+#   python sengeglove_cli.py --batch - --watch        # headless
+#   python watcher.py Assets/SenseGlove --poll        # index only
+# ---------------------------------------------------------
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+import frontends
+import generate_full_index
+import index_store
+import retrieval
+import semantic
+import tracing
+import xref
+
+DEFAULT_ROOTS = [os.path.join("Assets", "SenseGlove")]
+DEBOUNCE_S = 0.3         # quiet time after the last event before re-parsing
+MAX_DELAY_S = 2.0        # refresh at the latest this long after the first event
+POLL_INTERVAL_S = 1.0    # polling backend scan interval
+
+
+def _watched(path):
+    return frontends.for_local_path(path) is not None
+
+
+def _walk(roots):
+    for local, _ in generate_full_index.walk_sources(roots):
+        yield local
+
+
+# ---------- Backends ----------
+
+class PollingBackend:
+    """Compares mtime/size of every source file each interval; works everywhere."""
+
+    name = "polling"
+
+    def __init__(self, roots, interval=POLL_INTERVAL_S):
+        self.roots = roots
+        self.interval = interval
+        self._seen = self._scan()
+
+    def _scan(self):
+        seen = {}
+        for path in _walk(self.roots):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            seen[path] = (st.st_mtime_ns, st.st_size)
+        return seen
+
+    def wait(self, timeout, stop):
+        """Touched paths after at most `timeout` seconds (empty if nothing changed)."""
+        if stop.wait(min(timeout, self.interval)):
+            return set()
+        now = self._scan()
+        touched = {p for p in now.keys() | self._seen.keys() if now.get(p) != self._seen.get(p)}
+        self._seen = now
+        return touched
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """Kernel change notifications for every directory under the roots (Linux)."""
+
+    name = "inotify"
+    IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_Q_OVERFLOW, IN_ISDIR = 0x100, 0x200, 0x4000, 0x40000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is Linux-only")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = roots
+        self._dirs = {}      # watch descriptor → directory
+        try:
+            for root in roots:
+                self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, top):
+        for dirpath, _, _ in os.walk(top):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {dirpath} "
+                                                  "(raise fs.inotify.max_user_watches or use --poll)")
+            self._dirs[wd] = dirpath
+
+    def wait(self, timeout, stop):
+        ready, _, _ = select.select([self.fd], [], [], min(timeout, 0.5))
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        touched, pos = set(), 0
+        while pos < len(buf):
+            wd, mask, _, size = self._EVENT.unpack_from(buf, pos)
+            name = buf[pos + self._EVENT.size:pos + self._EVENT.size + size].rstrip(b"\0")
+            pos += self._EVENT.size + size
+            if mask & self.IN_Q_OVERFLOW:
+                return set(_walk(self.roots))     # events were lost: re-check everything
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and os.path.isdir(path):
+                    self._add_tree(path)                  # files copied in with the folder count too
+                    touched.update(_walk([path]))
+            elif _watched(path):
+                touched.add(path)
+        return touched
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_backend(roots, poll=False, interval=POLL_INTERVAL_S):
+    """inotify when available (and not `poll`), polling otherwise."""
+    if not poll:
+        try:
+            return InotifyBackend(roots)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ inotify unavailable ({e}); polling every {interval:g} s instead.")
+    return PollingBackend(roots, interval)
+
+
+# ---------- Watcher ----------
+
+class IndexWatcher:
+    """Re-parses edited scripts in a background thread and swaps the refreshed index in.
+    `load()` returns a fresh snapshot of the index (the GUI's load_index);
+    `on_swap(data, summary)` runs in the watcher thread after each swap."""
+
+    def __init__(self, roots, data, load, index_file=index_store.DEFAULT_INDEX, on_swap=None,
+                 poll=False, debounce=DEBOUNCE_S, interval=POLL_INTERVAL_S):
+        self.roots = generate_full_index.unique_roots([r for r in roots if os.path.isdir(r)])
+        self.data = data
+        self.load = load
+        self.index_file = index_file
+        self.on_swap = on_swap
+        self.poll = poll
+        self.debounce = debounce
+        self.interval = interval
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not self.roots:
+            print("⚠️ Watch mode: none of the source folders exist; not watching.")
+            return self
+        self.backend = open_backend(self.roots, self.poll, self.interval)
+        self._thread = threading.Thread(target=self._run, name="index-watcher", daemon=True)
+        self._thread.start()
+        print(f"👀 Watching {', '.join(self.roots)} ({self.backend.name}) for script edits.")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self.backend is not None:
+            self.backend.close()
+
+    def _run(self):
+        pending, first, last = set(), None, None
+        while not self._stop.is_set():
+            now = time.monotonic()
+            timeout = 3600.0 if last is None else max(0.0, min(last + self.debounce, first + MAX_DELAY_S) - now)
+            touched = self.backend.wait(timeout, self._stop)
+            now = time.monotonic()
+            if touched:
+                pending |= touched
+                first = first or now
+                last = now
+            if pending and (now - last >= self.debounce or now - first >= MAX_DELAY_S):
+                try:
+                    self.refresh(pending)
+                except Exception as e:
+                    print(f"❌ Live index refresh failed: {e}")
+                pending, first, last = set(), None, None
+
+    # ---------- Refresh ----------
+    def _under_roots(self, local):
+        local = os.path.abspath(local)
+        return next((r for r in self.roots if local.startswith(os.path.abspath(r) + os.sep)), None)
+
+    def _relpath(self, local):
+        """Stored path of a new file, as generate_full_index.walk_sources gives it."""
+        root = self._under_roots(local)
+        if root is None:
+            return os.path.basename(local)
+        prefix = dict(zip(self.roots, generate_full_index.root_prefixes(self.roots)))[root]
+        return prefix + os.path.relpath(local, root).replace(os.sep, "/")
+
+    def refresh(self, paths):
+        """Re-parse `paths` (edited, added or deleted files) and swap in the result. Returns the summary."""
+        # Shared with the updater, the generator and version checkouts, not just other refreshes.
+        with index_store.WRITE_LOCK, tracing.span("watch.refresh", files=len(paths)) as span:
+            start = time.perf_counter()
+            store = index_store.open_store(self.index_file)
+            scripts = list(store.entries()) if store.exists() else []
+            by_local = {os.path.abspath(e["local_path"]): i for i, e in enumerate(scripts)
+                        if isinstance(e, dict) and e.get("local_path")}
+            by_path, by_name = {}, {}
+            for i, e in enumerate(scripts):
+                if isinstance(e, dict):
+                    if e.get("path"):
+                        by_path[e["path"]] = i
+                    by_name.setdefault(index_store.entry_name(e), []).append(i)
+
+            # Indexed files under the roots that vanished, even if their delete event was lost.
+            paths = set(paths) | {p for p in by_local if self._under_roots(p) and not os.path.exists(p)}
+
+            parsed, removed = [], []
+            for local in sorted(paths):
+                rel = self._relpath(local)
+                names = by_name.get(os.path.basename(local), [])
+                i = by_local.get(os.path.abspath(local), by_path.get(rel))
+                if i is None and len(names) == 1 and not scripts[names[0]].get("local_path"):
+                    i = names[0]     # indexed from GitHub: same script, now edited locally
+                if not os.path.isfile(local):
+                    if i is not None and scripts[i] is not None:
+                        scripts[i] = None
+                        removed.append(os.path.basename(local))
+                    continue
+                try:
+                    st = os.stat(local)
+                    entry = generate_full_index.parse_local_file((local, rel, st.st_mtime, st.st_size))
+                except OSError as e:
+                    print(f"⚠️  Skipping {local}: {e}")
+                    continue
+                old = scripts[i] if i is not None else None
+                if old and old.get("sha") == entry["sha"] and old.get("parser") == entry["parser"]:
+                    continue         # touched, or saved without changes
+                if old and old.get("path"):
+                    entry["path"] = old["path"]
+                if i is None:
+                    scripts.append(entry)
+                else:
+                    scripts[i] = entry
+                parsed.append(entry)
+
+            span.set(parsed=len(parsed), removed=len(removed))
+            if not parsed and not removed:
+                return None
+            refs = xref.take_refs(parsed)
+            store.replace_all([e for e in scripts if e is not None])
+            data = self.load()
+            retrieval.rebuild(self.index_file)
+            semantic.rebuild(self.index_file)
+            xref.rebuild(self.index_file, refs)
+
+            # Build the new snapshot's structures before publishing it, so no query waits on them.
+            retrieval.prime(data, self.index_file)
+            semantic.prime(data, self.index_file)
+            xref.prime(data, self.index_file)
+            self.data = data
+
+            summary = {"parsed": [index_store.entry_name(e) for e in parsed], "removed": removed,
+                       "ms": (time.perf_counter() - start) * 1000}
+            print(f"🔄 Live index: {len(parsed)} re-parsed, {len(removed)} removed "
+                  f"({', '.join(summary['parsed'] + removed)}) in {summary['ms']:.0f} ms.")
+        if self.on_swap is not None:
+            self.on_swap(data, summary)
+        return summary
+
+
+# ---------- Run ----------
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Keep the index in sync with local script edits.")
+    ap.add_argument("roots", nargs="*", default=DEFAULT_ROOTS)
+    ap.add_argument("--poll", action="store_true", help="poll instead of using inotify")
+    ap.add_argument("--interval", type=float, default=POLL_INTERVAL_S, help="polling interval in seconds")
+    args = ap.parse_args()
+
+    def load():
+        return index_store.open_store(generate_full_index.OUT_FILE).snapshot()
+
+    w = IndexWatcher(args.roots, None, load, generate_full_index.OUT_FILE, poll=args.poll,
+                     interval=args.interval).start()
+    if w.backend is None:
+        sys.exit(1)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        w.stop()
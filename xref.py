@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# ---------------------------------------------------------
+# xref.py
+# ---------------------------------------------------------
+# Cross-reference index: who calls a method, which scripts use
+# a type, and what a script depends on.
+# - The indexers record, per file, every identifier it uses
+#   (the file's frontend, frontends.py) with its line and the
+#   method/type it sits in; C# and C++ entries link to each other
+# - Linking keeps only references to methods and types declared
+#   somewhere in the index: call edges and type-usage edges,
+#   each with file and line
+# - Stored next to the index (<index>.xref.json), per file and
+#   keyed by blob SHA: a refresh re-scans changed files only and
+#   re-links only those, plus files that mention a symbol that
+#   appeared or disappeared
+# - Usage questions ("what calls SendImpactVibration", "which
+#   scripts use SG_HandPose", "what does SG_Grabable depend on")
+#   are answered from memory in well under a millisecond
+# ---------------------------------------------------------
+
+import json
+import os
+import re
+
+import frontends
+import index_store
+import snapshot_cache
+import tracing
+
+FORMAT_VERSION = 1
+MAX_LINES = 12            # usage lines listed in one answer
+KINDS = {"call": "c", "new": "n", "name": "t"}
+TYPE_KINDS = ("n", "t")
+
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_IDENT = re.compile(r"[a-z][A-Z]|_|^[A-Z][a-z]+[A-Z]")
+_OUTGOING = re.compile(r"\bdepend|\bwhat\s+(?:does|do)\s+\w+(?:\.\w+)?\s+(?:call|use|need|reference)", re.I)
+_INCOMING = re.compile(r"\b(?:calls?|called|callers?|invoked?|invokes|uses?|used|usages?|references?|referenced)\b", re.I)
+
+
+def paths_for(index_file):
+    base, _ = os.path.splitext(index_file)
+    return base + ".xref.json"
+
+
+def file_key(entry):
+    """Stable per-file key: the local path for local builds, else the repo path."""
+    return entry.get("local_path") or entry.get("path") or index_store.entry_name(entry)
+
+
+def _script(entry):
+    return index_store.entry_name(entry)
+
+
+# ---------- Per-file references ----------
+
+def file_refs(code, decls=None, frontend=frontends.CSHARP):
+    """References of one file: {"from": [symbols], "refs": {name: [[line, kind, from index]]}}.
+
+    `from` holds the enclosing declaration of each reference ("SG_X.Grab()" or "SG_X");
+    index -1 means file level (usings, namespace). Declarations themselves are left out.
+    """
+    if decls is None:
+        decls = frontend.scan_declarations(code)
+    types, methods = frontend.split_declarations(decls)
+    method_ids = {id(d) for d in methods}
+    symbols, owner_at = [], {}
+    # Paint outer declarations first so inner ones (methods) win on their lines.
+    for d in sorted(types + methods, key=lambda d: (d["end_line"] or d["start_line"]) - d["start_line"], reverse=True):
+        owner = f"{d['owner']}.{d['name']}" if d["owner"] else d["name"]
+        symbols.append(owner + "()" if id(d) in method_ids else owner)
+        for line in range(d["start_line"], (d["end_line"] or d["start_line"]) + 1):
+            owner_at[line] = len(symbols) - 1
+    declared = {(d["name"], d["start_line"]) for d in decls}
+
+    refs = {}
+    for name, kind, line in frontend.scan_references(code):
+        if (name, line) in declared:
+            declared.discard((name, line))   # the declaration's own name, once
+            continue
+        refs.setdefault(name, []).append([line, KINDS[kind], owner_at.get(line, -1)])
+    return {"from": symbols, "refs": refs}
+
+
+def take_refs(scripts):
+    """Pop the "refs" the indexers attach to freshly parsed entries: {file key: refs}."""
+    return {file_key(e): e.pop("refs") for e in scripts if isinstance(e, dict) and "refs" in e}
+
+
+def _scan_local(entry):
+    path = entry.get("local_path")
+    if not path or not os.path.exists(path):
+        import symbol_locator   # vendored copies, when the index came from GitHub
+        path = symbol_locator.find_local_file(entry)
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8-sig", errors="ignore") as f:
+        return file_refs(f.read(), frontend=frontends.for_entry(entry))
+
+
+# ---------- Linking ----------
+
+def declared_symbols(scripts):
+    """({method name: [scripts]}, {type name: [scripts]}) declared in the index."""
+    methods, types = {}, {}
+    for e in scripts:
+        if not isinstance(e, dict):
+            continue
+        script = _script(e)
+        for f in e.get("functions", []):
+            if isinstance(f, dict) and f.get("name") and f["name"] != "UnknownFunction" \
+                    and f.get("kind", "method") == "method":
+                methods.setdefault(f["name"], []).append(script)
+        for t in e.get("types") or [{"name": c} for c in e.get("classes", [])]:
+            types.setdefault(t["name"], []).append(script)
+    return methods, types
+
+
+def _link(record, methods, types):
+    """Names in `record` that resolve to a declared method (called) or type (used)."""
+    links = []
+    for name, uses in record["refs"].items():
+        if (name in methods and any(u[1] == "c" for u in uses)) or \
+                (name in types and any(u[1] in TYPE_KINDS for u in uses)):
+            links.append(name)
+    return sorted(links)
+
+
+def rebuild(index_file=index_store.DEFAULT_INDEX, new_refs=None):
+    """Update <index>.xref.json after an indexer run. `new_refs` = {file key: refs} of re-parsed files;
+    other files keep their stored references, or are scanned from a local copy if they have none."""
+    with tracing.span("xref.rebuild") as span:
+        store = index_store.open_store(index_file)
+        scripts = [e for e in store if isinstance(e, dict)]
+        new_refs = new_refs or {}
+        old = _load_raw(paths_for(index_file)) or {"files": {}, "methods": {}, "types": {}}
+        methods, types = declared_symbols(scripts)
+        # Symbols that appeared or disappeared: files mentioning them need relinking too.
+        changed = (set(methods) ^ set(old["methods"])) | (set(types) ^ set(old["types"]))
+
+        files, relinked, missing = {}, 0, 0
+        for e in scripts:
+            key, sha = file_key(e), e.get("sha")
+            prev = old["files"].get(key)
+            refs = new_refs.get(key)
+            if refs is None and prev is not None and prev.get("sha") == sha:
+                rec = prev
+                if changed & rec["refs"].keys():
+                    rec["links"] = _link(rec, methods, types)
+                    relinked += 1
+                files[key] = rec
+                continue
+            if refs is None:
+                refs = _scan_local(e)
+                if refs is None:
+                    missing += 1
+                    continue
+            rec = {"script": _script(e), "path": e.get("path"), "sha": sha, **refs}
+            rec["links"] = _link(rec, methods, types)
+            files[key] = rec
+            relinked += 1
+
+        data = {"version": FORMAT_VERSION, "fingerprint": store.fingerprint(),
+                "methods": methods, "types": types, "files": files}
+        path = paths_for(index_file)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))   # C encoder; dump() streams in Python
+        os.replace(path + ".tmp", path)
+        span.set(files=len(files), relinked=relinked, missing=missing)
+        print(f"🔗 Cross-references: {relinked} files linked, {len(files) - relinked} reused"
+              + (f", {missing} without source" if missing else "") + ".")
+        return CrossRefs(data)
+
+
+def _load_raw(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if data.get("version") == FORMAT_VERSION else None
+
+
+# ---------- Graph ----------
+
+class CrossRefs:
+    """Call and type-usage edges, inverted for lookups by target and by source."""
+
+    def __init__(self, data):
+        self.methods = data["methods"]
+        self.types = data["types"]
+        self.fingerprint = data.get("fingerprint", "")
+        self.callers = {}      # method → [(script, line, from symbol)]
+        self.users = {}        # type → [(script, line, from symbol)]
+        self.outgoing = {}     # script → [(target, "call" | "type", line, from symbol)]
+        for rec in data["files"].values():
+            script, symbols = rec["script"], rec["from"]
+            out = self.outgoing.setdefault(script, [])
+            for name in rec["links"]:
+                for line, kind, src in rec["refs"][name]:
+                    origin = symbols[src] if src >= 0 else ""
+                    if kind == "c" and name in self.methods:
+                        self.callers.setdefault(name, []).append((script, line, origin))
+                        out.append((name, "call", line, origin))
+                    elif kind in TYPE_KINDS and name in self.types:
+                        self.users.setdefault(name, []).append((script, line, origin))
+                        out.append((name, "type", line, origin))
+        self._lower = {n.lower(): n for n in list(self.methods) + list(self.types)}
+        self._lower.update({frontends.stem(s).lower(): frontends.stem(s) for s in self.outgoing})
+
+    def resolve(self, word):
+        return self._lower.get(frontends.stem(word).lower())
+
+    # ---------- Questions ----------
+    def answer(self, query, limit=MAX_LINES):
+        """(text, confidence, how) for usage/dependency questions; ("", 0, "none") otherwise."""
+        outgoing = bool(_OUTGOING.search(query))
+        if not outgoing and not _INCOMING.search(query):
+            return "", 0.0, "none"
+        words = [w for w in _WORD.findall(query) if len(w) > 2]
+        known = [self.resolve(w) for w in words if self.resolve(w)]
+        target = next((n for n in known if _IDENT.search(n)), known[0] if known else None)
+        if target is None:
+            return "", 0.0, "none"
+        if outgoing:
+            text, found = self.describe_dependencies(target, limit)
+        else:
+            text, found = self.describe_usages(target, limit)
+        # "No uses found" is an answer too, only less certain than listed edges.
+        return text, 1.0 if found else 0.9, "cross-reference"
+
+    def describe_usages(self, name, limit=MAX_LINES):
+        """(text, found) listing every call site / type use of `name`."""
+        calls = self.callers.get(name, []) if name in self.methods else []
+        uses = self.users.get(name, []) if name in self.types else []
+        # A type referring to itself is not a usage.
+        uses = [u for u in uses if frontends.stem(u[0]) != name]
+        if not calls and not uses:
+            return f"No uses of {name} found in the indexed scripts.", False
+        lines = []
+        if calls:
+            lines.append(f"{name}() is called from {_count(calls)}:")
+            lines += _grouped(calls, limit)
+        if uses:
+            lines.append(f"{name} is used in {_count(uses)}:")
+            lines += _grouped(uses, limit)
+        return "\n".join(lines), True
+
+    def describe_dependencies(self, name, limit=MAX_LINES):
+        """(text, found) listing the types and methods a script (or method) uses from elsewhere."""
+        script = next((s for s in self.outgoing if frontends.stem(s) == name), None)
+        if script is not None:
+            edges = self.outgoing[script]
+            title = script
+        else:   # a method: what its body calls / uses
+            edges = [e for s, out in self.outgoing.items() for e in out if e[3].endswith(f".{name}()")]
+            title = f"{name}()"
+        own = name if script is None else frontends.stem(script)
+        by_target = {}
+        for target, kind, line, _ in edges:
+            if target != own and not (kind == "call" and own in self.methods.get(target, [])):
+                by_target.setdefault((target, kind), []).append(line)
+        if not by_target:
+            return f"{title} uses no other indexed scripts.", False
+        types = sorted((t, ls) for (t, k), ls in by_target.items() if k == "type")
+        calls = sorted((t, ls) for (t, k), ls in by_target.items() if k == "call")
+        lines = [f"{title} depends on {len(types)} types and calls {len(calls)} methods declared elsewhere:"]
+        for t, ls in types[:limit]:
+            lines.append(f"{self.types[t][0]} — {t} (line {_lines(ls)})")
+        for m, ls in calls[:max(0, limit - len(types[:limit]))]:
+            lines.append(f"{self.methods[m][0]} → {m}() (line {_lines(ls)})")
+        shown = min(len(types), limit) + min(len(calls), max(0, limit - min(len(types), limit)))
+        if shown < len(types) + len(calls):
+            lines.append(f"… and {len(types) + len(calls) - shown} more")
+        return "\n".join(lines), True
+
+
+def _count(edges):
+    scripts = len({e[0] for e in edges})
+    return f"{len(edges)} place{'s' if len(edges) != 1 else ''} in {scripts} script{'s' if scripts != 1 else ''}"
+
+
+def _lines(lines):
+    lines = sorted(set(lines))
+    return ", ".join(map(str, lines[:5])) + (", …" if len(lines) > 5 else "")
+
+
+def _grouped(edges, limit):
+    """One line per (script, enclosing member): "SG_X.cs → Grab() (line 12, 40)"."""
+    groups = {}
+    for script, line, origin in edges:
+        groups.setdefault((script, origin), []).append(line)
+    out = []
+    for (script, origin), lines in sorted(groups.items(), key=lambda g: (g[0][0], min(g[1])))[:limit]:
+        member = origin.rsplit(".", 1)[-1] if origin.endswith("()") else ""
+        out.append(f"{script} → {member} (line {_lines(lines)})" if member else f"{script} (line {_lines(lines)})")
+    if len(groups) > limit:
+        out.append(f"… and {len(groups) - limit} more")
+    return out
+
+
+# ---------- Load next to the index ----------
+
+def get_graph(data, index_file=None):
+    """Cross-reference graph for the loaded index; built from local sources if not stored yet."""
+    return _cache.get(data, index_file)
+
+
+def prime(data, index_file=None):
+    """Build the cross-reference graph for a freshly loaded `data` off the query path, then make it current."""
+    return _cache.prime(data, index_file)
+
+
+def _load_or_build(data, index_file):
+    if not index_file:
+        return None
+    raw = _load_raw(paths_for(index_file))
+    fingerprint = index_store.open_store(index_file).fingerprint()
+    if not index_store.is_current(data, fingerprint):
+        # Edges are keyed by script name, not position, so an older snapshot can read the stored graph.
+        return CrossRefs(raw) if raw is not None else None
+    if raw is not None and raw.get("fingerprint") == fingerprint:
+        return CrossRefs(raw)
+    with index_store.side_index_lock(data, index_file) as current:
+        if not current:
+            # A writer is rewriting the index and will rebuild the graph itself.
+            return CrossRefs(raw) if raw is not None else None
+        try:
+            graph = rebuild(index_file)     # reuses the stored records of unchanged files
+        except OSError as e:
+            print(f"⚠️ Cross-references unavailable: {e}")
+            return None
+    return graph if graph.callers or graph.users else None
+
+
+_cache = snapshot_cache.SnapshotCache(_load_or_build)